@@ -5,18 +5,28 @@ Uses the custom map layout from parking_zone_editor.py
 Vehicles travel ONLY on roads to reach parking spaces!
 
 Capacity: MC=140, Cars=81, Trucks=10 (Total: 231)
+
+Headless mode (no window, runs as fast as the CPU allows):
+    python CNSC_CUSTOM_MAP_SIMULATION.py --headless --days 10 --seed 42
 """
 
 import pygame
 import numpy as np
 import random
 import math
+import heapq
+import itertools
+from collections import OrderedDict
+import argparse
+import json
+import sys
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import NamedTuple, Tuple
 from enum import Enum
 
 # Import layout from generated file
 from generated_parking_zones import PARKING_ZONES, BUILDINGS, ROADS, ENTRY_GATE, EXIT_GATE
+from phase_profiler import PhaseProfiler
 
 # Window settings - smaller size for laptops and smaller screens
 MAP_WIDTH = 1024
@@ -29,6 +39,12 @@ START_TIME_HOUR = 6
 END_TIME_HOUR = 19
 SIMULATION_SPEED_MULTIPLIER = 60
 
+# Headless mode: simulated seconds per update() step. The default matches
+# one frame of the visual run (60 FPS at 60x speed); vehicles move a fixed
+# distance per step, so larger steps make them slower in simulated time.
+HEADLESS_SIM_DT = SIMULATION_SPEED_MULTIPLIER / FPS
+OCCUPANCY_SAMPLE_INTERVAL = 600  # seconds between zone occupancy samples (same as monte_carlo_engine.py)
+
 # Colors
 GRASS_GREEN = (144, 238, 144)  # Light green grass
 ROAD_GRAY = (60, 60, 60)
@@ -72,6 +88,24 @@ BATCH_SIZE_MAX = 6
 PROB_ILLEGAL_PARKING = 0.50
 MAX_SEARCH_ATTEMPTS = 4
 
+# RoadNetwork route cache: at most ROUTE_CACHE_SIZE routes (LRU); route
+# starts closer than ROUTE_CACHE_GRID pixels on a road share a cached route
+ROUTE_CACHE_SIZE = 4096
+ROUTE_CACHE_GRID = 20
+
+# Cell size (pixels) of the SpatialGrid used for road lookups
+SPATIAL_GRID_CELL_SIZE = 120
+
+# Phases timed by --profile: phase -> CNSCCustomSimulation methods
+PROFILE_PHASES = {
+    'update': ['update'],
+    'draw': ['draw'],
+    'spawning': ['spawn_vehicle'],
+    'parking': ['assign_parking'],
+    'vehicle_events': ['handle_vehicle_events'],
+    'movement': ['update_vehicles', 'update_vehicles_vectorized'],
+}
+
 
 class VehicleState(Enum):
     ENTERING = 1
@@ -82,13 +116,21 @@ class VehicleState(Enum):
     CIRCLING = 6
 
 
-@dataclass
-class Waypoint:
+# States in which a vehicle follows its path (VehicleStore state codes)
+MOVING_STATE_CODES = [VehicleState.ENTERING.value, VehicleState.ON_ROAD.value, VehicleState.EXITING.value]
+
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep a per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+class Waypoint(NamedTuple):
+    """Immutable path point; routes are tuples of these shared between vehicles"""
     x: float
     y: float
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Vehicle:
     id: int
     type: str  # 'motorcycle', 'car', 'truck'
@@ -100,12 +142,13 @@ class Vehicle:
     y: float = 0
     color: Tuple[int, int, int] = None
     rejected: bool = False
-    path: List[Waypoint] = None
+    path: Tuple[Waypoint, ...] = ()
     current_waypoint: int = 0
     speed: float = 3.0
     parking_slot: Tuple[int, int] = None
     search_attempts: int = 0
     circling_time: float = 0
+    distance_traveled: float = 0
 
     def __post_init__(self):
         if self.color is None:
@@ -115,8 +158,6 @@ class Vehicle:
                 self.color = TRUCK_COLOR
             else:
                 self.color = MOTORCYCLE_COLOR
-        if self.path is None:
-            self.path = []
 
 
 class ParkingZone:
@@ -129,7 +170,7 @@ class ParkingZone:
         self.capacity = int(capacity)
         self.type = zone_type
         self.occupied = 0
-        self.parked_vehicles = []
+        self.parked_vehicles = {}  # vehicle.id -> Vehicle
 
         # Small padding only
         self.padding = 2
@@ -185,19 +226,29 @@ class ParkingZone:
         self._init_slots()
 
     def _init_slots(self):
+        self.slot_positions = []  # slot index -> (row, col)
         row = col = 0
         for i in range(self.capacity):
             self.slots[(row, col)] = None
+            self.slot_positions.append((row, col))
             col += 1
             if col >= self.slots_per_row:
                 col = 0
                 row += 1
+        self.slot_index = {pos: i for i, pos in enumerate(self.slot_positions)}
+
+        # Min-heap of free slot indices: lowest index first, the same slot
+        # the old front-to-back scan picked (a sorted list is already a heap)
+        self.free_slots = list(range(self.capacity))
+
+    def clear(self):
+        """Empty every slot"""
+        self.occupied = 0
+        self.parked_vehicles = {}
+        self._init_slots()
 
     def find_empty_slot(self):
-        for pos, vehicle in self.slots.items():
-            if vehicle is None:
-                return pos
-        return None
+        return self.slot_positions[self.free_slots[0]] if self.free_slots else None
 
     def get_slot_position(self, slot):
         row, col = slot
@@ -213,27 +264,103 @@ class ParkingZone:
         return self.type == vehicle_type and self.occupied < self.capacity
 
     def park_vehicle(self, vehicle):
-        if self.can_park(vehicle.type):
-            slot = self.find_empty_slot()
-            if slot:
-                self.slots[slot] = vehicle
-                vehicle.parking_slot = slot
-                self.occupied += 1
-                self.parked_vehicles.append(vehicle)
-                return True
+        if self.can_park(vehicle.type) and self.free_slots:
+            slot = self.slot_positions[heapq.heappop(self.free_slots)]
+            self.slots[slot] = vehicle
+            vehicle.parking_slot = slot
+            self.occupied += 1
+            self.parked_vehicles[vehicle.id] = vehicle
+            return True
         return False
 
     def remove_vehicle(self, vehicle):
-        if vehicle in self.parked_vehicles:
+        if self.parked_vehicles.pop(vehicle.id, None) is not None:
             if vehicle.parking_slot:
                 self.slots[vehicle.parking_slot] = None
-            self.parked_vehicles.remove(vehicle)
+                heapq.heappush(self.free_slots, self.slot_index[vehicle.parking_slot])
             self.occupied -= 1
 
     def get_utilization(self):
         return (self.occupied / self.capacity * 100) if self.capacity > 0 else 0
 
 
+class SpatialGrid:
+    """
+    Uniform-grid index of axis-aligned rectangles (x, y, width, height).
+    Each cell lists the rectangles that overlap it, so point and nearest
+    queries only look at nearby rectangles instead of all of them.
+    """
+    def __init__(self, rects, cell_size=SPATIAL_GRID_CELL_SIZE):
+        self.rects = list(rects)
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> rect indices, ascending
+        for index, (x, y, w, h) in enumerate(self.rects):
+            for col in range(int(x // cell_size), int((x + w) // cell_size) + 1):
+                for row in range(int(y // cell_size), int((y + h) // cell_size) + 1):
+                    self.cells.setdefault((col, row), []).append(index)
+
+        if self.cells:
+            self.min_col = min(col for col, _ in self.cells)
+            self.max_col = max(col for col, _ in self.cells)
+            self.min_row = min(row for _, row in self.cells)
+            self.max_row = max(row for _, row in self.cells)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def find(self, x, y):
+        """Index of the first rectangle containing the point (same edges as pygame.Rect), or None"""
+        for index in self.cells.get(self._cell(x, y), ()):
+            rx, ry, rw, rh = self.rects[index]
+            if rx <= x < rx + rw and ry <= y < ry + rh:
+                return index
+        return None
+
+    def nearest(self, x, y):
+        """
+        (index, nearest point) of the rectangle closest to the point, first
+        one on ties, or (None, None) if there are no rectangles.
+        Searches rings of cells outwards until no closer rectangle can exist.
+        """
+        if not self.cells:
+            return None, None
+        col, row = self._cell(x, y)
+        max_ring = max(abs(col - self.min_col), abs(col - self.max_col),
+                       abs(row - self.min_row), abs(row - self.max_row))
+
+        best_index, best_point, best_dist_sq = None, None, float('inf')
+        seen = set()
+        for ring in range(max_ring + 1):
+            for cell in self._ring(col, row, ring):
+                for index in self.cells.get(cell, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    rx, ry, rw, rh = self.rects[index]
+                    cx = max(rx, min(x, rx + rw))
+                    cy = max(ry, min(y, ry + rh))
+                    dist_sq = (x - cx) ** 2 + (y - cy) ** 2
+                    if dist_sq < best_dist_sq or (dist_sq == best_dist_sq and index < best_index):
+                        best_index, best_point, best_dist_sq = index, (cx, cy), dist_sq
+            # Everything outside the searched rings is at least ring * cell_size away
+            if best_dist_sq <= (ring * self.cell_size) ** 2:
+                break
+        return best_index, best_point
+
+    @staticmethod
+    def _ring(col, row, ring):
+        """Cells at Chebyshev distance `ring` from (col, row)"""
+        if ring == 0:
+            yield col, row
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield c, row - ring
+            yield c, row + ring
+        for r in range(row - ring + 1, row + ring):
+            yield col - ring, r
+            yield col + ring, r
+
+
 class RoadNetwork:
     """Handles pathfinding on roads - vehicles follow road segments"""
     def __init__(self, roads):
@@ -241,7 +368,7 @@ class RoadNetwork:
         self.road_rects = []
         self.road_centers = []  # Center lines of roads for pathfinding
 
-        for road in roads:
+        for index, road in enumerate(roads):
             rect = pygame.Rect(road["x"], road["y"], road["width"], road["height"])
             self.road_rects.append(rect)
             # Store road center and orientation
@@ -253,44 +380,34 @@ class RoadNetwork:
                 'cx': cx, 'cy': cy,
                 'x': road["x"], 'y': road["y"],
                 'w': road["width"], 'h': road["height"],
-                'horizontal': is_horizontal
+                'horizontal': is_horizontal,
+                'index': index
             })
 
+        # Spatial index for the point and nearest-road queries
+        self.grid = SpatialGrid((r['x'], r['y'], r['w'], r['h']) for r in self.road_centers)
+
+        # Intersection graph and LRU route cache, built once
+        self._build_graph()
+        self.route_cache = OrderedDict()  # (road, snapped road point, end) -> waypoints
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     def is_on_road(self, x, y):
         """Check if point is on a road"""
-        for rect in self.road_rects:
-            if rect.collidepoint(x, y):
-                return True
-        return False
+        return self.grid.find(x, y) is not None
 
     def get_road_at(self, x, y):
         """Get road info at point"""
-        for road in self.road_centers:
-            if road['rect'].collidepoint(x, y):
-                return road
-        return None
+        index = self.grid.find(x, y)
+        return self.road_centers[index] if index is not None else None
 
     def get_nearest_road_point(self, x, y):
         """Find nearest point on any road - returns (point, road_info)"""
-        min_dist = float('inf')
-        nearest = (x, y)
-        nearest_road = None
-
-        for road in self.road_centers:
-            rx, ry = road['x'], road['y']
-            rw, rh = road['w'], road['h']
-
-            # Clamp point to road bounds
-            cx = max(rx, min(x, rx + rw))
-            cy = max(ry, min(y, ry + rh))
-
-            dist = math.sqrt((x - cx)**2 + (y - cy)**2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = (cx, cy)
-                nearest_road = road
-
-        return nearest, nearest_road
+        index, nearest = self.grid.nearest(x, y)
+        if index is None:
+            return (x, y), None
+        return nearest, self.road_centers[index]
 
     def find_intersections(self, road1, road2):
         """Find intersection point of two roads"""
@@ -304,59 +421,106 @@ class RoadNetwork:
             return (ix, iy)
         return None
 
-    def create_road_path(self, start, end):
-        """Create path that follows actual road segments"""
-        path = [Waypoint(start[0], start[1])]
+    def _build_graph(self):
+        """
+        Road graph: nodes are road crossings (centre of the overlap, as in
+        find_intersections), edges join crossings on the same road.
+        """
+        self.nodes = []  # node index -> (x, y)
+        self.road_nodes = [[] for _ in self.road_centers]  # road index -> node indices on that road
+        for i, j in itertools.combinations(range(len(self.road_centers)), 2):
+            point = self.find_intersections(self.road_centers[i], self.road_centers[j])
+            if point:
+                self.road_nodes[i].append(len(self.nodes))
+                self.road_nodes[j].append(len(self.nodes))
+                self.nodes.append(point)
+
+        self.edges = [[] for _ in self.nodes]  # node index -> [(neighbour, distance)]
+        for nodes_on_road in self.road_nodes:
+            for a, b in itertools.combinations(nodes_on_road, 2):
+                distance = math.dist(self.nodes[a], self.nodes[b])
+                self.edges[a].append((b, distance))
+                self.edges[b].append((a, distance))
+
+    def shortest_route(self, start_pt, road_start, end_pt, road_end):
+        """
+        Dijkstra from a point on road_start to a point on road_end.
+        Returns the crossings to drive through, or None if the roads are not connected.
+        """
+        goal_nodes = {n: math.dist(self.nodes[n], end_pt) for n in self.road_nodes[road_end['index']]}
+        heap = [(math.dist(start_pt, self.nodes[n]), n, -1) for n in self.road_nodes[road_start['index']]]
+        heapq.heapify(heap)
+        previous = {}
+        best_length, best_node = float('inf'), None
+
+        while heap:
+            distance, node, parent = heapq.heappop(heap)
+            if node in previous:
+                continue
+            if distance >= best_length:
+                break
+            previous[node] = parent
+            if node in goal_nodes and distance + goal_nodes[node] < best_length:
+                best_length, best_node = distance + goal_nodes[node], node
+            for neighbour, length in self.edges[node]:
+                if neighbour not in previous:
+                    heapq.heappush(heap, (distance + length, neighbour, node))
+
+        if best_node is None:
+            return None
+        route = []
+        node = best_node
+        while node != -1:
+            route.append(self.nodes[node])
+            node = previous[node]
+        return route[::-1]
 
-        # Get nearest road points
+    def create_road_path(self, start, end):
+        """
+        Path that follows the roads. The part from the nearest road point
+        onwards is cached by (road point snapped to ROUTE_CACHE_GRID, end),
+        so vehicles leaving from the same gate, slot or road spot share it.
+        """
         road_start_pt, road_start = self.get_nearest_road_point(start[0], start[1])
-        road_end_pt, road_end = self.get_nearest_road_point(end[0], end[1])
-
-        if road_start is None or road_end is None:
+        if road_start is None:
             # No roads found, direct path
-            path.append(Waypoint(end[0], end[1]))
-            return path
+            return (Waypoint(start[0], start[1]), Waypoint(end[0], end[1]))
+
+        key = (road_start['index'], round(road_start_pt[0] / ROUTE_CACHE_GRID),
+               round(road_start_pt[1] / ROUTE_CACHE_GRID), round(end[0]), round(end[1]))
+        route = self.route_cache.get(key)
+        if route is not None:
+            self.route_cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            route = tuple(self._route_from_road(road_start_pt, road_start, end))
+            self.route_cache[key] = route
+            if len(self.route_cache) > ROUTE_CACHE_SIZE:
+                self.route_cache.popitem(last=False)
+
+        return (Waypoint(start[0], start[1]),) + route
 
+    def _route_from_road(self, road_start_pt, road_start, end):
+        """Waypoints from a point on road_start to end, following actual road segments"""
         # Move to nearest road
-        path.append(Waypoint(road_start_pt[0], road_start_pt[1]))
+        path = [Waypoint(road_start_pt[0], road_start_pt[1])]
+        road_end_pt, road_end = self.get_nearest_road_point(end[0], end[1])
 
         # If start and end are on the same road, go directly
-        if road_start == road_end:
+        if road_start is road_end:
             path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
         else:
-            # Find path through road network
-            # Try to find intersection between start road and end road
-            intersection = self.find_intersections(road_start, road_end)
-
-            if intersection:
-                path.append(Waypoint(intersection[0], intersection[1]))
-                path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
+            route = self.shortest_route(road_start_pt, road_start, road_end_pt, road_end)
+            if route is not None:
+                path.extend(Waypoint(x, y) for x, y in route)
+            elif road_start['horizontal']:
+                # Roads not connected: go horizontally first to align X
+                path.append(Waypoint(road_end_pt[0], road_start_pt[1]))
             else:
-                # Need to go through intermediate roads
-                # Find a connecting road
-                for mid_road in self.road_centers:
-                    if mid_road == road_start or mid_road == road_end:
-                        continue
-
-                    int1 = self.find_intersections(road_start, mid_road)
-                    int2 = self.find_intersections(mid_road, road_end)
-
-                    if int1 and int2:
-                        # Found connecting road
-                        path.append(Waypoint(int1[0], int1[1]))
-                        path.append(Waypoint(int2[0], int2[1]))
-                        path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
-                        break
-                else:
-                    # No connecting road found, try direct on roads
-                    # Follow horizontal road then vertical (or vice versa)
-                    if road_start['horizontal']:
-                        # Go horizontally first to align X
-                        path.append(Waypoint(road_end_pt[0], road_start_pt[1]))
-                    else:
-                        # Go vertically first to align Y
-                        path.append(Waypoint(road_start_pt[0], road_end_pt[1]))
-                    path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
+                # Roads not connected: go vertically first to align Y
+                path.append(Waypoint(road_start_pt[0], road_end_pt[1]))
+            path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
 
         # Move to final destination
         path.append(Waypoint(end[0], end[1]))
@@ -364,19 +528,141 @@ class RoadNetwork:
         return path
 
 
-class CNSCCustomSimulation:
-    def __init__(self):
-        pygame.init()
+class VehicleStore:
+    """
+    Structure-of-arrays movement state for the vectorized update, in the
+    same order as the simulation's vehicle list. While a vehicle is in the
+    store, the arrays hold its x, y, current_waypoint and distance_traveled;
+    the Vehicle object is a view that sync_view() refreshes whenever Python
+    code reads it, and load() copies back after Python code changed it.
+    Paths are copied into one flat waypoint buffer.
+    """
+    def __init__(self, capacity=256):
+        self.vehicles = []
+        self.paths = []  # path list each vehicle's buffer range was copied from
+        self._allocate(capacity)
+        self.wx = np.zeros(capacity * 8)
+        self.wy = np.zeros(capacity * 8)
+        self.waypoints_used = 0
+
+    def _allocate(self, capacity):
+        old = getattr(self, 'x', None)
+        size = self.size if old is not None else 0
+        for name, dtype in (('x', float), ('y', float), ('speed', float), ('distance', float),
+                            ('departure_time', float), ('state', np.int8), ('waypoint', np.int64),
+                            ('path_start', np.int64), ('path_len', np.int64)):
+            array = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                array[:size] = getattr(self, name)[:size]
+            setattr(self, name, array)
+
+    @property
+    def size(self):
+        return len(self.vehicles)
+
+    def clear(self):
+        self.vehicles = []
+        self.paths = []
+        self.waypoints_used = 0
+
+    def append(self, vehicle):
+        if self.size == len(self.x):
+            self._allocate(2 * len(self.x))
+        self.vehicles.append(vehicle)
+        self.paths.append(None)
+        self.load(self.size - 1)
+
+    def load(self, i):
+        """Copy vehicle i's view into the arrays"""
+        vehicle = self.vehicles[i]
+        self.x[i] = vehicle.x
+        self.y[i] = vehicle.y
+        self.speed[i] = vehicle.speed
+        self.distance[i] = vehicle.distance_traveled
+        self.departure_time[i] = vehicle.departure_time
+        self.state[i] = vehicle.state.value
+        self.waypoint[i] = vehicle.current_waypoint
+        if vehicle.path is not self.paths[i]:
+            self.paths[i] = None  # old range need not survive a compaction
+            self.path_start[i] = self._store_path(vehicle.path)
+            self.path_len[i] = len(vehicle.path)
+            self.paths[i] = vehicle.path
+
+    def sync_view(self, i):
+        """Refresh vehicle i's view from the arrays and return it"""
+        vehicle = self.vehicles[i]
+        vehicle.x = float(self.x[i])
+        vehicle.y = float(self.y[i])
+        vehicle.current_waypoint = int(self.waypoint[i])
+        vehicle.distance_traveled = float(self.distance[i])
+        return vehicle
+
+    def sync_views(self):
+        """Refresh every view's position (before drawing)"""
+        n = self.size
+        for vehicle, x, y in zip(self.vehicles, self.x[:n].tolist(), self.y[:n].tolist()):
+            vehicle.x = x
+            vehicle.y = y
+
+    def remove(self, vehicles):
+        """Drop vehicles (by identity), keeping the order of the rest"""
+        removed = {id(vehicle) for vehicle in vehicles}
+        keep = np.array([id(vehicle) not in removed for vehicle in self.vehicles], dtype=bool)
+        n = self.size
+        for name in ('x', 'y', 'speed', 'distance', 'departure_time', 'state', 'waypoint', 'path_start', 'path_len'):
+            array = getattr(self, name)
+            kept = array[:n][keep]
+            array[:len(kept)] = kept
+        self.vehicles = [vehicle for vehicle, k in zip(self.vehicles, keep) if k]
+        self.paths = [path for path, k in zip(self.paths, keep) if k]
+
+    def _store_path(self, path):
+        """Append a path to the waypoint buffer, compacting or growing it when full"""
+        if self.waypoints_used + len(path) > len(self.wx):
+            self._compact_paths(len(path))
+        start = self.waypoints_used
+        for offset, waypoint in enumerate(path):
+            self.wx[start + offset] = waypoint.x
+            self.wy[start + offset] = waypoint.y
+        self.waypoints_used += len(path)
+        return start
+
+    def _compact_paths(self, extra):
+        """Rewrite only the paths still in use, growing the buffer if needed"""
+        n = self.size
+        live = [(i, self.path_start[i], self.path_len[i]) for i in range(n) if self.paths[i] is not None]
+        needed = sum(length for _, _, length in live) + extra
+        capacity = len(self.wx)
+        while capacity < 2 * needed:
+            capacity *= 2
+        wx, wy = np.zeros(capacity), np.zeros(capacity)
+        used = 0
+        for i, start, length in live:
+            wx[used:used + length] = self.wx[start:start + length]
+            wy[used:used + length] = self.wy[start:start + length]
+            self.path_start[i] = used
+            used += length
+        self.wx, self.wy, self.waypoints_used = wx, wy, used
 
-        # Main pygame window - full screen for map only
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("CNSC Parking Map")
-        self.clock = pygame.time.Clock()
 
-        self.font = pygame.font.Font(None, 20)
-        self.font_small = pygame.font.Font(None, 16)
-        self.font_large = pygame.font.Font(None, 40)
-        self.font_title = pygame.font.Font(None, 24)
+class CNSCCustomSimulation:
+    def __init__(self, headless=False, vectorized=False, profile=False):
+        # Headless: no window, fonts or clock - only update() is used (see run_headless)
+        self.headless = headless
+        # Vectorized: vehicle movement runs on a VehicleStore instead of per Vehicle
+        self.vehicle_store = VehicleStore() if vectorized else None
+        if not headless:
+            pygame.init()
+
+            # Main pygame window - full screen for map only
+            self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+            pygame.display.set_caption("CNSC Parking Map")
+            self.clock = pygame.time.Clock()
+
+            self.font = pygame.font.Font(None, 20)
+            self.font_small = pygame.font.Font(None, 16)
+            self.font_large = pygame.font.Font(None, 40)
+            self.font_title = pygame.font.Font(None, 24)
 
         # Create zones from generated layout
         self.zones = [ParkingZone(**zone) for zone in PARKING_ZONES]
@@ -394,6 +680,10 @@ class CNSCCustomSimulation:
         self.total_rejected = 0
         self.total_departed = 0
 
+        # Per-day statistics (occupancy samples, rejections, travel distance)
+        self.day_results = []
+        self.start_day_stats()
+
         self.paused = False
 
         # Camera/view offset for panning
@@ -427,6 +717,58 @@ class CNSCCustomSimulation:
         self.btn_pause = None
         self.btn_reset = None
 
+        # Opt-in phase timing (wraps this instance's methods; nothing is timed otherwise)
+        self.profiler = None
+        if profile:
+            self.profiler = PhaseProfiler()
+            self.profiler.attach(self, PROFILE_PHASES)
+            self.profiler.attach(self.road_network, {'routing': ['create_road_path']})
+
+    def start_day_stats(self):
+        """Reset the per-day counters summarized by end_day_stats()"""
+        self.day_start_totals = (self.total_arrivals, self.total_parked, self.total_rejected)
+        self.day_rejected_by_type = {'motorcycle': 0, 'car': 0, 'truck': 0}
+        self.day_zone_parked = [0] * len(self.zones)
+        self.day_zone_distance = [0.0] * len(self.zones)
+        self.day_trip_distances = []
+        self.day_occupancy_samples = []
+        self.next_sample_time = START_TIME_HOUR * 3600
+
+    def end_day_stats(self):
+        """Summarize the day that just ended into self.day_results"""
+        arrivals, parked, rejected = self.day_start_totals
+        samples = np.array(self.day_occupancy_samples, dtype=float).reshape(-1, len(self.zones))
+
+        zones = []
+        for i, zone in enumerate(self.zones):
+            occupancy = samples[:, i]
+            sampled = len(occupancy) > 0
+            zones.append({
+                'zone': zone.name,
+                'type': zone.type,
+                'capacity': zone.capacity,
+                'vehicles_parked': self.day_zone_parked[i],
+                'mean_occupancy': float(occupancy.mean()) if sampled else 0.0,
+                'peak_occupancy': int(occupancy.max()) if sampled else 0,
+                'mean_utilization': float(occupancy.mean() / zone.capacity * 100) if sampled else 0.0,
+                'prob_full': float((occupancy >= zone.capacity).mean()) if sampled else 0.0,
+                'mean_distance_to_zone': (self.day_zone_distance[i] / self.day_zone_parked[i]
+                                          if self.day_zone_parked[i] else 0.0),
+            })
+
+        # Trips of vehicles that left through the exit gate (parked or rejected)
+        trips = self.day_trip_distances
+        self.day_results.append({
+            'day': self.current_day,
+            'arrivals': self.total_arrivals - arrivals,
+            'parked': self.total_parked - parked,
+            'rejected': self.total_rejected - rejected,
+            'rejected_by_type': dict(self.day_rejected_by_type),
+            'completed_trips': len(trips),
+            'mean_trip_distance': float(np.mean(trips)) if trips else 0.0,
+            'zones': zones,
+        })
+
     def get_current_hour(self):
         return int(self.sim_time // 3600) % 24
 
@@ -497,6 +839,7 @@ class CNSCCustomSimulation:
                     (vehicle.x, vehicle.y), EXIT_GATE)
                 vehicle.current_waypoint = 0
                 self.total_rejected += 1
+                self.day_rejected_by_type[vehicle.type] += 1
             else:
                 vehicle.state = VehicleState.CIRCLING
                 vehicle.circling_time = self.sim_time
@@ -527,9 +870,13 @@ class CNSCCustomSimulation:
         if self.sim_time >= 19 * 3600:
             parked_count = sum(1 for v in self.vehicles if v.state == VehicleState.PARKED)
             if parked_count == 0:
+                self.end_day_stats()
                 self.sim_time = START_TIME_HOUR * 3600
                 self.current_day += 1
                 self.vehicles = []
+                if self.vehicle_store is not None:
+                    self.vehicle_store.clear()
+                self.start_day_stats()
 
         # Spawn vehicles
         current_hour = self.get_current_hour()
@@ -544,30 +891,57 @@ class CNSCCustomSimulation:
                 else:
                     self.spawn_vehicle()
 
-        vehicles_to_remove = []
+        if self.vehicle_store is not None:
+            self.update_vehicles_vectorized()
+        else:
+            self.update_vehicles()
+
+        # Zone occupancy snapshots during the day, for the per-day statistics
+        while self.next_sample_time <= self.sim_time and self.next_sample_time < END_TIME_HOUR * 3600:
+            self.day_occupancy_samples.append([zone.occupied for zone in self.zones])
+            self.next_sample_time += OCCUPANCY_SAMPLE_INTERVAL
+
+    def handle_vehicle_events(self, vehicle):
+        """Departure and circling decisions for one vehicle (before it moves)"""
+        # Departure check
+        if vehicle.state == VehicleState.PARKED and self.sim_time >= vehicle.departure_time:
+            zone = self.zones[vehicle.zone_index]
+            zone.remove_vehicle(vehicle)
+            vehicle.state = VehicleState.EXITING
+            vehicle.path = self.road_network.create_road_path(
+                (vehicle.x, vehicle.y), EXIT_GATE)
+            vehicle.current_waypoint = 0
+            self.total_departed += 1
 
-        for vehicle in self.vehicles:
-            # Departure check
-            if vehicle.state == VehicleState.PARKED and self.sim_time >= vehicle.departure_time:
-                zone = self.zones[vehicle.zone_index]
-                zone.remove_vehicle(vehicle)
+        # Circling timeout
+        if vehicle.state == VehicleState.CIRCLING:
+            if self.sim_time - vehicle.circling_time > 300:
+                vehicle.rejected = True
                 vehicle.state = VehicleState.EXITING
                 vehicle.path = self.road_network.create_road_path(
                     (vehicle.x, vehicle.y), EXIT_GATE)
                 vehicle.current_waypoint = 0
-                self.total_departed += 1
+                self.total_rejected += 1
+                self.day_rejected_by_type[vehicle.type] += 1
+            elif random.random() < 0.03:
+                self.assign_parking(vehicle)
+
+    def finish_path(self, vehicle, vehicles_to_remove):
+        """A vehicle reached the end of its path: park it, or let it leave"""
+        if vehicle.state in [VehicleState.ENTERING, VehicleState.ON_ROAD]:
+            vehicle.state = VehicleState.PARKED
+            self.day_zone_parked[vehicle.zone_index] += 1
+            self.day_zone_distance[vehicle.zone_index] += vehicle.distance_traveled
+        elif vehicle.state == VehicleState.EXITING:
+            vehicles_to_remove.append(vehicle)
+            self.day_trip_distances.append(vehicle.distance_traveled)
+
+    def update_vehicles(self):
+        """Events and movement, one Vehicle at a time"""
+        vehicles_to_remove = []
 
-            # Circling timeout
-            if vehicle.state == VehicleState.CIRCLING:
-                if self.sim_time - vehicle.circling_time > 300:
-                    vehicle.rejected = True
-                    vehicle.state = VehicleState.EXITING
-                    vehicle.path = self.road_network.create_road_path(
-                        (vehicle.x, vehicle.y), EXIT_GATE)
-                    vehicle.current_waypoint = 0
-                    self.total_rejected += 1
-                elif random.random() < 0.03:
-                    self.assign_parking(vehicle)
+        for vehicle in self.vehicles:
+            self.handle_vehicle_events(vehicle)
 
             # Movement along path
             if vehicle.state in [VehicleState.ENTERING, VehicleState.ON_ROAD, VehicleState.EXITING]:
@@ -580,13 +954,11 @@ class CNSCCustomSimulation:
                     if dist > 3:
                         vehicle.x += (dx / dist) * vehicle.speed
                         vehicle.y += (dy / dist) * vehicle.speed
+                        vehicle.distance_traveled += vehicle.speed
                     else:
                         vehicle.current_waypoint += 1
                 else:
-                    if vehicle.state in [VehicleState.ENTERING, VehicleState.ON_ROAD]:
-                        vehicle.state = VehicleState.PARKED
-                    elif vehicle.state == VehicleState.EXITING:
-                        vehicles_to_remove.append(vehicle)
+                    self.finish_path(vehicle, vehicles_to_remove)
 
             # Circling movement
             elif vehicle.state == VehicleState.CIRCLING:
@@ -597,6 +969,61 @@ class CNSCCustomSimulation:
         for v in vehicles_to_remove:
             self.vehicles.remove(v)
 
+    def update_vehicles_vectorized(self):
+        """
+        Same as update_vehicles, with movement done on the VehicleStore arrays.
+        Events and movement never affect other vehicles within a frame, so
+        events run first (in list order, for the same random numbers), then
+        every vehicle moves at once. Only vehicles with an event or at the
+        end of their path go through Python.
+        """
+        store = self.vehicle_store
+        for vehicle in self.vehicles[store.size:]:
+            store.append(vehicle)
+        n = store.size
+
+        # Parked vehicles due to leave and circling vehicles
+        state = store.state[:n]
+        events = np.flatnonzero(((state == VehicleState.PARKED.value) & (store.departure_time[:n] <= self.sim_time)) |
+                                (state == VehicleState.CIRCLING.value))
+        for i in events.tolist():
+            vehicle = store.sync_view(i)
+            self.handle_vehicle_events(vehicle)
+            if vehicle.state == VehicleState.CIRCLING:
+                vehicle.x += random.uniform(-2, 2)
+                vehicle.y += random.uniform(-2, 2)
+            store.load(i)
+
+        # Movement along paths
+        state = store.state[:n]
+        moving = np.isin(state, MOVING_STATE_CODES)
+        has_waypoint = store.waypoint[:n] < store.path_len[:n]
+        active = np.flatnonzero(moving & has_waypoint)
+        finished = np.flatnonzero(moving & ~has_waypoint)
+
+        if active.size:
+            target = store.path_start[active] + store.waypoint[active]
+            dx = store.wx[target] - store.x[active]
+            dy = store.wy[target] - store.y[active]
+            dist = np.sqrt(dx**2 + dy**2)
+
+            far = dist > 3
+            moved = active[far]
+            speed = store.speed[moved]
+            store.x[moved] += (dx[far] / dist[far]) * speed
+            store.y[moved] += (dy[far] / dist[far]) * speed
+            store.distance[moved] += speed
+            store.waypoint[active[~far]] += 1
+
+        vehicles_to_remove = []
+        for i in finished.tolist():
+            self.finish_path(store.sync_view(i), vehicles_to_remove)
+            store.load(i)
+
+        if vehicles_to_remove:
+            store.remove(vehicles_to_remove)
+            self.vehicles = list(store.vehicles)
+
     def world_to_screen(self, x, y):
         """Convert world coordinates to screen coordinates"""
         sx = (x + self.view_offset_x) * self.zoom
@@ -667,6 +1094,8 @@ class CNSCCustomSimulation:
         self.screen.blit(label, (ex - 15, ey + size + 3))
 
     def draw_vehicles(self):
+        if self.vehicle_store is not None:
+            self.vehicle_store.sync_views()
         for vehicle in self.vehicles:
             x, y = self.world_to_screen(vehicle.x, vehicle.y)
 
@@ -981,9 +1410,11 @@ class CNSCCustomSimulation:
         self.total_rejected = 0
         self.total_departed = 0
         for zone in self.zones:
-            zone.occupied = 0
-            zone.parked_vehicles = []
-            zone._init_slots()
+            zone.clear()
+        if self.vehicle_store is not None:
+            self.vehicle_store.clear()
+        self.day_results = []
+        self.start_day_stats()
 
     def run(self):
         """Main loop"""
@@ -996,8 +1427,112 @@ class CNSCCustomSimulation:
 
         pygame.quit()
 
+    def run_headless(self, days=1, sim_dt=HEADLESS_SIM_DT):
+        """
+        Fast-forward the agent model without a window: update() is stepped
+        with a fixed simulated time step (sim_dt seconds) as fast as the CPU
+        allows, until `days` more days have ended.
+        Returns {'days': per-day results, 'summary': summarize_days(...)}.
+        """
+        dt = sim_dt / self.speed
+        first_result = len(self.day_results)
+        last_day = self.current_day + days - 1
+        while self.current_day <= last_day:
+            self.update(dt)
+
+        day_results = self.day_results[first_result:]
+        route_cache = {'hits': self.road_network.cache_hits, 'misses': self.road_network.cache_misses}
+        results = {'days': day_results, 'summary': summarize_days(day_results), 'route_cache': route_cache}
+        if self.profiler is not None:
+            results['profile'] = self.profiler.summary()
+        return results
+
+
+def summarize_days(day_results):
+    """Average the per-day results of run_headless() over all days"""
+    def mean(values):
+        return float(np.mean(values)) if values else 0.0
+
+    zones = []
+    for i, zone in enumerate(day_results[0]['zones'] if day_results else []):
+        per_day = [day['zones'][i] for day in day_results]
+        zones.append({
+            'zone': zone['zone'],
+            'type': zone['type'],
+            'capacity': zone['capacity'],
+            'vehicles_parked_mean': mean([z['vehicles_parked'] for z in per_day]),
+            'mean_occupancy': mean([z['mean_occupancy'] for z in per_day]),
+            'peak_occupancy_max': max(z['peak_occupancy'] for z in per_day),
+            'mean_utilization': mean([z['mean_utilization'] for z in per_day]),
+            'prob_full': mean([z['prob_full'] for z in per_day]),
+            'mean_distance_to_zone': mean([z['mean_distance_to_zone'] for z in per_day if z['vehicles_parked']]),
+        })
+
+    return {
+        'days': len(day_results),
+        'arrivals_mean': mean([day['arrivals'] for day in day_results]),
+        'parked_mean': mean([day['parked'] for day in day_results]),
+        'rejected_mean': mean([day['rejected'] for day in day_results]),
+        'rejected_by_type_mean': {vehicle_type: mean([day['rejected_by_type'][vehicle_type] for day in day_results])
+                                  for vehicle_type in ('motorcycle', 'car', 'truck')},
+        'mean_trip_distance': mean([day['mean_trip_distance'] for day in day_results if day['completed_trips']]),
+        'zones': zones,
+    }
+
+
+def print_headless_summary(summary):
+    print(f"\n{'='*70}")
+    print(f"HEADLESS RUN SUMMARY ({summary['days']} days)")
+    print(f"{'='*70}")
+    print(f"Arrivals per day: {summary['arrivals_mean']:.1f}")
+    print(f"Parked per day:   {summary['parked_mean']:.1f}")
+    print(f"Rejected per day: {summary['rejected_mean']:.1f} "
+          f"(MC:{summary['rejected_by_type_mean']['motorcycle']:.1f}, "
+          f"C:{summary['rejected_by_type_mean']['car']:.1f}, "
+          f"T:{summary['rejected_by_type_mean']['truck']:.1f})")
+    print(f"Mean trip distance: {summary['mean_trip_distance']:.0f} px")
+    print()
+    print(f"{'Zone':<22}{'Type':<12}{'Cap':>5}{'Parked':>8}{'Util%':>8}{'P(Full)':>9}{'Dist':>8}")
+    for zone in summary['zones']:
+        print(f"{zone['zone']:<22}{zone['type']:<12}{zone['capacity']:>5}{zone['vehicles_parked_mean']:>8.1f}"
+              f"{zone['mean_utilization']:>8.1f}{zone['prob_full']:>9.3f}{zone['mean_distance_to_zone']:>8.0f}")
+    print(f"{'='*70}\n")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='CNSC Custom Map Parking Simulation')
+    parser.add_argument('--headless', action='store_true',
+                       help='Run without a window as fast as possible and print per-zone statistics')
+    parser.add_argument('--days', type=int, default=1,
+                       help='Days to simulate in headless mode (default: 1)')
+    parser.add_argument('--sim-dt', type=float, default=HEADLESS_SIM_DT,
+                       help=f'Simulated seconds per step in headless mode (default: {HEADLESS_SIM_DT:g})')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for reproducibility (default: None)')
+    parser.add_argument('--vectorized', action='store_true',
+                       help='Move all vehicles at once with NumPy arrays (same results, faster with many vehicles)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Save headless results to this JSON file')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time update(), draw() and their phases; the summary is printed at the end')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.headless:
+        sim = CNSCCustomSimulation(headless=True, vectorized=args.vectorized, profile=args.profile)
+        results = sim.run_headless(days=args.days, sim_dt=args.sim_dt)
+        print_headless_summary(results['summary'])
+        if sim.profiler is not None:
+            sim.profiler.print_summary(f"PHASE PROFILE ({args.days} days, headless)")
+        print(f"Route cache: {results['route_cache']['hits']} hits, {results['route_cache']['misses']} misses")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"[OK] Headless results saved to: {args.output}")
+        raise SystemExit
+
     print("=" * 70)
     print("CNSC CUSTOM MAP PARKING SIMULATION")
     print("=" * 70)
@@ -1018,5 +1553,7 @@ if __name__ == "__main__":
     print("=" * 70)
 
     # Create and run simulation
-    sim = CNSCCustomSimulation()
+    sim = CNSCCustomSimulation(vectorized=args.vectorized, profile=args.profile)
     sim.run()
+    if sim.profiler is not None:
+        sim.profiler.print_summary()
@@ -0,0 +1,492 @@
+"""
+BENCHMARK SUITE
+===============
+Measures the cost of the simulation code so that performance changes can
+be checked with numbers rather than guesses. Results are printed and saved
+as JSON; pass an earlier JSON file to --compare to see the change.
+
+Benchmarks:
+    engine  - Monte Carlo engine per scenario and engine: iterations/sec,
+              ns per event (arrival, departure or snapshot), export time
+              and peak RSS
+    backend - vectorized engine with the python and numba backends:
+              iterations/sec, plus checks that numba matches python exactly
+              and that both agree statistically with the loop engine
+    agent   - map simulation hot paths: ParkingZone.park_vehicle,
+              RoadNetwork.create_road_path (cold and warm route cache) and
+              one update() step during the morning rush
+    memory  - bytes and creation time per Vehicle record (with its path),
+              and peak traced memory and peak RSS of headless CNSC runs
+    all     - everything above
+
+Scenarios (fixed seed) for the engine benchmark:
+    baseline          - default capacities and arrival rates
+    capacity_10x      - ten times the capacity of every vehicle type
+    heavy_congestion  - HEAVY_CONGESTION_ARRIVAL_RATES
+
+Every engine and headless run happens in a fresh process, so its peak RSS
+is not inflated by the other benchmarks.
+
+Usage:
+    python benchmark_suite.py all
+    python benchmark_suite.py engine --iterations 500 --scenarios baseline heavy_congestion
+    python benchmark_suite.py engine --compare benchmark_results/benchmark_engine_20250101_120000.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Optional: peak RSS (not available on Windows)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+
+import CNSC_CUSTOM_MAP_SIMULATION as cnsc
+import monte_carlo_engine as mc
+
+BENCHMARKS = ['engine', 'backend', 'agent', 'memory', 'all']
+SCENARIOS = ['baseline', 'capacity_10x', 'heavy_congestion']
+TIMING_REPEATS = 5  # timings report the fastest repeat
+
+# Statistical equivalence: means may differ by at most this many standard errors
+EQUIVALENCE_Z = 4.0
+EQUIVALENCE_METRICS = ['arrivals', 'parked', 'rejected', 'peak_occupancy', 'times_full']
+
+# update() is timed from this simulated time on, when the lot fills up
+AGENT_UPDATE_START_HOUR = 7
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown"""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if os.uname().sysname == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def scenario_config(name):
+    """SimulationConfig for one benchmark scenario"""
+    config = mc.SimulationConfig(name=name)
+    if name == 'capacity_10x':
+        return config.replace(mc_capacity=config.mc_capacity * 10, car_capacity=config.car_capacity * 10,
+                              truck_capacity=config.truck_capacity * 10)
+    if name == 'heavy_congestion':
+        return config.replace(hourly_arrival_rates=mc.HEAVY_CONGESTION_ARRIVAL_RATES)
+    if name != 'baseline':
+        raise ValueError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+    return config
+
+
+def best_time(function, repeats=TIMING_REPEATS):
+    """Fastest wall time of `repeats` calls to function()"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def engine_benchmark(scenario='baseline', engine='loop', iterations=200, seed=42):
+    """
+    Run and export one Monte Carlo scenario. An event is one arrival, one
+    departure of a parked vehicle or one occupancy snapshot.
+    """
+    sim = mc.MonteCarloSimulation(num_iterations=iterations, random_seed=seed, engine=engine,
+                                  config=scenario_config(scenario), verbose=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        sim.run()
+        elapsed = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            start = time.perf_counter()
+            sim.export_results(output_dir)
+            export_seconds = time.perf_counter() - start
+
+    events = sum(r.arrivals + r.parked + len(r.time_series) for r in sim.results)
+    stats = sim.calculate_statistics()
+    return {
+        'scenario': scenario,
+        'engine': engine,
+        'iterations': iterations,
+        'seconds': elapsed,
+        'iterations_per_sec': iterations / elapsed,
+        'events': events,
+        'ns_per_event': elapsed / events * 1e9,
+        'export_seconds': export_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+        'probability_full': stats['probability_full'],
+        'rejected_mean': stats['rejected_mean'],
+    }
+
+
+def run_quietly(sim):
+    """sim.run() without the progress output; returns the wall time"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        sim.run()
+        return time.perf_counter() - start
+
+
+def equivalence(results, reference):
+    """
+    metric -> (mean, reference mean, z) for two independent sets of
+    iteration results; |z| < EQUIVALENCE_Z means statistically equivalent
+    """
+    rows = {}
+    for metric in EQUIVALENCE_METRICS:
+        values = np.array([getattr(r, metric) for r in results], dtype=float)
+        reference_values = np.array([getattr(r, metric) for r in reference], dtype=float)
+        standard_error = np.sqrt(values.var(ddof=1) / len(values) + reference_values.var(ddof=1) / len(reference_values))
+        difference = values.mean() - reference_values.mean()
+        z = difference / standard_error if standard_error > 0 else 0.0
+        rows[metric] = (float(values.mean()), float(reference_values.mean()), float(z))
+    return rows
+
+
+def backend_benchmark(iterations=2000, seed=42):
+    """
+    Time the vectorized engine with each backend, check that numba gives
+    exactly the python backend's results, and that both are statistically
+    equivalent to the loop (reference) engine.
+    """
+    def simulation(engine, backend='python', seed=seed):
+        return mc.MonteCarloSimulation(num_iterations=iterations, random_seed=seed, engine=engine,
+                                       backend=backend, verbose=False)
+
+    results = {'iterations': iterations, 'numba_installed': mc.numba is not None}
+    python_sim = simulation('vectorized')
+    results['python_iterations_per_sec'] = iterations / run_quietly(python_sim)
+
+    # The loop engine draws in a different order, so it gets its own seed
+    loop_sim = simulation('loop', seed=seed + 1)
+    run_quietly(loop_sim)
+    results['python_vs_loop'] = equivalence(python_sim.results, loop_sim.results)
+
+    if mc.numba is None:
+        return results
+
+    # First call compiles the kernel (or loads it from Numba's cache)
+    start = time.perf_counter()
+    run_quietly(mc.MonteCarloSimulation(num_iterations=1, random_seed=seed, engine='vectorized',
+                                        backend='numba', verbose=False))
+    results['numba_compile_seconds'] = time.perf_counter() - start
+
+    numba_sim = simulation('vectorized', backend='numba')
+    results['numba_iterations_per_sec'] = iterations / run_quietly(numba_sim)
+    results['numba_identical_to_python'] = all(
+        a.arrivals == b.arrivals and a.parked == b.parked and a.rejected == b.rejected
+        and a.times_full == b.times_full and a.peak_occupancy == b.peak_occupancy
+        and a.peak_utilization == b.peak_utilization and np.array_equal(a.time_series, b.time_series)
+        for a, b in zip(numba_sim.results, python_sim.results)
+    )
+    results['numba_vs_loop'] = equivalence(numba_sim.results, loop_sim.results)
+    return results
+
+
+def agent_benchmark(calls=20000, update_steps=2000, seed=42, vectorized=False):
+    """ns per call of the map simulation's hot paths"""
+    random.seed(seed)
+    results = {'vectorized': vectorized}
+
+    # ParkingZone.park_vehicle: fill the largest zone, then empty it again
+    zone = max((cnsc.ParkingZone(**z) for z in cnsc.PARKING_ZONES), key=lambda z: z.capacity)
+    vehicles = [cnsc.Vehicle(id=i, type=zone.type, arrival_time=0.0, departure_time=3600.0)
+                for i in range(zone.capacity)]
+
+    def fill_zone():
+        for vehicle in vehicles:
+            zone.park_vehicle(vehicle)
+        zone.clear()
+
+    results['park_vehicle_ns'] = best_time(fill_zone) / len(vehicles) * 1e9
+
+    # RoadNetwork.create_road_path: gate -> slot and slot -> gate trips
+    zones = [cnsc.ParkingZone(**z) for z in cnsc.PARKING_ZONES]
+    targets = [z.get_slot_position(slot) for z in zones for slot in z.slot_positions]
+    trips = []
+    for _ in range(calls // 2):
+        target = random.choice(targets)
+        trips += [(cnsc.ENTRY_GATE, target), (target, cnsc.EXIT_GATE)]
+
+    def route_trips(network):
+        for trip_start, trip_end in trips:
+            network.create_road_path(trip_start, trip_end)
+
+    # Cold: every distinct trip once on an empty route cache, so every call is a miss
+    distinct_trips = list(dict.fromkeys(trips))
+    cold_timings = []
+    for _ in range(TIMING_REPEATS):
+        network = cnsc.RoadNetwork(cnsc.ROADS)
+        start = time.perf_counter()
+        for trip_start, trip_end in distinct_trips:
+            network.create_road_path(trip_start, trip_end)
+        cold_timings.append(time.perf_counter() - start)
+    results['create_road_path_cold_ns'] = min(cold_timings) / len(distinct_trips) * 1e9
+    network = cnsc.RoadNetwork(cnsc.ROADS)
+    route_trips(network)
+    results['create_road_path_warm_ns'] = best_time(lambda: route_trips(network)) / len(trips) * 1e9
+
+    # update(): one headless step during the morning rush
+    sim = cnsc.CNSCCustomSimulation(headless=True, vectorized=vectorized)
+    dt = cnsc.HEADLESS_SIM_DT / sim.speed
+    while sim.sim_time < AGENT_UPDATE_START_HOUR * 3600:
+        sim.update(dt)
+    vehicle_steps = 0
+    start = time.perf_counter()
+    for _ in range(update_steps):
+        sim.update(dt)
+        vehicle_steps += len(sim.vehicles)
+    elapsed = time.perf_counter() - start
+    results['update_ns'] = elapsed / update_steps * 1e9
+    results['update_ns_per_vehicle'] = elapsed / max(vehicle_steps, 1) * 1e9
+    results['vehicles_mean'] = vehicle_steps / update_steps
+    return results
+
+
+def record_memory(count=20000, seed=0):
+    """
+    Bytes and creation time per live CNSC Vehicle including its road
+    path, and per Monte Carlo Vehicle. Paths go from the entry gate to
+    every parking slot in turn; the route cache is warmed up first so only
+    per-vehicle memory is counted.
+    """
+    random.seed(seed)
+    network = cnsc.RoadNetwork(cnsc.ROADS)
+    zones = [cnsc.ParkingZone(**zone) for zone in cnsc.PARKING_ZONES]
+    targets = [zone.get_slot_position(slot) for zone in zones for slot in zone.slot_positions]
+    for target in targets:
+        network.create_road_path(cnsc.ENTRY_GATE, target)
+
+    def make_cnsc_vehicles():
+        return [cnsc.Vehicle(id=i, type='car', arrival_time=0.0, departure_time=3600.0,
+                             x=cnsc.ENTRY_GATE[0], y=cnsc.ENTRY_GATE[1],
+                             path=network.create_road_path(cnsc.ENTRY_GATE, targets[i % len(targets)]))
+                for i in range(count)]
+
+    def make_mc_vehicles():
+        return [mc.Vehicle(id=i, type='car', arrival_time=0.0, departure_time=3600.0) for i in range(count)]
+
+    results = {'records': count}
+    for name, make in (('cnsc_vehicle', make_cnsc_vehicles), ('monte_carlo_vehicle', make_mc_vehicles)):
+        results[f'{name}_create_ns'] = best_time(make) / count * 1e9
+
+        tracemalloc.start()
+        records = make()
+        results[f'{name}_bytes'] = tracemalloc.get_traced_memory()[0] / count
+        if name == 'cnsc_vehicle':
+            results['cnsc_waypoints_per_path'] = sum(len(v.path) for v in records) / count
+        del records
+        tracemalloc.stop()
+
+    return results
+
+
+def headless_memory(days=1, seed=42, vectorized=False):
+    """Peak traced memory and peak RSS of a headless CNSC run"""
+    random.seed(seed)
+    sim = cnsc.CNSCCustomSimulation(headless=True, vectorized=vectorized)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    sim.run_headless(days=days)
+    elapsed = time.perf_counter() - start
+    peak_traced = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'days': days,
+        'vectorized': vectorized,
+        'arrivals': sim.total_arrivals,
+        'elapsed_seconds_traced': elapsed,
+        'peak_traced_mb': peak_traced / 1e6,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_isolated(function, **kwargs):
+    """Run one benchmark function in a fresh process (clean peak RSS)"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(function, **kwargs).result()
+
+
+def format_mb(value):
+    return f"{value:.1f} MB" if value is not None else 'n/a'
+
+
+def run_engine_benchmarks(args):
+    runs = []
+    print(f"{'Scenario':<18}{'Engine':<12}{'Iter/s':>10}{'ns/event':>10}{'Export s':>10}{'Peak RSS':>12}")
+    for scenario in args.scenarios:
+        for engine in args.engines:
+            run = run_isolated(engine_benchmark, scenario=scenario, engine=engine,
+                               iterations=args.iterations, seed=args.seed)
+            print(f"{scenario:<18}{engine:<12}{run['iterations_per_sec']:>10.1f}{run['ns_per_event']:>10.0f}"
+                  f"{run['export_seconds']:>10.2f}{format_mb(run['peak_rss_mb']):>12}")
+            runs.append(run)
+    return runs
+
+
+def print_equivalence(label, rows):
+    for metric, (mean, reference_mean, z) in rows.items():
+        status = '[OK]' if abs(z) < EQUIVALENCE_Z else '[--]'
+        print(f"  {status} {label} {metric:<16} {mean:10.3f} vs loop {reference_mean:10.3f} (z = {z:+.2f})")
+
+
+def run_backend_benchmarks(args):
+    run = run_isolated(backend_benchmark, iterations=max(args.iterations, 1000), seed=args.seed)
+    print(f"Vectorized engine, python backend: {run['python_iterations_per_sec']:10.1f} iterations/sec")
+    print_equivalence('python', run['python_vs_loop'])
+    if not run['numba_installed']:
+        print("[--] Numba is not installed (pip install numba), numba backend skipped")
+        return run
+
+    print(f"Vectorized engine, numba backend:  {run['numba_iterations_per_sec']:10.1f} iterations/sec "
+          f"(compile/load {run['numba_compile_seconds']:.1f}s)")
+    if run['numba_identical_to_python']:
+        print("  [OK] numba results identical to the python backend")
+    else:
+        print("  [--] numba results differ from the python backend")
+    print_equivalence('numba', run['numba_vs_loop'])
+    return run
+
+
+def run_agent_benchmarks(args):
+    runs = []
+    for vectorized in (False, True):
+        label = 'vectorized' if vectorized else 'per-vehicle'
+        print(f"Map simulation hot paths ({label})...")
+        run = run_isolated(agent_benchmark, seed=args.seed, vectorized=vectorized)
+        print(f"  ParkingZone.park_vehicle:          {run['park_vehicle_ns']:10.0f} ns")
+        print(f"  create_road_path (cold cache):     {run['create_road_path_cold_ns']:10.0f} ns")
+        print(f"  create_road_path (warm cache):     {run['create_road_path_warm_ns']:10.0f} ns")
+        print(f"  update() step:                     {run['update_ns']:10.0f} ns "
+              f"({run['update_ns_per_vehicle']:.0f} ns per vehicle, {run['vehicles_mean']:.0f} vehicles)")
+        runs.append(run)
+    return runs
+
+
+def run_memory_benchmarks(args):
+    print("Record sizes...")
+    records = record_memory(count=args.records, seed=args.seed)
+    print(f"  CNSC Vehicle + path:  {records['cnsc_vehicle_bytes']:8.0f} bytes, "
+          f"{records['cnsc_vehicle_create_ns']:8.0f} ns to create ({records['cnsc_waypoints_per_path']:.1f} waypoints)")
+    print(f"  Monte Carlo Vehicle:  {records['monte_carlo_vehicle_bytes']:8.0f} bytes, "
+          f"{records['monte_carlo_vehicle_create_ns']:8.0f} ns to create")
+
+    runs = []
+    for vectorized in (False, True):
+        label = 'vectorized' if vectorized else 'per-vehicle'
+        print(f"Headless run, {args.days} day(s), {label}...")
+        run = run_isolated(headless_memory, days=args.days, seed=args.seed, vectorized=vectorized)
+        print(f"  Peak traced memory:   {run['peak_traced_mb']:8.2f} MB")
+        print(f"  Peak RSS:             {format_mb(run['peak_rss_mb']):>11}")
+        runs.append(run)
+
+    return {'records': records, 'headless': runs}
+
+
+BENCHMARK_RUNNERS = {
+    'engine': run_engine_benchmarks,
+    'backend': run_backend_benchmarks,
+    'agent': run_agent_benchmarks,
+    'memory': run_memory_benchmarks,
+}
+
+
+def flatten(results, prefix=''):
+    """{'a': [{'b': 1}]} -> {'a.0.b': 1}, numeric leaves only"""
+    if isinstance(results, dict):
+        items = results.items()
+    elif isinstance(results, list):
+        items = enumerate(results)
+    else:
+        return {prefix: results} if isinstance(results, (int, float)) and not isinstance(results, bool) else {}
+    flat = {}
+    for key, value in items:
+        flat.update(flatten(value, f'{prefix}.{key}' if prefix else str(key)))
+    return flat
+
+
+def print_comparison(previous_file, results):
+    """Print every numeric result next to the same result in an earlier run"""
+    with open(previous_file) as f:
+        previous = flatten(json.load(f)['results'])
+    current = flatten(results)
+    common = [key for key in current if key in previous]
+    if not common:
+        print(f"[--] Nothing to compare with {previous_file}")
+        return
+
+    print(f"\n{'='*70}")
+    print(f"COMPARISON WITH {previous_file}")
+    print(f"{'='*70}")
+    print(f"{'Result':<50}{'Before':>12}{'After':>12}{'Change':>9}")
+    for key in common:
+        before, after = previous[key], current[key]
+        change = f"{(after - before) / before:+.1%}" if before else ''
+        print(f"{key:<50}{before:>12.4g}{after:>12.4g}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parking Simulation Benchmark Suite')
+    parser.add_argument('benchmark', type=str, choices=BENCHMARKS,
+                       help='Benchmark to run')
+    parser.add_argument('--iterations', type=int, default=200,
+                       help='Monte Carlo iterations per engine run (default: 200)')
+    parser.add_argument('--scenarios', type=str, nargs='+', default=SCENARIOS, choices=SCENARIOS,
+                       help=f"Engine benchmark scenarios (default: {' '.join(SCENARIOS)})")
+    parser.add_argument('--engines', type=str, nargs='+', default=list(mc.ENGINES), choices=mc.ENGINES,
+                       help=f"Monte Carlo engines to time (default: {' '.join(mc.ENGINES)})")
+    parser.add_argument('--days', type=int, default=1,
+                       help='Days per headless run (default: 1)')
+    parser.add_argument('--records', type=int, default=20000,
+                       help='Vehicle records for the record size benchmark (default: 20000)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed (default: 42)')
+    parser.add_argument('--output-dir', type=str, default='benchmark_results',
+                       help='Output directory for results (default: benchmark_results)')
+    parser.add_argument('--compare', type=str, default=None,
+                       help='Earlier benchmark JSON file to compare the results with')
+
+    args = parser.parse_args()
+
+    names = list(BENCHMARK_RUNNERS) if args.benchmark == 'all' else [args.benchmark]
+    results = {}
+    for name in names:
+        print(f"\n{'='*70}")
+        print(f"BENCHMARK: {name}")
+        print(f"{'='*70}")
+        results[name] = BENCHMARK_RUNNERS[name](args)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = os.path.join(args.output_dir, f'benchmark_{args.benchmark}_{timestamp}.json')
+    with open(output_file, 'w') as f:
+        json.dump({'benchmark': args.benchmark, 'timestamp': timestamp, 'arguments': vars(args),
+                   'results': results}, f, indent=2)
+    print(f"\n[OK] Benchmark results saved to: {output_file}")
+
+    if args.compare:
+        print_comparison(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
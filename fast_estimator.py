@@ -0,0 +1,324 @@
+"""
+FAST ANALYTICAL ESTIMATOR
+=========================
+Estimates expected occupancy and blocking per vehicle type in tens of
+milliseconds, without Monte Carlo, for quick what-if questions and for
+pruning parameter sweeps before they spend CPU on simulation.
+
+Model (per vehicle type, on a one-minute grid):
+    - Arrivals: time-varying Poisson with the hourly rates, plus Poisson
+      peak-hour batches, split by the vehicle mix - as in the simulation.
+    - Stays: a vehicle leaves at max(arrival + 30 min, U), U uniform on
+      [exit_time_min, exit_time_max] - the same rule as the simulation.
+    - Offered load: mean number of vehicles in an unlimited lot
+      (M_t/G/infinity fluid), which also gives the share of parked
+      vehicles leaving in each minute.
+    - Time-varying Erlang loss system: the distribution of the number of
+      parked vehicles (0 .. capacity) is carried through the day; each
+      minute parked vehicles leave with that share, then arrivals park
+      until the lot is full and the rest are rejected. Long, clock-bound
+      stays make the stationary Erlang B formula a poor fit here, so the
+      transient distribution is used instead.
+    - P(Full) at a snapshot: 1 - prod(1 - P(type k full)) over the vehicle
+      types, averaged over the data collection times like the simulation.
+    - Multi-day runs: each day is estimated from an empty lot with that
+      weekday's arrival scale, and P(Full) is averaged over the days.
+
+Usage:
+    python fast_estimator.py
+    python fast_estimator.py --compare 1000 --seed 42
+    python fast_estimator.py --output estimate_curves.csv
+"""
+
+import numpy as np
+import pandas as pd
+import argparse
+import contextlib
+import io
+import math
+import time
+
+from monte_carlo_engine import MonteCarloSimulation, SimulationConfig
+
+VEHICLE_TYPES = ('motorcycle', 'car', 'truck')
+MIN_STAY_HOURS = 0.5  # same minimum stay as generate_parking_duration
+PMF_TAIL = 1e-12  # probabilities below this are dropped when truncating distributions
+
+
+def poisson_pmf(mean, size):
+    """Poisson probabilities of 0 .. size-1"""
+    k = np.arange(size)
+    if mean <= 0:
+        return (k == 0).astype(float)
+    log_factorial = np.array([math.lgamma(n + 1) for n in range(size)])
+    return np.exp(k * math.log(mean) - mean - log_factorial)
+
+
+def binomial_pmf(n, p):
+    """Binomial(n, p) probabilities of 0 .. n"""
+    return np.array([math.comb(n, j) * p ** j * (1 - p) ** (n - j) for j in range(n + 1)])
+
+
+def truncate(pmf):
+    """Drop the upper tail once less than PMF_TAIL of the probability is left"""
+    return pmf[:max(1, int(np.searchsorted(np.cumsum(pmf), 1 - PMF_TAIL)) + 1)]
+
+
+def arrival_count_pmf(single_mean, batch_mean, batch_pmf):
+    """
+    Distribution of the number of arrivals of one vehicle type in one step:
+    Poisson single arrivals plus a Poisson number of batches, each adding
+    batch_pmf vehicles of this type.
+    """
+    total_mean = single_mean + batch_mean * np.dot(np.arange(len(batch_pmf)), batch_pmf)
+    size = int(total_mean + 12 * math.sqrt(total_mean) + 2 * len(batch_pmf)) + 1
+    batches = poisson_pmf(batch_mean, size)
+    compound = np.zeros(size)
+    batch_sum = np.zeros(size)
+    batch_sum[0] = 1.0
+    for n in range(size):
+        compound += batches[n] * batch_sum
+        if batches[n + 1:].sum() < PMF_TAIL:
+            break
+        batch_sum = np.convolve(batch_sum, batch_pmf)[:size]
+    return truncate(np.convolve(poisson_pmf(single_mean, size), compound)[:size])
+
+
+def thin(occupied, leave_probability, log_factorial):
+    """
+    Occupancy distribution after each parked vehicle independently leaves
+    with leave_probability. Only departure counts with non-negligible
+    probability are computed, so this is cheap for small steps.
+    log_factorial[n] = log(n!) for n up to at least len(occupied) - 1.
+    """
+    size = len(occupied)
+    if leave_probability >= 1:
+        return np.ones(1)
+    expected = (size - 1) * leave_probability
+    most_departures = min(size - 1, int(expected + 12 * math.sqrt(expected) + 4))
+
+    # departures[d, n]: probability that d of n parked vehicles leave
+    n = np.arange(size)
+    d = np.arange(most_departures + 1)[:, None]
+    log_prob = (log_factorial[n] - log_factorial[d] - log_factorial[np.maximum(n - d, 0)]
+                + d * math.log(leave_probability) + (n - d) * math.log1p(-leave_probability))
+    departures = np.exp(np.where(d <= n, log_prob, -np.inf))
+
+    # Occupancy n - d gets occupied[n] * departures[d, n]; read the
+    # diagonals of a row-padded copy through its flattened index
+    row_length = size + most_departures + 1
+    padded = np.zeros((most_departures + 1, row_length))
+    padded[:, :size] = occupied * departures
+    index = n[None, :] + (row_length + 1) * np.arange(most_departures + 1)[:, None]
+    return padded.ravel()[index].sum(axis=0)
+
+
+def estimate_day(config: SimulationConfig, scale=1.0, step_minutes=1.0):
+    """
+    Expected occupancy curves and blocking probabilities for one day of a
+    scenario, starting empty, with arrival rates times scale (see
+    SimulationConfig.arrival_scale). Returns per-step curves (arrays with
+    one column per vehicle type), daily totals and the day's P(Full).
+    """
+    dt = step_minutes / 60.0  # hours
+    times = np.arange(config.start_hour, config.end_hour, dt)  # hours of day
+    hours = np.floor(times).astype(int)
+    num_steps = len(times)
+
+    # Arrival rates (vehicles per hour): Poisson singles plus peak-hour batches
+    arriving = hours < config.arrival_end_hour
+    single_rate = np.array([config.hourly_arrival_rates.get(h, 5) for h in hours], dtype=float) * arriving * scale
+    batch_rate = min(config.prob_batch_arrival * scale, 1.0) * 60 * np.isin(hours, config.peak_hours) * arriving
+    sizes = np.arange(config.batch_size_min, config.batch_size_max + 1)
+    arrivals_per_step = (single_rate + batch_rate * sizes.mean()) * dt
+    mix = np.array([config.prob_motorcycle, config.prob_car, config.prob_truck])
+
+    # survival[s, t]: probability that a vehicle arriving during step s is
+    # still parked at the start of step t
+    arrival_times = times + dt / 2
+    exit_window = config.exit_time_max - config.exit_time_min
+    still_before_exit = np.clip((config.exit_time_max - times) / exit_window, 0.0, 1.0)
+    survival = np.where(times[None, :] < arrival_times[:, None] + MIN_STAY_HOURS, 1.0, still_before_exit[None, :])
+    survival[times[None, :] < arrival_times[:, None]] = 0.0
+
+    # Fluid model of an unlimited lot: offered load at the start of each
+    # step and the share of parked vehicles leaving during it
+    offered = arrivals_per_step @ survival
+    staying = offered[1:] - arrivals_per_step[:-1] * np.diag(survival, 1)
+    leave_share = np.zeros(num_steps)
+    leave_share[:-1] = 1 - np.clip(staying / np.maximum(offered[:-1], 1e-12), 0.0, 1.0)
+    leave_share[leave_share < PMF_TAIL] = 0.0
+
+    # Loss system per type: distribution of occupancy 0..capacity at the
+    # start of each step, advanced by departures then arrivals (arrivals
+    # that do not fit are rejected)
+    capacities = config.capacities
+    occupancy = np.zeros((num_steps, 3))
+    prob_full = np.zeros((num_steps, 3))
+    rejected = np.zeros(3)
+    log_factorial = np.array([math.lgamma(n + 1) for n in range(int(capacities.max()) + 1)])
+    batch_size_pmf = np.zeros(sizes[-1] + 1)
+    batch_size_pmf[sizes] = 1.0 / len(sizes)
+    for k in range(3):
+        capacity = int(capacities[k])
+        # Vehicles in a batch pick their type independently
+        type_pmf = sum(batch_size_pmf[size] * np.pad(binomial_pmf(size, mix[k]), (0, sizes[-1] - size))
+                       for size in sizes)
+        arrival_pmfs = {}
+        # occupied[n] = P(n parked); the array only grows as far as the
+        # distribution reaches, and index `capacity` means full
+        occupied = np.ones(1)
+        for step in range(num_steps):
+            occupancy[step, k] = np.dot(np.arange(len(occupied)), occupied)
+            prob_full[step, k] = occupied[capacity] if len(occupied) > capacity else 0.0
+            if leave_share[step] > 0:
+                occupied = thin(occupied, leave_share[step], log_factorial)
+            rates = (single_rate[step] * mix[k] * dt, batch_rate[step] * dt)
+            if rates == (0.0, 0.0):
+                continue
+            if rates not in arrival_pmfs:
+                arrival_pmfs[rates] = arrival_count_pmf(rates[0], rates[1], type_pmf)
+            combined = np.convolve(occupied, arrival_pmfs[rates])
+            if len(combined) > capacity + 1:
+                overflow = combined[capacity:]
+                rejected[k] += np.dot(np.arange(len(overflow)), overflow)
+                combined = combined[:capacity + 1]
+                combined[capacity] = overflow.sum()
+            occupied = combined[:int(np.flatnonzero(combined > PMF_TAIL)[-1]) + 1]
+
+    offered_load = offered[:, None] * mix[None, :]
+    prob_any_full = 1 - np.prod(1 - prob_full, axis=1)
+
+    # Average over the same data collection times as the simulation
+    collection_hours = config.start_hour + np.arange(config.num_time_slots) * config.data_collection_interval / 3600.0
+    collection_index = np.minimum(np.round((collection_hours - config.start_hour) / dt).astype(int), num_steps - 1)
+
+    return {
+        'times': times,
+        'offered_load': offered_load,
+        'prob_full': prob_full,
+        'occupancy': occupancy,
+        'prob_any_full': prob_any_full,
+        'probability_full': float(prob_any_full[collection_index].mean()),
+        'arrivals_mean': float(arrivals_per_step.sum()),
+        'rejected_mean': float(rejected.sum()),
+        'rejected_by_type': dict(zip(VEHICLE_TYPES, rejected.tolist())),
+        'peak_prob_full_by_type': dict(zip(VEHICLE_TYPES, prob_full.max(axis=0).tolist())),
+        'peak_expected_occupancy': float(occupancy.sum(axis=1).max()),
+    }
+
+
+def estimate(config: SimulationConfig = None, step_minutes=1.0):
+    """
+    Expected occupancy curves and blocking probabilities for one scenario,
+    over its config.days days with their weekday arrival scales. Each day
+    is estimated from an empty lot (overnight stayers are not carried
+    over). Curves and P(Full) are averaged over the days; arrivals and
+    rejections are totals per iteration, like the simulation's.
+    """
+    start = time.perf_counter()
+    config = config or SimulationConfig()
+    by_scale = {}
+    days = []
+    for day in range(config.days):
+        scale = config.arrival_scale(day)
+        if scale not in by_scale:
+            by_scale[scale] = estimate_day(config, scale, step_minutes)
+        days.append(by_scale[scale])
+
+    result = {'times': days[0]['times']}
+    for curve in ('offered_load', 'prob_full', 'occupancy', 'prob_any_full'):
+        result[curve] = np.mean([day[curve] for day in days], axis=0)
+    result.update(
+        probability_full=float(np.mean([day['probability_full'] for day in days])),
+        arrivals_mean=float(sum(day['arrivals_mean'] for day in days)),
+        rejected_mean=float(sum(day['rejected_mean'] for day in days)),
+        rejected_by_type={vehicle_type: sum(day['rejected_by_type'][vehicle_type] for day in days)
+                          for vehicle_type in VEHICLE_TYPES},
+        peak_prob_full_by_type={vehicle_type: max(day['peak_prob_full_by_type'][vehicle_type] for day in days)
+                                for vehicle_type in VEHICLE_TYPES},
+        peak_expected_occupancy=max(day['peak_expected_occupancy'] for day in days),
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+    )
+    return result
+
+
+def curves_table(result):
+    """Per-minute curves as a DataFrame (time, then offered load/P(full)/expected occupancy per type)"""
+    minutes = np.round(result['times'] * 60).astype(int)
+    table = {'time': [f"{m // 60:02d}:{m % 60:02d}" for m in minutes]}
+    for k, vehicle_type in enumerate(VEHICLE_TYPES):
+        table[f'{vehicle_type}_offered_load'] = result['offered_load'][:, k]
+        table[f'{vehicle_type}_prob_full'] = result['prob_full'][:, k]
+        table[f'{vehicle_type}_expected_occupancy'] = result['occupancy'][:, k]
+    table['prob_any_full'] = result['prob_any_full']
+    return pd.DataFrame(table)
+
+
+def compare_with_simulation(config: SimulationConfig = None, iterations=1000, seed=None, engine='vectorized'):
+    """Estimator vs a Monte Carlo run of the same scenario: estimates, simulated values and differences"""
+    config = config or SimulationConfig()
+    result = estimate(config)
+    sim = MonteCarloSimulation(num_iterations=iterations, random_seed=seed, engine=engine,
+                               keep_results=False, config=config, verbose=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.run()
+    stats = sim.calculate_statistics()
+    comparison = {}
+    for metric in ('probability_full', 'arrivals_mean', 'rejected_mean'):
+        comparison[metric] = {'estimate': result[metric], 'simulated': stats[metric],
+                              'difference': result[metric] - stats[metric]}
+    return comparison
+
+
+def print_estimate(config, result):
+    print(f"\n{'='*70}")
+    print(f"FAST ESTIMATE: {config.name} ({result['elapsed_ms']:.1f} ms)")
+    print(f"{'='*70}")
+    print(f"Capacity: MC={config.mc_capacity}, Cars={config.car_capacity}, Trucks={config.truck_capacity}")
+    period = 'per day' if config.days == 1 else f'over {config.days} days'
+    print(f"Expected arrivals {period}: {result['arrivals_mean']:.1f}")
+    print(f"Expected rejections {period}: {result['rejected_mean']:.1f}")
+    print(f"Peak expected occupancy: {result['peak_expected_occupancy']:.1f}")
+    print(f"Estimated P(Full): {result['probability_full']:.4f}")
+    print()
+    print(f"{'Type':<12}{'Peak P(full)':>15}{'Rejected':>15}")
+    for vehicle_type in VEHICLE_TYPES:
+        print(f"{vehicle_type:<12}{result['peak_prob_full_by_type'][vehicle_type]:>15.3f}"
+              f"{result['rejected_by_type'][vehicle_type]:>15.1f}")
+    print(f"{'='*70}\n")
+
+
+def print_comparison(comparison):
+    print(f"{'Metric':<20}{'Estimate':>12}{'Simulated':>12}{'Difference':>12}")
+    for metric, row in comparison.items():
+        print(f"{metric:<20}{row['estimate']:>12.4f}{row['simulated']:>12.4f}{row['difference']:>+12.4f}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fast Analytical Parking Estimator')
+    parser.add_argument('--compare', type=int, default=0, metavar='ITERATIONS',
+                       help='Also run this many Monte Carlo iterations and report the differences (default: 0)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for --compare (default: None)')
+    parser.add_argument('--output', type=str, default=None,
+                       help='Save the per-minute occupancy and blocking curves to this CSV file')
+
+    args = parser.parse_args()
+
+    config = SimulationConfig()
+    result = estimate(config)
+    print_estimate(config, result)
+
+    if args.output:
+        curves_table(result).to_csv(args.output, index=False)
+        print(f"[OK] Estimated curves saved to: {args.output}")
+
+    if args.compare:
+        print(f"Comparing with {args.compare} Monte Carlo iterations...")
+        print_comparison(compare_with_simulation(config, iterations=args.compare, seed=args.seed))
+
+
+if __name__ == '__main__':
+    main()
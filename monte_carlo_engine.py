@@ -5,17 +5,73 @@ This is the TRUE Monte Carlo simulation for the manuscript.
 Runs 1,000-10,000 iterations without visualization.
 Implements actual statistical analysis using Poisson distributions.
 
+Two engines are available:
+    loop        - reference engine, discrete-event simulation per iteration
+    vectorized  - runs whole batches of iterations as NumPy arrays
+
+The vectorized engine's time-step loop can also run as a Numba-compiled
+kernel (--backend numba, optional dependency) with identical results.
+
+Iterations are split into fixed-size blocks, each with its own random
+stream spawned from one SeedSequence, so blocks can run on several worker
+processes and a given --seed gives the same results for any --workers.
+
+Because a block's stream depends only on the seed and the block number,
+long runs can checkpoint the finished blocks (--checkpoint) and continue
+after an interruption (--resume) with exactly the same final output.
+
+Opt-in variance reduction (--variance-reduction antithetic, stratified or
+lhs) samples iterations in correlated groups and reports the effective
+sample size, i.e. how many plain iterations the same precision would take.
+
+All scenario parameters (capacities, arrival rates, vehicle mix, ...) are
+held in a SimulationConfig, which defaults to the constants below. Use
+parameter_sweep.py to run many configurations in one go.
+
 Usage:
     python monte_carlo_engine.py --iterations 1000 --days 5
+    python monte_carlo_engine.py --iterations 10000 --engine vectorized
+    python monte_carlo_engine.py --iterations 10000 --engine vectorized --workers 8
+    python monte_carlo_engine.py --iterations 100000 --engine vectorized --backend numba
+    python monte_carlo_engine.py --iterations 2000 --engine vectorized --variance-reduction antithetic
+    python monte_carlo_engine.py --iterations 50000 --engine vectorized --checkpoint
+    python monte_carlo_engine.py --iterations 50000 --engine vectorized --resume
 """
 
 import numpy as np
 import pandas as pd
-from dataclasses import dataclass, field
+import dataclasses
+from dataclasses import dataclass, field, fields
 from typing import List, Dict
 import json
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import cProfile
+import glob
+import heapq
+import itertools
+import math
+import os
+import pickle
+import pstats
+import sys
+import time
+
+# Optional: columnar output (--format parquet)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Optional: compiled occupancy kernel for the vectorized engine (--backend numba)
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from phase_profiler import PhaseProfiler
 
 # Import configuration from main simulation
 try:
@@ -54,11 +110,13 @@ HOURLY_ARRIVAL_RATES = {
     17: 2,   # Almost closing
 }
 
-# ALTERNATIVE: If you observed higher congestion, use these instead:
-# HOURLY_ARRIVAL_RATES = {
-#     6: 15, 7: 100, 8: 40, 9: 25, 10: 15, 11: 10,
-#     12: 60, 13: 30, 14: 15, 15: 8, 16: 5, 17: 2,
-# }
+# ALTERNATIVE: If you observed higher congestion, use these instead
+# (uncomment the last line)
+HEAVY_CONGESTION_ARRIVAL_RATES = {
+    6: 15, 7: 100, 8: 40, 9: 25, 10: 15, 11: 10,
+    12: 60, 13: 30, 14: 15, 15: 8, 16: 5, 17: 2,
+}
+# HOURLY_ARRIVAL_RATES = HEAVY_CONGESTION_ARRIVAL_RATES
 
 # Vehicle distribution (76% MC, 20% Car, 4% Truck)
 PROB_MOTORCYCLE = 0.76
@@ -76,6 +134,12 @@ BATCH_SIZE_MAX = 6
 # Search and rejection
 MAX_SEARCH_ATTEMPTS = 4
 CIRCLING_TIMEOUT = 300  # seconds
+# Circling (off by default: a vehicle finding its type full is rejected at once).
+# When on, it circles and tries again, with this chance per second as in the
+# pygame model, until it parks, has failed MAX_SEARCH_ATTEMPTS times, or waits
+# longer than CIRCLING_TIMEOUT for its next try.
+CIRCLING = False
+CIRCLING_RETRY_RATE = 0.03
 
 # Parking duration: exit between 3:00 PM (15.0) and 6:30 PM (18.5)
 EXIT_TIME_MIN = 15.0
@@ -84,13 +148,161 @@ EXIT_TIME_MAX = 18.5
 # Simulation time
 START_HOUR = 6
 END_HOUR = 19
-SIMULATION_TIME_STEP = 60  # seconds (1 minute intervals)
+ARRIVAL_END_HOUR = 17  # No new arrivals from 5:00 PM onwards
+SIMULATION_TIME_STEP = 60  # seconds (1 minute intervals); None = continuous time (loop engine only)
 
 # Data collection interval (10-15 minutes as per manuscript)
 DATA_COLLECTION_INTERVAL = 600  # 10 minutes in seconds
 
+# Multi-day runs (--days): consecutive days share the lot, so overnight
+# stayers are still parked the next morning
+SIMULATION_DAYS = 1
+FIRST_WEEKDAY = 0  # weekday of day 1 (0 = Monday)
+WEEKDAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+# Arrival rates (and batch arrivals) on each weekday, relative to HOURLY_ARRIVAL_RATES
+WEEKDAY_ARRIVAL_SCALE = [1.0, 1.0, 1.0, 1.0, 1.0, 0.5, 0.1]
+# Share of arriving vehicles that stay overnight and leave in the next day's exit window
+# (multi-day runs only; a single day always ends with the lot emptying)
+PROB_OVERNIGHT = 0.02
+SECONDS_PER_DAY = 24 * 3600
+
+# Engines
+ENGINES = ('loop', 'vectorized')
+
+# Backends for the vectorized engine's time-step loop: NumPy arrays or a Numba-compiled kernel
+BACKENDS = ('python', 'numba')
+
+# Phases timed by --profile: phase -> MonteCarloSimulation methods
+PROFILE_PHASES = {
+    'iteration': ['run_single_iteration'],
+    'vectorized_batch': ['run_vectorized_batch'],
+    'arrivals': ['generate_arrivals_poisson', 'generate_arrival_groups'],
+    'parking': ['can_park', 'park_vehicle'],
+    'departures': ['remove_vehicle'],
+    'snapshots': ['record_snapshot'],
+    'export': ['export_results'],
+}
+
+PROFILE_TOP_FUNCTIONS = 20  # functions listed from the --profile-iteration cProfile stats
+
+# Event types for the loop engine, in the order they are handled at equal times
+EVENT_ARRIVAL = 0
+EVENT_DEPARTURE = 1
+EVENT_RETRY = 2
+EVENT_COLLECTION = 3
+
 
 @dataclass
+class SimulationConfig:
+    """
+    All parameters of one parking scenario.
+    Defaults are read from the module-level constants above when the config
+    is created, so editing those constants still changes the default run.
+    """
+    name: str = 'baseline'
+    mc_capacity: int = field(default_factory=lambda: TOTAL_MC_CAPACITY)
+    car_capacity: int = field(default_factory=lambda: TOTAL_CAR_CAPACITY)
+    truck_capacity: int = field(default_factory=lambda: TOTAL_TRUCK_CAPACITY)
+    hourly_arrival_rates: Dict[int, float] = field(default_factory=lambda: dict(HOURLY_ARRIVAL_RATES))
+    prob_motorcycle: float = field(default_factory=lambda: PROB_MOTORCYCLE)
+    prob_car: float = field(default_factory=lambda: PROB_CAR)
+    prob_truck: float = field(default_factory=lambda: PROB_TRUCK)
+    peak_hours: List[int] = field(default_factory=lambda: list(PEAK_HOURS))
+    prob_batch_arrival: float = field(default_factory=lambda: PROB_BATCH_ARRIVAL)
+    batch_size_min: int = field(default_factory=lambda: BATCH_SIZE_MIN)
+    batch_size_max: int = field(default_factory=lambda: BATCH_SIZE_MAX)
+    max_search_attempts: int = field(default_factory=lambda: MAX_SEARCH_ATTEMPTS)
+    circling_timeout: float = field(default_factory=lambda: CIRCLING_TIMEOUT)
+    circling: bool = field(default_factory=lambda: CIRCLING)
+    circling_retry_rate: float = field(default_factory=lambda: CIRCLING_RETRY_RATE)
+    exit_time_min: float = field(default_factory=lambda: EXIT_TIME_MIN)
+    exit_time_max: float = field(default_factory=lambda: EXIT_TIME_MAX)
+    start_hour: int = field(default_factory=lambda: START_HOUR)
+    end_hour: int = field(default_factory=lambda: END_HOUR)
+    arrival_end_hour: int = field(default_factory=lambda: ARRIVAL_END_HOUR)
+    time_step: float = field(default_factory=lambda: SIMULATION_TIME_STEP)
+    data_collection_interval: float = field(default_factory=lambda: DATA_COLLECTION_INTERVAL)
+    days: int = field(default_factory=lambda: SIMULATION_DAYS)
+    first_weekday: int = field(default_factory=lambda: FIRST_WEEKDAY)
+    weekday_arrival_scale: List[float] = field(default_factory=lambda: list(WEEKDAY_ARRIVAL_SCALE))
+    prob_overnight: float = field(default_factory=lambda: PROB_OVERNIGHT)
+
+    @property
+    def total_capacity(self):
+        return self.mc_capacity + self.car_capacity + self.truck_capacity
+
+    @property
+    def capacities(self):
+        """Capacities in vehicle type index order (motorcycle, car, truck)"""
+        return np.array([self.mc_capacity, self.car_capacity, self.truck_capacity])
+
+    @property
+    def num_time_slots(self):
+        """Data collections per day"""
+        return math.ceil((self.end_hour - self.start_hour) * 3600 / self.data_collection_interval)
+
+    def weekday(self, day):
+        """Weekday (0 = Monday) of day number `day` (0 = first day)"""
+        return (self.first_weekday + day) % 7
+
+    def arrival_scale(self, day):
+        """Arrival rate multiplier for day number `day`"""
+        return self.weekday_arrival_scale[self.weekday(day)]
+
+    def replace(self, **overrides):
+        """Copy of this config with some parameters changed"""
+        unknown = set(overrides) - {f.name for f in fields(self)}
+        if unknown:
+            raise ValueError(f"Unknown simulation parameter(s): {', '.join(sorted(unknown))}")
+        if 'hourly_arrival_rates' in overrides:
+            # JSON/YAML keys arrive as strings
+            overrides['hourly_arrival_rates'] = {int(h): r for h, r in overrides['hourly_arrival_rates'].items()}
+        return dataclasses.replace(self, **overrides)
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+
+# Time series: one structured record per data collection
+TIME_SERIES_DTYPE = np.dtype([('time', np.float64), ('mc', np.int32), ('car', np.int32), ('truck', np.int32)])
+
+# Per-day totals of one iteration; carried_over = vehicles still parked from the day before
+DAILY_METRICS = ('arrivals', 'parked', 'rejected', 'peak_occupancy', 'times_full', 'carried_over')
+# Weekly totals (peak_occupancy is the week's highest)
+WEEKLY_METRICS = ('arrivals', 'parked', 'rejected', 'peak_occupancy', 'times_full')
+DAILY_DTYPE = np.dtype([('day', np.int32)] + [(name, np.int32) for name in DAILY_METRICS])
+
+# Iterations per random-stream block (also the vectorized engine's batch size).
+# Changing this changes which random numbers each iteration gets.
+ITERATION_BLOCK_SIZE = 250
+
+# Adaptive stopping (--tolerance): metrics whose 95% CI must be tight enough
+ADAPTIVE_METRICS = ('probability_full', 'rejected_mean')
+ADAPTIVE_MIN_ITERATIONS = 500  # never stop before this, the CI estimate itself is noisy early on
+CONFIDENCE_Z = 1.96  # normal quantile for a 95% confidence interval
+
+# Variance reduction for the vectorized engine (--variance-reduction), off by default:
+#   antithetic  - iterations run in pairs, the second using 1 - u for every uniform
+#                 behind its arrival counts, batch arrivals, vehicle types and exit times
+#   stratified  - each day's total arrivals are stratified over a group of iterations
+#   lhs         - Latin hypercube over each day's hourly arrival totals
+VARIANCE_REDUCTION_MODES = ('antithetic', 'stratified', 'lhs')
+# Iterations per independent group (must divide ITERATION_BLOCK_SIZE). Iterations
+# within a group are correlated by design, so CIs and effective sample sizes
+# are computed from the group means.
+VARIANCE_REDUCTION_GROUP_SIZE = {'antithetic': 2, 'stratified': 50, 'lhs': 50}
+# Metrics whose effective sample size is reported
+VARIANCE_REDUCTION_METRICS = ('probability_full', 'arrivals_mean', 'rejected_mean', 'peak_occupancy_mean')
+
+# Checkpointing (--checkpoint / --resume)
+CHECKPOINT_INTERVAL = 60  # seconds between checkpoints
+CHECKPOINT_VERSION = 3  # bump when the checkpoint contents change
+
+# dataclass(slots=True) needs Python 3.10+; older versions keep a per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**DATACLASS_SLOTS)
 class Vehicle:
     """Simplified vehicle for Monte Carlo (no graphics needed)"""
     id: int
@@ -103,13 +315,14 @@ class Vehicle:
     parking_zone_type: str = None  # Which zone type it parked in
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class SimulationState:
     """State of parking at a given time"""
     time: float  # seconds from start of day
     mc_occupied: int = 0
     car_occupied: int = 0
     truck_occupied: int = 0
+    config: SimulationConfig = field(default_factory=SimulationConfig, repr=False)
 
     @property
     def total_occupied(self):
@@ -117,34 +330,38 @@ class SimulationState:
 
     @property
     def utilization_percent(self):
-        return (self.total_occupied / TOTAL_CAPACITY * 100) if TOTAL_CAPACITY > 0 else 0
+        capacity = self.config.total_capacity
+        return (self.total_occupied / capacity * 100) if capacity > 0 else 0
 
     @property
     def mc_utilization(self):
-        return (self.mc_occupied / TOTAL_MC_CAPACITY * 100) if TOTAL_MC_CAPACITY > 0 else 0
+        capacity = self.config.mc_capacity
+        return (self.mc_occupied / capacity * 100) if capacity > 0 else 0
 
     @property
     def car_utilization(self):
-        return (self.car_occupied / TOTAL_CAR_CAPACITY * 100) if TOTAL_CAR_CAPACITY > 0 else 0
+        capacity = self.config.car_capacity
+        return (self.car_occupied / capacity * 100) if capacity > 0 else 0
 
     @property
     def truck_utilization(self):
-        return (self.truck_occupied / TOTAL_TRUCK_CAPACITY * 100) if TOTAL_TRUCK_CAPACITY > 0 else 0
+        capacity = self.config.truck_capacity
+        return (self.truck_occupied / capacity * 100) if capacity > 0 else 0
 
     def is_full(self):
         """Check if ANY vehicle type has reached capacity"""
-        return (self.mc_occupied >= TOTAL_MC_CAPACITY or
-                self.car_occupied >= TOTAL_CAR_CAPACITY or
-                self.truck_occupied >= TOTAL_TRUCK_CAPACITY)
+        return (self.mc_occupied >= self.config.mc_capacity or
+                self.car_occupied >= self.config.car_capacity or
+                self.truck_occupied >= self.config.truck_capacity)
 
     def is_completely_full(self):
         """Check if ALL parking is completely full"""
-        return (self.mc_occupied >= TOTAL_MC_CAPACITY and
-                self.car_occupied >= TOTAL_CAR_CAPACITY and
-                self.truck_occupied >= TOTAL_TRUCK_CAPACITY)
+        return (self.mc_occupied >= self.config.mc_capacity and
+                self.car_occupied >= self.config.car_capacity and
+                self.truck_occupied >= self.config.truck_capacity)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class IterationResult:
     """Results from a single Monte Carlo iteration"""
     iteration: int
@@ -154,7 +371,8 @@ class IterationResult:
     peak_occupancy: int = 0
     peak_utilization: float = 0.0
     times_full: int = 0  # Number of time intervals when parking was full
-    time_series: List[SimulationState] = field(default_factory=list)
+    # Structured array of TIME_SERIES_DTYPE records (time, mc, car, truck)
+    time_series: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=TIME_SERIES_DTYPE))
 
     # Per vehicle type statistics
     mc_arrivals: int = 0
@@ -164,53 +382,855 @@ class IterationResult:
     car_rejected: int = 0
     truck_rejected: int = 0
 
+    # One DAILY_DTYPE record per simulated day
+    daily: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=DAILY_DTYPE))
+
+    # Circling (config.circling): vehicles that found their type full on
+    # arrival, those of them that parked on a later try, and their waits (seconds)
+    circled: int = 0
+    parked_after_circling: int = 0
+    circling_waits: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+
+
+def format_time_str(seconds):
+    """HH:MM label used to group snapshots by time of day ('Dnn HH:MM' after the first day)"""
+    day, seconds = divmod(seconds, SECONDS_PER_DAY)
+    hour = seconds / 3600.0
+    label = f"{int(hour):02d}:{int((hour % 1) * 60):02d}"
+    return f"D{int(day) + 1:02d} {label}" if day else label
+
+
+def daily_records(time_series, day_totals, carried_over, config: SimulationConfig = None):
+    """
+    DAILY_DTYPE records for one iteration. day_totals is (days x 3):
+    arrivals, parked and rejected per day; carried_over the vehicles parked
+    at the start of each day. Peaks and full counts come from the time series.
+    """
+    config = config or SimulationConfig()
+    days = len(day_totals)
+    daily = np.zeros(days, dtype=DAILY_DTYPE)
+    daily['day'] = np.arange(days)
+    daily['arrivals'], daily['parked'], daily['rejected'] = np.asarray(day_totals).T
+    daily['carried_over'] = carried_over
+
+    day = ((time_series['time'] - config.start_hour * 3600) // SECONDS_PER_DAY).astype(int)
+    total = time_series['mc'] + time_series['car'] + time_series['truck']
+    full = ((time_series['mc'] >= config.mc_capacity) | (time_series['car'] >= config.car_capacity) |
+            (time_series['truck'] >= config.truck_capacity))
+    np.maximum.at(daily['peak_occupancy'], day, total)
+    daily['times_full'] = np.bincount(day, weights=full, minlength=days)[:days]
+    return daily
+
+
+def time_series_columns(time_series, config: SimulationConfig = None):
+    """
+    Derived time series columns (utilization, is_full, ...) for a whole
+    TIME_SERIES_DTYPE array at once, in the time series CSV column order.
+    """
+    config = config or SimulationConfig()
+    mc = time_series['mc']
+    car = time_series['car']
+    truck = time_series['truck']
+    total = mc + car + truck
+
+    def percent(occupied, capacity):
+        return occupied / capacity * 100 if capacity > 0 else np.zeros(occupied.shape)
+
+    times = time_series['time']
+    unique_times, inverse = np.unique(times.ravel(), return_inverse=True)
+    labels = np.array([format_time_str(t) for t in unique_times], dtype=object)
+
+    return {
+        'hour': times / 3600.0,
+        'time_str': labels[inverse].reshape(times.shape),
+        'total_occupied': total,
+        'utilization_percent': percent(total, config.total_capacity),
+        'mc_occupied': mc,
+        'car_occupied': car,
+        'truck_occupied': truck,
+        'mc_utilization': percent(mc, config.mc_capacity),
+        'car_utilization': percent(car, config.car_capacity),
+        'truck_utilization': percent(truck, config.truck_capacity),
+        'is_full': ((mc >= config.mc_capacity) | (car >= config.car_capacity) |
+                    (truck >= config.truck_capacity)),
+    }
+
+
+def concatenate_time_series(results):
+    """All snapshots of the given iterations as one array, plus matching iteration numbers"""
+    if not results:
+        return np.zeros(0, dtype=TIME_SERIES_DTYPE), np.zeros(0, dtype=np.int64)
+    time_series = np.concatenate([r.time_series for r in results])
+    iterations = np.repeat([r.iteration for r in results], [len(r.time_series) for r in results])
+    return time_series, iterations
+
+
+class RunningStat:
+    """Running mean/variance (Welford) with min and max; mergeable"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @classmethod
+    def from_values(cls, values):
+        """Summary of a whole array of values, ready to be merged"""
+        stat = cls()
+        if len(values) > 0:
+            stat.count = len(values)
+            stat.mean = float(values.mean())
+            stat.m2 = float(((values - stat.mean) ** 2).sum())
+            stat.min = values.min().item()
+            stat.max = values.max().item()
+        return stat
+
+    def merge(self, other):
+        """Combine with another RunningStat (Chan et al. parallel update)"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def std(self, ddof=0):
+        if self.count - ddof <= 0:
+            return float('nan')
+        return math.sqrt(max(self.m2, 0.0) / (self.count - ddof))
+
+
+class IntegerHistogram:
+    """
+    Mergeable quantile sketch for integer-valued metrics.
+    Keeps one counter per distinct value, so percentiles are exact (same
+    linear interpolation as np.percentile) while memory depends only on
+    the range of values, not the number of iterations.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+
+    def add(self, value):
+        self.counts[value] = self.counts.get(value, 0) + 1
+        self.total += 1
+
+    def add_many(self, values):
+        for value, count in zip(*np.unique(values, return_counts=True)):
+            value = value.item()
+            self.counts[value] = self.counts.get(value, 0) + int(count)
+        self.total += len(values)
+
+    def merge(self, other):
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.total += other.total
+
+    def _value_at(self, rank, values, cumulative):
+        return values[np.searchsorted(cumulative, rank, side='right')]
+
+    def percentile(self, q):
+        if self.total == 0:
+            return float('nan')
+        values = sorted(self.counts)
+        cumulative = np.cumsum([self.counts[v] for v in values])
+        position = (self.total - 1) * q / 100.0
+        lower = math.floor(position)
+        low_value = self._value_at(lower, values, cumulative)
+        high_value = self._value_at(min(lower + 1, self.total - 1), values, cumulative)
+        return low_value + (high_value - low_value) * (position - lower)
+
+
+class StreamingStatistics:
+    """
+    Constant-memory accumulator for calculate_statistics() and the
+    hourly-averages table. Memory grows with the number of time slots,
+    not the number of iterations, and partial results from different
+    blocks or workers can be merged.
+    """
+
+    ITERATION_METRICS = ('arrivals', 'parked', 'rejected', 'peak_occupancy', 'peak_utilization', 'times_full',
+                         'circled', 'parked_after_circling')
+    QUANTILE_METRICS = ('arrivals', 'parked', 'rejected')
+    SLOT_METRICS = ('total_occupied', 'utilization_percent', 'mc_occupied', 'car_occupied', 'truck_occupied')
+
+    def __init__(self, config: SimulationConfig = None, group_size=1):
+        self.config = config or SimulationConfig()
+        self.group_size = group_size
+        self.iterations = 0
+        self.total_observations = 0
+        self.total_full_observations = 0
+        self.metrics = {name: RunningStat() for name in self.ITERATION_METRICS}
+        self.quantiles = {name: IntegerHistogram() for name in self.QUANTILE_METRICS}
+        # Means of each group of group_size iterations (variance reduction only)
+        self.group_metrics = {name: RunningStat() for name in self.ITERATION_METRICS} if group_size > 1 else {}
+        # time_str -> {metric: RunningStat}, plus 'is_full' -> [full count, observations]
+        self.slots = {}
+        # day / week number -> {metric: RunningStat} (multi-day runs)
+        self.days = {}
+        self.weeks = {}
+        # Waits (seconds) of all vehicles that parked after circling
+        self.circling_wait = RunningStat()
+        self.circling_wait_quantiles = IntegerHistogram()
+
+    def add(self, result: IterationResult):
+        self.add_many([result])
+
+    def add_many(self, results: List[IterationResult]):
+        """Fold a block of iterations in with array operations"""
+        if not results:
+            return
+        self.iterations += len(results)
+        if self.group_metrics:
+            # Groups never span blocks, since group_size divides ITERATION_BLOCK_SIZE
+            _, starts, sizes = np.unique([r.iteration // self.group_size for r in results],
+                                         return_index=True, return_counts=True)
+        for name in self.ITERATION_METRICS:
+            values = np.array([getattr(r, name) for r in results])
+            self.metrics[name].merge(RunningStat.from_values(values))
+            if name in self.quantiles:
+                self.quantiles[name].add_many(values)
+            if self.group_metrics:
+                self.group_metrics[name].merge(RunningStat.from_values(np.add.reduceat(values, starts) / sizes))
+
+        self.total_observations += sum(len(r.time_series) for r in results)
+        self.total_full_observations += sum(r.times_full for r in results)
+
+        # Stack iterations that share a collection schedule into (iterations x slots)
+        lengths = {len(r.time_series) for r in results}
+        stacked = np.stack([r.time_series for r in results]) if len(lengths) == 1 else None
+        if stacked is None or not np.all(stacked['time'] == stacked['time'][0]):
+            for result in results:
+                self._add_slots(result.time_series[np.newaxis, :])
+        else:
+            self._add_slots(stacked)
+
+        if self.config.days > 1:
+            self._add_days(np.stack([r.daily for r in results]))
+
+        if self.config.circling:
+            waits = np.concatenate([r.circling_waits for r in results])
+            self.circling_wait.merge(RunningStat.from_values(waits))
+            self.circling_wait_quantiles.add_many(waits)
+
+    def _add_days(self, daily):
+        """Per-day and per-week accumulation for an (iterations x days) DAILY_DTYPE array"""
+        for day in range(daily.shape[1]):
+            stats = self.days.setdefault(day, {name: RunningStat() for name in DAILY_METRICS})
+            for name in DAILY_METRICS:
+                stats[name].merge(RunningStat.from_values(daily[name][:, day]))
+
+        # Weeks count from day 1; totals are summed, peaks take the week's maximum
+        for week, start in enumerate(range(0, daily.shape[1], 7)):
+            days = daily[:, start:start + 7]
+            stats = self.weeks.setdefault(week, {name: RunningStat() for name in WEEKLY_METRICS})
+            for name in WEEKLY_METRICS:
+                values = days[name].max(axis=1) if name == 'peak_occupancy' else days[name].sum(axis=1)
+                stats[name].merge(RunningStat.from_values(values))
+            stats['days'] = days.shape[1]
+
+    def _add_slots(self, stacked):
+        """Per-slot accumulation for an (iterations x slots) time series array"""
+        columns = time_series_columns(stacked, self.config)
+        for j, time_str in enumerate(columns['time_str'][0]):
+            slot = self._slot(time_str)
+            for name in self.SLOT_METRICS:
+                slot[name].merge(RunningStat.from_values(columns[name][:, j]))
+            slot['is_full'][0] += int(columns['is_full'][:, j].sum())
+            slot['is_full'][1] += stacked.shape[0]
+
+    def _slot(self, time_str):
+        if time_str not in self.slots:
+            slot = {name: RunningStat() for name in self.SLOT_METRICS}
+            slot['is_full'] = [0, 0]
+            self.slots[time_str] = slot
+        return self.slots[time_str]
+
+    def merge(self, other):
+        self.iterations += other.iterations
+        self.total_observations += other.total_observations
+        self.total_full_observations += other.total_full_observations
+        for name in self.ITERATION_METRICS:
+            self.metrics[name].merge(other.metrics[name])
+        for name in self.QUANTILE_METRICS:
+            self.quantiles[name].merge(other.quantiles[name])
+        for name, stat in self.group_metrics.items():
+            stat.merge(other.group_metrics[name])
+        for time_str, other_slot in other.slots.items():
+            slot = self._slot(time_str)
+            for name in self.SLOT_METRICS:
+                slot[name].merge(other_slot[name])
+            slot['is_full'][0] += other_slot['is_full'][0]
+            slot['is_full'][1] += other_slot['is_full'][1]
+        for groups, other_groups, names in ((self.days, other.days, DAILY_METRICS),
+                                            (self.weeks, other.weeks, WEEKLY_METRICS)):
+            for key, other_stats in other_groups.items():
+                stats = groups.setdefault(key, {name: RunningStat() for name in names})
+                for name in names:
+                    stats[name].merge(other_stats[name])
+                if 'days' in other_stats:
+                    stats['days'] = other_stats['days']
+        self.circling_wait.merge(other.circling_wait)
+        self.circling_wait_quantiles.merge(other.circling_wait_quantiles)
+
+    def circling_wait_table(self):
+        """How long vehicles that parked after circling waited: one row per wait"""
+        histogram = self.circling_wait_quantiles
+        waits = sorted(histogram.counts)
+        counts = np.array([histogram.counts[w] for w in waits], dtype=int)
+        return pd.DataFrame({
+            'wait_seconds': waits,
+            'vehicles': counts,
+            'share': counts / max(histogram.total, 1),
+            'cumulative_share': np.cumsum(counts) / max(histogram.total, 1),
+        })
+
+    def _interval_terms(self, metric):
+        """(estimate, iteration metric, scale) behind a summary statistic's confidence interval"""
+        if metric == 'probability_full':
+            if self.total_observations == 0:
+                return 0.0, 'times_full', float('nan')
+            observations_per_iteration = self.total_observations / self.iterations
+            estimate = self.total_full_observations / self.total_observations
+            return estimate, 'times_full', 1.0 / observations_per_iteration
+        if metric.endswith('_mean') and metric[:-len('_mean')] in self.ITERATION_METRICS:
+            name = metric[:-len('_mean')]
+            return self.metrics[name].mean, name, 1.0
+        raise ValueError(f"No confidence interval for '{metric}'")
+
+    def confidence_interval(self, metric, z=CONFIDENCE_Z):
+        """
+        (estimate, half-width) of the confidence interval for a summary
+        statistic: 'probability_full' or '<iteration metric>_mean'.
+        P(Full) is treated as the mean of each day's full fraction.
+        With variance reduction only the groups are independent, so the
+        width comes from the spread of the group means.
+        """
+        estimate, name, scale = self._interval_terms(metric)
+        stat = self.group_metrics[name] if self.group_metrics else self.metrics[name]
+        if stat.count < 2:
+            return estimate, float('inf')
+        return estimate, z * stat.std(ddof=1) / math.sqrt(stat.count) * scale
+
+    def effective_sample_size(self, metric):
+        """
+        Iterations of plain Monte Carlo that would give the same confidence
+        interval width: per-iteration variance / variance of the estimate.
+        """
+        _, name, _ = self._interval_terms(metric)
+        if not self.group_metrics:
+            return float(self.iterations)
+        groups = self.group_metrics[name]
+        if groups.count < 2 or groups.m2 <= 0:
+            return float('nan')
+        return self.metrics[name].std(ddof=1) ** 2 * groups.count / groups.std(ddof=1) ** 2
+
+    def hourly_averages(self):
+        """Same table as grouping the time series by time_str"""
+        rows = []
+        for time_str in sorted(self.slots):
+            slot = self.slots[time_str]
+            total = slot['total_occupied']
+            row = {
+                'time_str': time_str,
+                'total_occupied_mean': total.mean,
+                'total_occupied_std': total.std(ddof=1),
+                'total_occupied_min': total.min,
+                'total_occupied_max': total.max,
+            }
+            for name in self.SLOT_METRICS[1:]:
+                row[f'{name}_mean'] = slot[name].mean
+                row[f'{name}_std'] = slot[name].std(ddof=1)
+            full_count, observations = slot['is_full']
+            row['is_full_mean'] = full_count / observations
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def daily_summary(self):
+        """One row per simulated day: mean and std of each daily metric"""
+        rows = []
+        for day in sorted(self.days):
+            stats = self.days[day]
+            row = {'day': day + 1, 'weekday': WEEKDAY_NAMES[self.config.weekday(day)],
+                   'arrival_scale': self.config.arrival_scale(day)}
+            for name in DAILY_METRICS:
+                row[f'{name}_mean'] = stats[name].mean
+                row[f'{name}_std'] = stats[name].std(ddof=1)
+            row['probability_full'] = stats['times_full'].mean / self.config.num_time_slots
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def weekly_summary(self):
+        """One row per week (7 days from day 1; the last may be shorter): totals and the week's peak"""
+        rows = []
+        for week in sorted(self.weeks):
+            stats = self.weeks[week]
+            row = {'week': week + 1, 'days': stats['days']}
+            for name in WEEKLY_METRICS:
+                row[f'{name}_mean'] = stats[name].mean
+                row[f'{name}_std'] = stats[name].std(ddof=1)
+            row['probability_full'] = stats['times_full'].mean / (self.config.num_time_slots * stats['days'])
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+OUTPUT_FORMATS = ('csv', 'parquet')
+
+
+class ParquetResultWriter:
+    """
+    Streams iteration results and time series rows to Parquet while the
+    run is still going, one row group per block of iterations. Occupancy
+    and count columns use compact unsigned integer types.
+
+    A Parquet file is only readable once it is closed, so checkpointed runs
+    use parts=True: rows go to numbered part files, the current part is
+    closed at every checkpoint, and close() joins the parts into the final
+    files. Runs with circling=True get the circled and
+    parked_after_circling columns too, as in the CSV export.
+    """
+
+    def __init__(self, output_dir='monte_carlo_results', timestamp=None, parts=False, circling=False):
+        if pq is None:
+            raise ImportError("--format parquet needs pyarrow (pip install pyarrow)")
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.timestamp = timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.iterations_file = os.path.join(output_dir, f'iteration_results_{self.timestamp}.parquet')
+        self.time_series_file = os.path.join(output_dir, f'time_series_{self.timestamp}.parquet')
+
+        count = pa.uint32()
+        occupancy = pa.uint16()
+        iteration_fields = [
+            ('iteration', pa.uint32()),
+            ('arrivals', count), ('parked', count), ('rejected', count),
+            ('peak_occupancy', occupancy), ('peak_utilization', pa.float32()),
+            ('times_full', pa.uint16()),
+            ('mc_arrivals', count), ('car_arrivals', count), ('truck_arrivals', count),
+            ('mc_rejected', count), ('car_rejected', count), ('truck_rejected', count),
+        ]
+        if circling:
+            iteration_fields += [('circled', count), ('parked_after_circling', count)]
+        self.iteration_schema = pa.schema(iteration_fields)
+        self.time_series_schema = pa.schema([
+            ('iteration', pa.uint32()),
+            ('hour', pa.float64()),
+            ('time_str', pa.dictionary(pa.int16(), pa.string())),
+            ('total_occupied', occupancy),
+            ('utilization_percent', pa.float32()),
+            ('mc_occupied', occupancy), ('car_occupied', occupancy), ('truck_occupied', occupancy),
+            ('mc_utilization', pa.float32()), ('car_utilization', pa.float32()), ('truck_utilization', pa.float32()),
+            ('is_full', pa.bool_()),
+        ])
+        self.parts = parts
+        self.num_parts = 0
+        self._iterations_writer = self._time_series_writer = None
+        if not parts:
+            self._iterations_writer = pq.ParquetWriter(self.iterations_file, self.iteration_schema)
+            self._time_series_writer = pq.ParquetWriter(self.time_series_file, self.time_series_schema)
+
+    @staticmethod
+    def part_file(path, part):
+        return f'{path}.part{part:04d}'
+
+    def _open_part(self):
+        self._iterations_writer = pq.ParquetWriter(self.part_file(self.iterations_file, self.num_parts),
+                                                   self.iteration_schema)
+        self._time_series_writer = pq.ParquetWriter(self.part_file(self.time_series_file, self.num_parts),
+                                                    self.time_series_schema)
+        self.num_parts += 1
+
+    def _close_writers(self):
+        if self._iterations_writer is not None:
+            self._iterations_writer.close()
+            self._time_series_writer.close()
+            self._iterations_writer = self._time_series_writer = None
+
+    def checkpoint(self):
+        """Close the current part so everything written so far is on disk; returns the number of parts"""
+        if self.parts:
+            self._close_writers()
+        return self.num_parts
+
+    def resume(self, num_parts):
+        """Continue after num_parts complete parts, deleting any later (unfinished) part files"""
+        for path in (self.iterations_file, self.time_series_file):
+            for part_file in glob.glob(f'{path}.part*'):
+                if int(part_file[-4:]) >= num_parts:
+                    os.remove(part_file)
+        self.num_parts = num_parts
+
+    def _join_parts(self, path, schema):
+        part_files = [self.part_file(path, part) for part in range(self.num_parts)]
+        with pq.ParquetWriter(path, schema) as writer:
+            for part_file in part_files:
+                part = pq.ParquetFile(part_file)
+                for row_group in range(part.num_row_groups):
+                    writer.write_table(part.read_row_group(row_group))
+        for part_file in part_files:
+            os.remove(part_file)
+
+    def write_block(self, results: List[IterationResult], config: SimulationConfig = None):
+        """Append one block of iterations as a row group in each file"""
+        if not results:
+            return
+        if self._iterations_writer is None:
+            self._open_part()
+        columns = {name: [getattr(r, name) for r in results] for name in self.iteration_schema.names}
+        self._iterations_writer.write_table(pa.table(columns, schema=self.iteration_schema))
+
+        time_series, iterations = concatenate_time_series(results)
+        columns = {'iteration': iterations, **time_series_columns(time_series, config)}
+        self._time_series_writer.write_table(pa.table(columns, schema=self.time_series_schema))
+
+    def close(self):
+        self._close_writers()
+        if self.parts:
+            self._join_parts(self.iterations_file, self.iteration_schema)
+            self._join_parts(self.time_series_file, self.time_series_schema)
+        print(f"[OK] Iteration results saved to: {self.iterations_file}")
+        print(f"[OK] Time series data saved to: {self.time_series_file}")
+
+
+def load_results(output_dir, timestamp):
+    """
+    Load one run's tables for analysis.
+    Parquet files are memory-mapped and returned as pyarrow Tables
+    (call .to_pandas() when needed); CSV runs are returned as DataFrames.
+    """
+    tables = {}
+    for name in ('summary_statistics', 'iteration_results', 'time_series', 'hourly_averages'):
+        parquet_file = os.path.join(output_dir, f'{name}_{timestamp}.parquet')
+        csv_file = os.path.join(output_dir, f'{name}_{timestamp}.csv')
+        if os.path.exists(parquet_file):
+            if pq is None:
+                raise ImportError("Reading Parquet results needs pyarrow (pip install pyarrow)")
+            tables[name] = pq.read_table(parquet_file, memory_map=True)
+        elif os.path.exists(csv_file):
+            tables[name] = pd.read_csv(csv_file)
+    return tables
+
+
+def arrival_ranks(vehicle_type, group_counts, group):
+    """
+    Rank of each vehicle among the same-type arrivals of its group (one
+    iteration's arrivals in one time step), in arrival order
+    """
+    group_start = np.cumsum(group_counts) - group_counts
+    vehicle_rank = np.zeros(len(vehicle_type), dtype=int)
+    for type_index in range(3):
+        is_type = vehicle_type == type_index
+        seen = np.cumsum(is_type)
+        seen_before_group = np.concatenate(([0], seen))[group_start[group]]
+        vehicle_rank[is_type] = (seen - seen_before_group - 1)[is_type]
+    return vehicle_rank
+
+
+def antithetic_partners(vehicle_iteration, batch_size):
+    """
+    Antithetic pairing of vehicles: the k-th vehicle of iteration 2m+1 is
+    paired with the k-th vehicle of iteration 2m, if that one exists.
+    Returns (mask of paired vehicles, index of each one's partner).
+    """
+    per_iteration = np.bincount(vehicle_iteration, minlength=batch_size)
+    starts = np.cumsum(per_iteration) - per_iteration
+    order = np.argsort(vehicle_iteration, kind='stable')
+    ordinal = np.empty(len(vehicle_iteration), dtype=np.int64)
+    ordinal[order] = np.arange(len(vehicle_iteration)) - np.repeat(starts, per_iteration)
+    partner_iteration = np.maximum(vehicle_iteration - 1, 0)
+    paired = (vehicle_iteration % 2 == 1) & (ordinal < per_iteration[partner_iteration])
+    return paired, order[starts[partner_iteration[paired]] + ordinal[paired]]
+
+
+def _log_factorials(size):
+    """log(k!) for k = 0 .. size - 1"""
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, size)))))
+
+
+def _pmf_quantiles(u, pmf):
+    """Smallest k with P(X <= k) >= u; the last value takes the rest of the tail"""
+    cdf = np.cumsum(pmf)
+    cdf[-1] = 1.0
+    return np.searchsorted(cdf, u)
+
+
+def poisson_quantiles(u, means):
+    """Inverse Poisson CDF for an array of uniforms u, with means broadcast against u"""
+    means = np.broadcast_to(means, u.shape)
+    counts = np.zeros(u.shape, dtype=np.int64)
+    for mean in np.unique(means):
+        if mean <= 0:
+            continue
+        size = int(mean + 12 * math.sqrt(mean) + 20)  # far into the upper tail
+        k = np.arange(size)
+        selected = means == mean
+        counts[selected] = _pmf_quantiles(u[selected], np.exp(k * math.log(mean) - mean - _log_factorials(size)))
+    return counts
+
+
+def binomial_quantiles(u, n, p):
+    """Inverse Binomial(n, p) CDF for an array of uniforms u"""
+    if p >= 1:
+        return np.full(u.shape, n, dtype=np.int64)
+    if p <= 0:
+        return np.zeros(u.shape, dtype=np.int64)
+    k = np.arange(n + 1)
+    log_factorial = _log_factorials(n + 1)
+    log_pmf = log_factorial[n] - log_factorial - log_factorial[::-1] + k * math.log(p) + (n - k) * math.log1p(-p)
+    return _pmf_quantiles(u, np.exp(log_pmf))
+
+
+def occupancy_kernel(batch_size, num_steps, capacities, step_offsets, arrival_index, vehicle_iteration,
+                     vehicle_type, departure_step, collection_index, num_collections, occupied, departures,
+                     circling, retry_gaps, max_search_attempts, circling_timeout, time_step):
+    """
+    Scalar version of MonteCarloSimulation.advance_occupancy, compiled with
+    Numba for --backend numba. Vehicles of a time step are handled one by
+    one in arrival order, so first come, first served needs no ranking.
+    All arguments are int64 arrays (or numbers); occupied and departures are
+    updated in place. Gives the same results as advance_occupancy.
+
+    The circling retry queue is one linked list of vehicles per time step
+    (queue_head/queue_tail per step, queue_next per vehicle), appended to
+    in the same order as advance_occupancy's lists.
+    """
+    num_vehicles = len(vehicle_type)
+    arrivals_by_type = np.zeros((batch_size, 3), dtype=np.int64)
+    parked_by_type = np.zeros((batch_size, 3), dtype=np.int64)
+    snapshots = np.zeros((batch_size, num_collections, 3), dtype=np.int64)
+    circled = np.zeros(num_vehicles, dtype=np.bool_)
+    circling_wait = np.full(num_vehicles, -1, dtype=np.int64)
+
+    attempts = np.zeros(num_vehicles, dtype=np.int64)
+    first_step = np.zeros(num_vehicles, dtype=np.int64)
+    failed = np.empty(num_vehicles, dtype=np.int64)
+    queue_head = np.full(num_steps, -1, dtype=np.int64)
+    queue_tail = np.full(num_steps, -1, dtype=np.int64)
+    queue_next = np.full(num_vehicles, -1, dtype=np.int64)
+
+    for step in range(num_steps):
+        num_failed = 0
+        a = arrival_index[step]
+        if a >= 0:
+            for v in range(step_offsets[a], step_offsets[a + 1]):
+                it = vehicle_iteration[v]
+                vt = vehicle_type[v]
+                arrivals_by_type[it, vt] += 1
+                if occupied[it, vt] < capacities[vt]:
+                    occupied[it, vt] += 1
+                    parked_by_type[it, vt] += 1
+                    departures[it, vt, departure_step[v]] += 1
+                elif circling:
+                    circled[v] = True
+                    attempts[v] = 1
+                    first_step[v] = step
+                    failed[num_failed] = v
+                    num_failed += 1
+
+        for it in range(batch_size):
+            for vt in range(3):
+                occupied[it, vt] -= departures[it, vt, step]
+
+        # Circling vehicles whose try falls in this step, in queue order
+        v = queue_head[step]
+        while v >= 0:
+            it = vehicle_iteration[v]
+            vt = vehicle_type[v]
+            if occupied[it, vt] < capacities[vt]:
+                occupied[it, vt] += 1
+                parked_by_type[it, vt] += 1
+                departures[it, vt, departure_step[v]] += 1
+                circling_wait[v] = int((step - first_step[v]) * time_step)
+            else:
+                attempts[v] += 1
+                failed[num_failed] = v
+                num_failed += 1
+            v = queue_next[v]
+
+        # Queue the next try of every vehicle that failed in this step (or let it give up)
+        for f in range(num_failed):
+            v = failed[f]
+            if attempts[v] >= max_search_attempts:
+                continue
+            gap = retry_gaps[v, attempts[v] - 1]
+            retry_step = step + int(math.ceil(gap / time_step))
+            if gap > circling_timeout or retry_step >= num_steps:
+                continue
+            queue_next[v] = -1
+            if queue_head[retry_step] < 0:
+                queue_head[retry_step] = v
+            else:
+                queue_next[queue_tail[retry_step]] = v
+            queue_tail[retry_step] = v
+
+        c = collection_index[step]
+        if c >= 0:
+            for it in range(batch_size):
+                for vt in range(3):
+                    snapshots[it, c, vt] = occupied[it, vt]
+
+    return arrivals_by_type, parked_by_type, snapshots, circled, circling_wait
+
+
+# Compiled on first use in each process; cache=True keeps the machine code between runs
+_occupancy_kernel = numba.njit(cache=True)(occupancy_kernel) if numba is not None else None
+
 
 class MonteCarloSimulation:
     """Monte Carlo simulation engine for parking analysis"""
 
-    def __init__(self, num_iterations=1000, random_seed=None):
+    def __init__(self, num_iterations=1000, random_seed=None, engine='loop', workers=1, keep_results=True,
+                 result_writer=None, config: SimulationConfig = None, verbose=True,
+                 tolerance=None, adaptive_metrics=ADAPTIVE_METRICS, profile=False, profile_iteration=None,
+                 backend='python', checkpoint_file=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+                 variance_reduction=None):
+        # Scenario parameters; defaults to the module-level constants
+        self.config = config or SimulationConfig()
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}' (choose from {', '.join(ENGINES)})")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if engine == 'vectorized' and not self.config.time_step:
+            raise ValueError("The vectorized engine needs a fixed time_step")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+        if backend == 'numba' and engine != 'vectorized':
+            raise ValueError("The numba backend runs the vectorized engine (use engine='vectorized')")
+        if backend == 'numba' and numba is None:
+            print("[--] Numba is not installed (pip install numba), using the python backend")
+            backend = 'python'
+        self.backend = backend
+        if variance_reduction is not None and variance_reduction not in VARIANCE_REDUCTION_MODES:
+            raise ValueError(f"Unknown variance reduction '{variance_reduction}' "
+                             f"(choose from {', '.join(VARIANCE_REDUCTION_MODES)})")
+        if variance_reduction is not None and engine != 'vectorized':
+            raise ValueError("Variance reduction runs on the vectorized engine (use engine='vectorized')")
+        self.variance_reduction = variance_reduction
+        self.group_size = VARIANCE_REDUCTION_GROUP_SIZE.get(variance_reduction, 1)
         self.num_iterations = num_iterations
-        if random_seed is not None:
-            np.random.seed(random_seed)
-
+        self.engine = engine
+        self.workers = workers
+
+        # Adaptive stopping: with a tolerance, num_iterations is only the upper
+        # limit and the run ends once every adaptive metric's 95% CI half-width
+        # is within tolerance x its estimate (relative tolerance)
+        valid_metrics = ['probability_full'] + [f'{m}_mean' for m in StreamingStatistics.ITERATION_METRICS]
+        for metric in adaptive_metrics:
+            if metric not in valid_metrics:
+                raise ValueError(f"Unknown adaptive metric '{metric}' (choose from {', '.join(valid_metrics)})")
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        self.tolerance = tolerance
+        self.adaptive_metrics = tuple(adaptive_metrics)
+        self.max_iterations = num_iterations
+        self.converged = None
+
+        # One root SeedSequence; every block of iterations gets its own child stream
+        self.seed_sequence = np.random.SeedSequence(random_seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+        # keep_results=False streams everything into self.statistics and drops
+        # per-iteration results, so memory no longer grows with iterations
+        self.keep_results = keep_results
         self.results: List[IterationResult] = []
+        self.statistics = StreamingStatistics(self.config, self.group_size)
+
+        # Optional writer (e.g. ParquetResultWriter) that receives each block as it completes
+        self.result_writer = result_writer
+        self.stream_output = result_writer is not None
+
+        # Checkpointing: every checkpoint_interval seconds the finished blocks
+        # (statistics, block count, writer state) are saved to checkpoint_file,
+        # and kept results are appended to a file next to it. Blocks have
+        # their own random streams, so the next block number is the whole
+        # random state needed to continue.
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self.completed_blocks = 0
+        self._saved_results = 0  # kept results already in the checkpoint results file
+        self._results_file_size = 0  # its size at the last checkpoint
+        self.timestamp = result_writer.timestamp if result_writer is not None else None
+        self._last_checkpoint = None
+
+        # Opt-in phase timing: the profiler wraps this instance's methods, so
+        # without it nothing is timed and nothing costs extra. profile_iteration
+        # also records cProfile stats for that iteration (its whole batch with
+        # the vectorized engine).
+        if profile_iteration is not None and not 0 <= profile_iteration < num_iterations:
+            raise ValueError(f"profile_iteration must be between 0 and {num_iterations - 1}")
+        self.profile_iteration = profile_iteration
+        self.profiler = None
+        if profile or profile_iteration is not None:
+            self.profiler = PhaseProfiler()
+            self.profiler.attach(self, PROFILE_PHASES)
+        if not verbose:
+            return
         print(f"\n{'='*70}")
         print(f"MONTE CARLO PARKING SIMULATION")
         print(f"{'='*70}")
-        print(f"Total Capacity: {TOTAL_CAPACITY}")
-        print(f"  - Motorcycles: {TOTAL_MC_CAPACITY}")
-        print(f"  - Cars: {TOTAL_CAR_CAPACITY}")
-        print(f"  - Trucks: {TOTAL_TRUCK_CAPACITY}")
-        print(f"Number of Iterations: {num_iterations}")
+        if self.config.name != 'baseline':
+            print(f"Scenario: {self.config.name}")
+        print(f"Total Capacity: {self.config.total_capacity}")
+        print(f"  - Motorcycles: {self.config.mc_capacity}")
+        print(f"  - Cars: {self.config.car_capacity}")
+        print(f"  - Trucks: {self.config.truck_capacity}")
+        print(f"Number of Iterations: {num_iterations}{' (maximum)' if tolerance is not None else ''}")
+        print(f"Engine: {engine}{' (numba backend)' if self.backend == 'numba' else ''}")
+        print(f"Workers: {workers}")
+        if variance_reduction is not None:
+            print(f"Variance reduction: {variance_reduction} (groups of {self.group_size} iterations)")
+        if tolerance is not None:
+            print(f"Adaptive: stop when 95% CI half-width < {tolerance:.1%} of "
+                  f"{', '.join(self.adaptive_metrics)}")
         print(f"{'='*70}\n")
 
     def generate_vehicle_type(self):
         """Generate vehicle type based on probability distribution"""
-        rand = np.random.random()
-        if rand < PROB_MOTORCYCLE:
+        rand = self.rng.random()
+        if rand < self.config.prob_motorcycle:
             return 'motorcycle'
-        elif rand < PROB_MOTORCYCLE + PROB_CAR:
+        elif rand < self.config.prob_motorcycle + self.config.prob_car:
             return 'car'
         else:
             return 'truck'
 
-    def generate_arrivals_poisson(self, hour, time_step_minutes=1.0):
+    def generate_arrivals_poisson(self, hour, time_step_minutes=1.0, scale=1.0):
         """
         Generate number of arrivals using Poisson distribution
         Formula: P(A=k) = (λ^k * e^(-λ)) / k!
 
-        λ = arrival rate per time step
+        λ = arrival rate per time step (times the weekday's scale)
         """
-        hourly_rate = HOURLY_ARRIVAL_RATES.get(hour, 5)
+        hourly_rate = self.config.hourly_arrival_rates.get(hour, 5) * scale
         # Convert hourly rate to rate per time step
         lambda_rate = hourly_rate * (time_step_minutes / 60.0)
 
         # Sample from Poisson distribution
-        num_arrivals = np.random.poisson(lambda_rate)
+        num_arrivals = self.rng.poisson(lambda_rate)
 
         # Check for batch arrival during peak hours
-        if hour in PEAK_HOURS and np.random.random() < PROB_BATCH_ARRIVAL:
-            batch_size = np.random.randint(BATCH_SIZE_MIN, BATCH_SIZE_MAX + 1)
+        if hour in self.config.peak_hours and self.rng.random() < self.config.prob_batch_arrival * scale:
+            batch_size = self.rng.integers(self.config.batch_size_min, self.config.batch_size_max + 1)
             num_arrivals += batch_size
 
         return num_arrivals
@@ -218,40 +1238,44 @@ class MonteCarloSimulation:
     def generate_parking_duration(self, current_time):
         """
         Generate parking duration (vehicle exits between 3:00-6:30 PM)
-        current_time in seconds from start of day
+        current_time in seconds from midnight of the first day
         """
-        current_hour = current_time / 3600.0
+        current_hour = (current_time % SECONDS_PER_DAY) / 3600.0
 
         # Target exit time (uniform random between 15.0 and 18.5)
-        target_exit = np.random.uniform(EXIT_TIME_MIN, EXIT_TIME_MAX)
+        target_exit = self.rng.uniform(self.config.exit_time_min, self.config.exit_time_max)
 
         # Duration in seconds
         duration = max(0.5 * 3600, (target_exit - current_hour) * 3600)
+
+        # Multi-day runs: some vehicles stay overnight and leave a day later
+        if self.config.days > 1 and self.rng.random() < self.config.prob_overnight:
+            duration += SECONDS_PER_DAY
         return duration
 
     def can_park(self, vehicle_type, state: SimulationState):
         """Check if vehicle can park given current state"""
         if vehicle_type == 'motorcycle':
-            return state.mc_occupied < TOTAL_MC_CAPACITY
+            return state.mc_occupied < self.config.mc_capacity
         elif vehicle_type == 'car':
-            return state.car_occupied < TOTAL_CAR_CAPACITY
+            return state.car_occupied < self.config.car_capacity
         elif vehicle_type == 'truck':
-            return state.truck_occupied < TOTAL_TRUCK_CAPACITY
+            return state.truck_occupied < self.config.truck_capacity
         return False
 
     def park_vehicle(self, vehicle: Vehicle, state: SimulationState):
         """Park vehicle and update state"""
-        if vehicle.type == 'motorcycle' and state.mc_occupied < TOTAL_MC_CAPACITY:
+        if vehicle.type == 'motorcycle' and state.mc_occupied < self.config.mc_capacity:
             state.mc_occupied += 1
             vehicle.parked = True
             vehicle.parking_zone_type = 'motorcycle'
             return True
-        elif vehicle.type == 'car' and state.car_occupied < TOTAL_CAR_CAPACITY:
+        elif vehicle.type == 'car' and state.car_occupied < self.config.car_capacity:
             state.car_occupied += 1
             vehicle.parked = True
             vehicle.parking_zone_type = 'car'
             return True
-        elif vehicle.type == 'truck' and state.truck_occupied < TOTAL_TRUCK_CAPACITY:
+        elif vehicle.type == 'truck' and state.truck_occupied < self.config.truck_capacity:
             state.truck_occupied += 1
             vehicle.parked = True
             vehicle.parking_zone_type = 'truck'
@@ -267,187 +1291,1000 @@ class MonteCarloSimulation:
         elif vehicle.parking_zone_type == 'truck':
             state.truck_occupied = max(0, state.truck_occupied - 1)
 
+    def generate_arrival_groups(self, hour, scale=1.0):
+        """
+        Continuous-time arrivals for one hour (used when config.time_step is None).
+        Returns (time offset in seconds, number of vehicles) pairs.
+
+        Single arrivals form a Poisson process with the hourly rate. During peak
+        hours batches arrive as a Poisson process with prob_batch_arrival
+        batches per minute, the continuous version of the per-minute coin flip.
+        """
+        hourly_rate = self.config.hourly_arrival_rates.get(hour, 5) * scale
+        groups = [(offset, 1) for offset in self.rng.uniform(0, 3600, self.rng.poisson(hourly_rate))]
+
+        if hour in self.config.peak_hours:
+            num_batches = self.rng.poisson(self.config.prob_batch_arrival * 60 * scale)
+            sizes = self.rng.integers(self.config.batch_size_min, self.config.batch_size_max + 1, size=num_batches)
+            groups.extend(zip(self.rng.uniform(0, 3600, num_batches), sizes))
+
+        return groups
+
+    def align_to_time_step(self, time):
+        """Round a time up to the next time step (unchanged in continuous mode)"""
+        if not self.config.time_step:
+            return time
+        start_time = self.config.start_hour * 3600
+        return start_time + math.ceil((time - start_time) / self.config.time_step) * self.config.time_step
+
+    def admit_vehicles(self, num_arrivals, current_time, state, result, vehicle_id_counter, circling=None):
+        """
+        Create arriving vehicles and try to park them; returns the parked ones.
+        Vehicles that find their type full are rejected, or appended to the
+        circling list if one is given.
+        """
+        parked = []
+        for vehicle_id in range(vehicle_id_counter, vehicle_id_counter + num_arrivals):
+            vehicle_type = self.generate_vehicle_type()
+            duration = self.generate_parking_duration(current_time)
+
+            vehicle = Vehicle(
+                id=vehicle_id,
+                type=vehicle_type,
+                arrival_time=current_time,
+                departure_time=current_time + duration
+            )
+            result.arrivals += 1
+
+            # Track by type
+            if vehicle_type == 'motorcycle':
+                result.mc_arrivals += 1
+            elif vehicle_type == 'car':
+                result.car_arrivals += 1
+            elif vehicle_type == 'truck':
+                result.truck_arrivals += 1
+
+            # Try to park
+            if self.can_park(vehicle_type, state):
+                if self.park_vehicle(vehicle, state):
+                    result.parked += 1
+                    parked.append(vehicle)
+            elif circling is not None:
+                # Full: circle and try again later
+                vehicle.search_attempts = 1
+                result.circled += 1
+                circling.append(vehicle)
+            else:
+                self.reject_vehicle(vehicle, result)
+
+        return parked
+
+    def reject_vehicle(self, vehicle: Vehicle, result: IterationResult):
+        """Count a vehicle that leaves without parking"""
+        vehicle.rejected = True
+        result.rejected += 1
+
+        if vehicle.type == 'motorcycle':
+            result.mc_rejected += 1
+        elif vehicle.type == 'car':
+            result.car_rejected += 1
+        elif vehicle.type == 'truck':
+            result.truck_rejected += 1
+
+    def next_retry_time(self, vehicle: Vehicle, fail_time):
+        """
+        Time of a circling vehicle's next try after failing to park at
+        fail_time (rounded up to the next time step, like departures), or
+        None if it gives up: after max_search_attempts failures, when the
+        wait for the next try (a geometric number of seconds,
+        circling_retry_rate per second) exceeds circling_timeout, or when
+        the next try would come after closing time.
+        """
+        if vehicle.search_attempts >= self.config.max_search_attempts:
+            return None
+        gap = int(self.rng.geometric(self.config.circling_retry_rate))
+        if gap > self.config.circling_timeout:
+            return None
+        retry_time = self.align_to_time_step(fail_time + gap)
+        if retry_time % SECONDS_PER_DAY >= self.config.end_hour * 3600:
+            return None
+        return retry_time
+
+    def record_snapshot(self, time_series, index, state: SimulationState, result: IterationResult):
+        """
+        Record the current state as snapshot number `index` and update the
+        full/peak counts. Returns time_series, grown if it was too short.
+        """
+        if index == len(time_series):
+            time_series = np.resize(time_series, 2 * len(time_series) + 1)
+        time_series[index] = (state.time, state.mc_occupied, state.car_occupied, state.truck_occupied)
+
+        # Check if full
+        if state.is_full():
+            result.times_full += 1
+
+        # Track peak
+        if state.total_occupied > result.peak_occupancy:
+            result.peak_occupancy = state.total_occupied
+            result.peak_utilization = state.utilization_percent
+
+        return time_series
+
     def run_single_iteration(self, iteration_num):
-        """Run a single simulation iteration (one day)"""
+        """
+        Run a single simulation iteration (one day) as a discrete-event simulation.
+
+        Arrivals, departures and data collection are events in a heap ordered by
+        (time, event type). At equal times arrivals are handled first, then
+        departures, then data collection - the same order as the old
+        minute-by-minute loop. Every parked vehicle gets exactly one departure
+        event, so the cost grows with the number of events instead of
+        minutes x parked vehicles.
+
+        With a fixed config.time_step, departures and collections are rounded
+        up to the next time step, which gives the same results as checking every
+        minute. With config.time_step = None, time is continuous.
+
+        With config.days > 1 the iteration runs that many consecutive days on
+        the same event heap and lot, so overnight stayers are still parked the
+        next morning. Times are seconds from midnight of the first day.
+
+        With config.circling, a vehicle that finds its type full gets a retry
+        event (see next_retry_time) instead of being rejected; retries are
+        handled after departures at the same time step.
+        """
         result = IterationResult(iteration=iteration_num)
+        days = self.config.days
 
         # Current state
-        state = SimulationState(time=START_HOUR * 3600)
-
-        # List of all vehicles for this iteration
-        vehicles: List[Vehicle] = []
+        state = SimulationState(time=self.config.start_hour * 3600, config=self.config)
         vehicle_id_counter = 0
 
-        # Time series data collection
-        next_collection_time = START_HOUR * 3600
-
-        # Simulate from START_HOUR to END_HOUR
-        current_time = START_HOUR * 3600  # Start at 6 AM
-        end_time = END_HOUR * 3600  # End at 7 PM
-
-        while current_time < end_time:
-            current_hour = int(current_time // 3600)
-
-            # Generate arrivals using Poisson distribution
-            if START_HOUR <= current_hour < 17:  # Only spawn vehicles during operating hours
-                time_step_minutes = SIMULATION_TIME_STEP / 60.0
-                num_arrivals = self.generate_arrivals_poisson(current_hour, time_step_minutes)
-
-                # Create vehicles
-                for _ in range(num_arrivals):
-                    vehicle_type = self.generate_vehicle_type()
-                    duration = self.generate_parking_duration(current_time)
-
-                    vehicle = Vehicle(
-                        id=vehicle_id_counter,
-                        type=vehicle_type,
-                        arrival_time=current_time,
-                        departure_time=current_time + duration
-                    )
-                    vehicle_id_counter += 1
-                    result.arrivals += 1
-
-                    # Track by type
-                    if vehicle_type == 'motorcycle':
-                        result.mc_arrivals += 1
-                    elif vehicle_type == 'car':
-                        result.car_arrivals += 1
-                    elif vehicle_type == 'truck':
-                        result.truck_arrivals += 1
-
-                    # Try to park
-                    if self.can_park(vehicle_type, state):
-                        if self.park_vehicle(vehicle, state):
-                            result.parked += 1
-                            vehicles.append(vehicle)
+        # Preallocated time series, one record per data collection
+        time_series = np.zeros(self.config.num_time_slots * days, dtype=TIME_SERIES_DTYPE)
+        snapshot_count = 0
+
+        start_time = self.config.start_hour * 3600  # Start at 6 AM
+        end_time = self.config.end_hour * 3600  # End at 7 PM
+        arrival_end_time = self.config.arrival_end_hour * 3600
+        last_end_time = end_time + (days - 1) * SECONDS_PER_DAY
+
+        # Per-day bookkeeping: arrivals/parked/rejected before each day and the
+        # vehicles still parked when it starts
+        day_start_totals = [(0, 0, 0)]
+        carried_over = [0]
+        next_day_time = start_time + SECONDS_PER_DAY
+
+        events = []
+        sequence = itertools.count()  # Tie-breaker so payloads are never compared
+        circling_waits = []
+
+        def schedule(time, event_type, payload=None):
+            heapq.heappush(events, (time, event_type, next(sequence), payload))
+
+        # Arrival ticks: every time step, or every hour in continuous mode.
+        # Collection events carry their nominal time so the schedule never drifts.
+        for day in range(days):
+            day_start = start_time + day * SECONDS_PER_DAY
+            schedule(day_start, EVENT_ARRIVAL)
+            schedule(self.align_to_time_step(day_start), EVENT_COLLECTION, day_start)
+
+        while events:
+            current_time, event_type, _, payload = heapq.heappop(events)
+            if current_time >= last_end_time:
+                break
+            while current_time >= next_day_time:
+                day_start_totals.append((result.arrivals, result.parked, result.rejected))
+                carried_over.append(state.total_occupied)
+                next_day_time += SECONDS_PER_DAY
+            state.time = current_time
+            day, time_of_day = divmod(current_time, SECONDS_PER_DAY)
+
+            if event_type == EVENT_ARRIVAL:
+                if payload is None and self.config.time_step:
+                    # Generate arrivals using Poisson distribution
+                    current_hour = int(time_of_day // 3600)
+                    num_arrivals = self.generate_arrivals_poisson(current_hour, self.config.time_step / 60.0,
+                                                                  self.config.arrival_scale(int(day)))
+                    if time_of_day + self.config.time_step < arrival_end_time:
+                        schedule(current_time + self.config.time_step, EVENT_ARRIVAL)
+                elif payload is None:
+                    current_hour = int(time_of_day // 3600)
+                    for offset, count in self.generate_arrival_groups(current_hour, self.config.arrival_scale(int(day))):
+                        schedule(current_time + offset, EVENT_ARRIVAL, int(count))
+                    if time_of_day + 3600 < arrival_end_time:
+                        schedule(current_time + 3600, EVENT_ARRIVAL)
+                    continue
+                else:
+                    num_arrivals = payload
+
+                circling = [] if self.config.circling else None
+                parked = self.admit_vehicles(num_arrivals, current_time, state, result, vehicle_id_counter, circling)
+                vehicle_id_counter += num_arrivals
+                for vehicle in parked:
+                    schedule(self.align_to_time_step(vehicle.departure_time), EVENT_DEPARTURE, vehicle)
+                for vehicle in circling or ():
+                    retry_time = self.next_retry_time(vehicle, current_time)
+                    if retry_time is None:
+                        self.reject_vehicle(vehicle, result)
                     else:
-                        # Vehicle rejected
-                        vehicle.rejected = True
-                        result.rejected += 1
-
-                        if vehicle_type == 'motorcycle':
-                            result.mc_rejected += 1
-                        elif vehicle_type == 'car':
-                            result.car_rejected += 1
-                        elif vehicle_type == 'truck':
-                            result.truck_rejected += 1
-
-            # Process departures
-            vehicles_to_remove = []
-            for vehicle in vehicles:
-                if vehicle.parked and current_time >= vehicle.departure_time:
-                    self.remove_vehicle(vehicle, state)
-                    vehicles_to_remove.append(vehicle)
-
-            for v in vehicles_to_remove:
-                vehicles.remove(v)
-
-            # Data collection at intervals
-            if current_time >= next_collection_time:
-                # Record current state
-                state_snapshot = SimulationState(
-                    time=current_time,
-                    mc_occupied=state.mc_occupied,
-                    car_occupied=state.car_occupied,
-                    truck_occupied=state.truck_occupied
-                )
-                result.time_series.append(state_snapshot)
-
-                # Check if full
-                if state_snapshot.is_full():
-                    result.times_full += 1
-
-                # Track peak
-                if state.total_occupied > result.peak_occupancy:
-                    result.peak_occupancy = state.total_occupied
-                    result.peak_utilization = state.utilization_percent
-
-                next_collection_time += DATA_COLLECTION_INTERVAL
-
-            # Advance time
-            current_time += SIMULATION_TIME_STEP
-
+                        schedule(retry_time, EVENT_RETRY, vehicle)
+
+            elif event_type == EVENT_DEPARTURE:
+                self.remove_vehicle(payload, state)
+
+            elif event_type == EVENT_RETRY:
+                vehicle = payload
+                if self.park_vehicle(vehicle, state):
+                    result.parked += 1
+                    result.parked_after_circling += 1
+                    circling_waits.append(current_time - vehicle.arrival_time)
+                    schedule(self.align_to_time_step(vehicle.departure_time), EVENT_DEPARTURE, vehicle)
+                else:
+                    vehicle.search_attempts += 1
+                    retry_time = self.next_retry_time(vehicle, current_time)
+                    if retry_time is None:
+                        self.reject_vehicle(vehicle, result)
+                    else:
+                        schedule(retry_time, EVENT_RETRY, vehicle)
+
+            elif event_type == EVENT_COLLECTION:
+                time_series = self.record_snapshot(time_series, snapshot_count, state, result)
+                snapshot_count += 1
+
+                next_collection_time = payload + self.config.data_collection_interval
+                collection_time = self.align_to_time_step(next_collection_time)
+                # The day's collections end at closing time (the next day has its own)
+                if collection_time % SECONDS_PER_DAY < end_time:
+                    schedule(collection_time, EVENT_COLLECTION, next_collection_time)
+
+        result.time_series = time_series[:snapshot_count]
+        result.circling_waits = np.rint(circling_waits).astype(np.int32)
+        # Every day starts with an arrival tick, so every day start was passed above
+        totals = day_start_totals + [(result.arrivals, result.parked, result.rejected)]
+        result.daily = daily_records(result.time_series, np.diff(totals, axis=0), carried_over, self.config)
         return result
 
-    def run(self):
-        """Run all Monte Carlo iterations"""
-        print(f"Running {self.num_iterations} iterations...")
+    def run_vectorized_batch(self, first_iteration, batch_size):
+        """
+        Run a batch of iterations at once using NumPy arrays.
+
+        All Poisson arrivals, batch arrivals, vehicle types and exit times
+        for the (iterations x minutes) grid of a day are drawn up front.
+        Occupancy is then advanced one time step at a time for the whole
+        batch, with departures kept as counts per (iteration, vehicle type,
+        time step): by advance_occupancy (NumPy), or by the compiled
+        occupancy_kernel with backend='numba'. Both give identical results.
+
+        With config.days > 1 the days run one after another on the same
+        occupancy and departure arrays. The departure array covers today,
+        the night and tomorrow, so overnight stayers carry over.
 
-        for i in range(self.num_iterations):
-            result = self.run_single_iteration(i)
-            self.results.append(result)
+        With config.circling, vehicles finding their type full go into a
+        retry queue keyed by time step (see queue_retries); only the
+        circling vehicles are visited again, never the whole grid.
 
-            # Progress indicator
-            if (i + 1) % 100 == 0:
-                print(f"  Completed {i + 1}/{self.num_iterations} iterations...")
+        variance_reduction changes only how arrival counts, vehicle types
+        and exit times are sampled (draw_arrival_counts, antithetic_partners).
+        """
+        config = self.config
+        capacities = config.capacities
+        days = config.days
+        start_time = config.start_hour * 3600
+        num_steps = int((config.end_hour - config.start_hour) * 3600 // config.time_step)
+        steps_per_day = int(SECONDS_PER_DAY // config.time_step)
+        step_times = start_time + config.time_step * np.arange(num_steps)
+        step_hours = step_times // 3600
+
+        # Same collection rule as run_single_iteration
+        collection_steps = []
+        next_collection_time = start_time
+        for step, step_time in enumerate(step_times):
+            if step_time >= next_collection_time:
+                collection_steps.append(step)
+                next_collection_time += config.data_collection_interval
+        collection_index = np.full(num_steps, -1)
+        collection_index[collection_steps] = np.arange(len(collection_steps))
+        num_collections = len(collection_steps)
+
+        arrival_steps = np.flatnonzero((step_hours >= config.start_hour) & (step_hours < config.arrival_end_hour))
+        arrival_hours = step_hours[arrival_steps]
+        hourly_rates = np.array([config.hourly_arrival_rates.get(h, 5) for h in arrival_hours])
+        is_peak = np.isin(arrival_hours, config.peak_hours)
+        arrival_index = np.full(num_steps, -1)
+        arrival_index[arrival_steps] = np.arange(len(arrival_steps))
+
+        # Kept across days: occupancy, and departures per (iteration, type, step)
+        # for today's steps, the night (index num_steps) and tomorrow's steps
+        count_dtype = np.int64 if self.backend == 'numba' else np.int32
+        occupied = np.zeros((batch_size, 3), dtype=np.int64 if self.backend == 'numba' else int)
+        departures = np.zeros((batch_size, 3, 2 * num_steps + 2), dtype=count_dtype)
+        arrivals_by_type = np.zeros((batch_size, days, 3), dtype=int)
+        parked_by_type = np.zeros((batch_size, days, 3), dtype=int)
+        snapshots = np.zeros((batch_size, days, num_collections, 3), dtype=int)
+        carried_over = np.zeros((batch_size, days), dtype=int)
+        circled_by_iteration = np.zeros(batch_size, dtype=int)
+        wait_iterations, wait_seconds = [], []
+
+        for day in range(days):
+            if day > 0:
+                # Overnight: vehicles leaving after closing time are gone, tomorrow becomes today
+                occupied -= departures[:, :, num_steps]
+                departures[:, :, :num_steps + 1] = departures[:, :, num_steps + 1:]
+                departures[:, :, num_steps + 1:] = 0
+                carried_over[:, day] = occupied.sum(axis=1)
+            scale = config.arrival_scale(day)
+
+            # 1. Arrivals per (iteration, arrival step)
+            rates = hourly_rates * scale * (config.time_step / 3600.0)
+            counts = self.draw_arrival_counts(rates, arrival_hours, is_peak, scale, batch_size)
+
+            # 2. One entry per vehicle, ordered by arrival step then iteration
+            group_counts = counts.T.ravel()
+            num_vehicles = int(group_counts.sum())
+            group = np.repeat(np.arange(group_counts.size), group_counts)
+            vehicle_iteration = group % batch_size
+            vehicle_step = arrival_steps[group // batch_size]
+
+            if self.variance_reduction == 'antithetic':
+                paired, partner = antithetic_partners(vehicle_iteration, batch_size)
+                rand = self.rng.random(num_vehicles)
+                rand[paired] = 1.0 - rand[partner]
+            else:
+                rand = self.rng.random(num_vehicles)
+            motorcycle_below, car_below = self.vehicle_type_thresholds(vehicle_iteration)
+            vehicle_type = np.where(rand < motorcycle_below, 0, np.where(rand < car_below, 1, 2))
+
+            # Departure step: first step at or after the departure time
+            arrival_time = step_times[vehicle_step]
+            if self.variance_reduction == 'antithetic':
+                exit_rand = self.rng.random(num_vehicles)
+                exit_rand[paired] = 1.0 - exit_rand[partner]
+                target_exit = config.exit_time_min + (config.exit_time_max - config.exit_time_min) * exit_rand
+            else:
+                target_exit = self.rng.uniform(config.exit_time_min, config.exit_time_max, num_vehicles)
+            duration = np.maximum(0.5 * 3600, (target_exit - arrival_time / 3600.0) * 3600)
+            if days > 1:
+                duration += SECONDS_PER_DAY * (self.rng.random(num_vehicles) < config.prob_overnight)
+            departure_step = np.ceil((arrival_time + duration - start_time) / config.time_step).astype(int)
+            # Today's steps, then the night (after closing), then tomorrow's steps
+            departure_step = np.where(departure_step >= steps_per_day,
+                                      num_steps + 1 + np.minimum(departure_step - steps_per_day, num_steps),
+                                      np.minimum(departure_step, num_steps))
+
+            step_offsets = np.concatenate(([0], np.cumsum(counts.sum(axis=0))))
+
+            # Circling: the waits (seconds) before each of a vehicle's retries, drawn for every vehicle
+            retry_gaps = np.zeros((num_vehicles, 0), dtype=np.int64)
+            if config.circling:
+                retry_gaps = self.rng.geometric(config.circling_retry_rate,
+                                                size=(num_vehicles, max(1, config.max_search_attempts - 1)))
+
+            # 3. Advance occupancy for the whole batch
+            if self.backend == 'numba':
+                day_results = _occupancy_kernel(
+                    batch_size, num_steps, capacities.astype(np.int64), step_offsets.astype(np.int64),
+                    arrival_index, vehicle_iteration.astype(np.int64), vehicle_type.astype(np.int64),
+                    departure_step.astype(np.int64), collection_index, num_collections, occupied, departures,
+                    config.circling, retry_gaps.astype(np.int64), config.max_search_attempts,
+                    float(config.circling_timeout), float(config.time_step))
+            else:
+                day_results = self.advance_occupancy(
+                    batch_size, num_steps, capacities, group_counts, group, step_offsets, arrival_index,
+                    vehicle_iteration, vehicle_type, departure_step, collection_index, num_collections,
+                    occupied, departures, retry_gaps)
+            arrivals_by_type[:, day], parked_by_type[:, day], snapshots[:, day], circled, circling_wait = day_results
+            if config.circling:
+                circled_by_iteration += np.bincount(vehicle_iteration[circled], minlength=batch_size)
+                waited = circling_wait >= 0
+                wait_iterations.append(vehicle_iteration[waited])
+                wait_seconds.append(circling_wait[waited])
+
+        # 4. Per-iteration summaries over all days
+        day_totals = snapshots.sum(axis=3)
+        day_full = (snapshots >= capacities).any(axis=3)
+        totals = day_totals.reshape(batch_size, -1)
+        full = day_full.reshape(batch_size, -1)
+        peak_index = totals.argmax(axis=1)
+        peak_occupancy = totals[np.arange(batch_size), peak_index]
+        rejected_by_type = (arrivals_by_type - parked_by_type).sum(axis=1)
+
+        time_series = np.zeros((batch_size, days * num_collections), dtype=TIME_SERIES_DTYPE)
+        time_series['time'] = (step_times[collection_steps] + SECONDS_PER_DAY * np.arange(days)[:, None]).ravel()
+        time_series['mc'] = snapshots[:, :, :, 0].reshape(batch_size, -1)
+        time_series['car'] = snapshots[:, :, :, 1].reshape(batch_size, -1)
+        time_series['truck'] = snapshots[:, :, :, 2].reshape(batch_size, -1)
+        peak_utilization = time_series_columns(time_series, config)['utilization_percent'][np.arange(batch_size), peak_index]
+
+        daily = np.zeros((batch_size, days), dtype=DAILY_DTYPE)
+        daily['day'] = np.arange(days)
+        daily['arrivals'] = arrivals_by_type.sum(axis=2)
+        daily['parked'] = parked_by_type.sum(axis=2)
+        daily['rejected'] = daily['arrivals'] - daily['parked']
+        daily['peak_occupancy'] = day_totals.max(axis=2)
+        daily['times_full'] = day_full.sum(axis=2)
+        daily['carried_over'] = carried_over
+        arrivals_by_type = arrivals_by_type.sum(axis=1)
+        parked_by_type = parked_by_type.sum(axis=1)
+
+        # Circling waits grouped by iteration
+        circling_waits = [np.zeros(0, dtype=np.int32)] * batch_size
+        if wait_seconds:
+            wait_iterations, wait_seconds = np.concatenate(wait_iterations), np.concatenate(wait_seconds)
+            order = np.argsort(wait_iterations, kind='stable')
+            bounds = np.cumsum(np.bincount(wait_iterations, minlength=batch_size))[:-1]
+            circling_waits = np.split(wait_seconds[order].astype(np.int32), bounds)
+
+        results = []
+        for b in range(batch_size):
+            result = IterationResult(
+                iteration=first_iteration + b,
+                arrivals=int(arrivals_by_type[b].sum()),
+                parked=int(parked_by_type[b].sum()),
+                rejected=int(rejected_by_type[b].sum()),
+                peak_occupancy=int(peak_occupancy[b]),
+                times_full=int(full[b].sum()),
+                mc_arrivals=int(arrivals_by_type[b, 0]),
+                car_arrivals=int(arrivals_by_type[b, 1]),
+                truck_arrivals=int(arrivals_by_type[b, 2]),
+                mc_rejected=int(rejected_by_type[b, 0]),
+                car_rejected=int(rejected_by_type[b, 1]),
+                truck_rejected=int(rejected_by_type[b, 2]),
+                time_series=time_series[b],
+                daily=daily[b],
+                circled=int(circled_by_iteration[b]),
+                parked_after_circling=len(circling_waits[b]),
+                circling_waits=circling_waits[b],
+            )
+            if result.peak_occupancy > 0:
+                result.peak_utilization = float(peak_utilization[b])
+            results.append(result)
+
+        return results
+
+    def vehicle_type_thresholds(self, vehicle_iteration):
+        """
+        Uniform draws below the first threshold are motorcycles, below the
+        second cars, the rest trucks (scalars, or one pair per vehicle)
+        """
+        return self.config.prob_motorcycle, self.config.prob_motorcycle + self.config.prob_car
+
+    def draw_arrival_counts(self, rates, arrival_hours, is_peak, scale, batch_size):
+        """
+        Step 1 of run_vectorized_batch: arrivals per (iteration, arrival
+        step), Poisson arrivals plus batch arrivals at peak hours, sampled
+        as set by variance_reduction.
+        """
+        config = self.config
+        shape = (batch_size, len(rates))
+        if self.variance_reduction == 'antithetic':
+            counts = poisson_quantiles(self.antithetic_uniforms(shape), rates)
+            batch_arrival = is_peak & (self.antithetic_uniforms(shape) < config.prob_batch_arrival * scale)
+            choices = config.batch_size_max - config.batch_size_min + 1
+            batch_sizes = config.batch_size_min + np.minimum(
+                (self.antithetic_uniforms(shape) * choices).astype(int), choices - 1)
+        elif self.variance_reduction is None:
+            counts = self.rng.poisson(rates, size=shape)
+            batch_arrival = is_peak & (self.rng.random(shape) < config.prob_batch_arrival * scale)
+            batch_sizes = self.rng.integers(config.batch_size_min, config.batch_size_max + 1, size=shape)
+        else:
+            return self.stratified_counts(rates, arrival_hours, is_peak, scale, batch_size)
+        counts += np.where(batch_arrival, batch_sizes, 0)
+        return counts
+
+    def antithetic_uniforms(self, shape):
+        """Uniforms for a batch of iterations (rows) in antithetic pairs: row 2k+1 is 1 - row 2k"""
+        u = self.rng.random(shape)
+        u[1::2] = 1.0 - u[:-1:2]
+        return u
+
+    def stratified_uniforms(self, batch_size):
+        """
+        One uniform per iteration. Each group of group_size iterations gets
+        one from each of its equal-probability strata, in random order.
+        """
+        u = np.empty(batch_size)
+        for start in range(0, batch_size, self.group_size):
+            size = min(self.group_size, batch_size - start)
+            u[start:start + size] = (self.rng.permutation(size) + self.rng.random(size)) / size
+        return u
+
+    def stratified_counts(self, rates, arrival_hours, is_peak, scale, batch_size):
+        """
+        Arrivals per (iteration, arrival step) with stratified totals: for
+        the whole day ('stratified') or for every arrival hour ('lhs'), the
+        number of Poisson arrivals and the number of batch arrivals are each
+        stratified with their own shuffle of the strata (a Latin hypercube).
+        The totals are then spread over their steps at random - a
+        multinomial for the Poisson arrivals, a random subset of the peak
+        steps for the batches - so the arrival process is unchanged.
+        """
+        config = self.config
+        if self.variance_reduction == 'stratified':
+            periods = [np.arange(len(rates))]
+        else:
+            periods = [np.flatnonzero(arrival_hours == hour) for hour in np.unique(arrival_hours)]
+        counts = np.zeros((batch_size, len(rates)), dtype=np.int64)
+        for steps in periods:
+            total_rate = rates[steps].sum()
+            if total_rate > 0:
+                totals = poisson_quantiles(self.stratified_uniforms(batch_size), total_rate)
+                counts[:, steps] = self.rng.multinomial(totals, rates[steps] / total_rate)
+
+            peak_steps = steps[is_peak[steps]]
+            if len(peak_steps) == 0:
+                continue
+            num_batches = binomial_quantiles(self.stratified_uniforms(batch_size), len(peak_steps),
+                                             config.prob_batch_arrival * scale)
+            # The steps with the num_batches smallest random keys get a batch
+            key_rank = self.rng.random((batch_size, len(peak_steps))).argsort(axis=1).argsort(axis=1)
+            batch_sizes = self.rng.integers(config.batch_size_min, config.batch_size_max + 1,
+                                            size=key_rank.shape)
+            counts[:, peak_steps] += np.where(key_rank < num_batches[:, np.newaxis], batch_sizes, 0)
+        return counts
+
+    def advance_occupancy(self, batch_size, num_steps, capacities, group_counts, group, step_offsets,
+                          arrival_index, vehicle_iteration, vehicle_type, departure_step, collection_index,
+                          num_collections, occupied, departures, retry_gaps):
+        """
+        Step 3 of run_vectorized_batch with NumPy: advance occupancy one time
+        step at a time for the whole batch, with departures kept as counts
+        per (iteration, vehicle type, time step). occupied and departures
+        are updated in place (they carry over to the next day).
+        Returns (arrivals_by_type, parked_by_type, snapshots, circled,
+        circling_wait): per vehicle, whether it circled and how long before
+        it parked (seconds, -1 if it did not park after circling).
+        """
+        # The first `free slots` vehicles of each rank sequence get to park (first come, first served)
+        vehicle_rank = arrival_ranks(vehicle_type, group_counts, group)
+
+        arrivals_by_type = np.zeros((batch_size, 3), dtype=int)
+        parked_by_type = np.zeros((batch_size, 3), dtype=int)
+        snapshots = np.zeros((batch_size, num_collections, 3), dtype=int)
+
+        circling = retry_gaps.shape[1] > 0
+        circled = np.zeros(len(vehicle_type), dtype=bool)
+        circling_wait = np.full(len(vehicle_type), -1)
+        first_step = np.zeros(len(vehicle_type), dtype=int)
+        retry_queue = {}
+
+        for step in range(num_steps):
+            a = arrival_index[step]
+            if a >= 0 and step_offsets[a + 1] > step_offsets[a]:
+                segment = slice(step_offsets[a], step_offsets[a + 1])
+                it = vehicle_iteration[segment]
+                vt = vehicle_type[segment]
+                arriving = np.bincount(it * 3 + vt, minlength=batch_size * 3).reshape(batch_size, 3)
+                free = capacities - occupied
+
+                parks = vehicle_rank[segment] < free[it, vt]
+                np.add.at(departures, (it[parks], vt[parks], departure_step[segment][parks]), 1)
+                parked = (it[parks], vt[parks], vehicle_rank[segment][parks], departure_step[segment][parks])
+
+                parking_now = np.minimum(arriving, free)
+                occupied += parking_now
+                arrivals_by_type += arriving
+                parked_by_type += parking_now
+
+                if circling and not parks.all():
+                    full = step_offsets[a] + np.flatnonzero(~parks)
+                    circled[full] = True
+                    first_step[full] = step
+                    self.queue_retries(retry_queue, full, np.ones(len(full), dtype=int), step, retry_gaps, num_steps)
+            else:
+                parked = None
+
+            occupied -= departures[:, :, step]
+
+            retried = None
+            if step in retry_queue:
+                parking, rank = self.take_retries(retry_queue, step, capacities, occupied, vehicle_iteration,
+                                                  vehicle_type, retry_gaps, num_steps)
+                it, vt = vehicle_iteration[parking], vehicle_type[parking]
+                np.add.at(departures, (it, vt, departure_step[parking]), 1)
+                parking_now = np.bincount(it * 3 + vt, minlength=batch_size * 3).reshape(batch_size, 3)
+                occupied += parking_now
+                parked_by_type += parking_now
+                circling_wait[parking] = (step - first_step[parking]) * self.config.time_step
+                retried = (it, vt, rank, departure_step[parking])
+
+            c = collection_index[step]
+            if c >= 0:
+                snapshots[:, c, :] = occupied
+
+            self.place_vehicles(step, num_steps, parked, retried, c)
+
+        return arrivals_by_type, parked_by_type, snapshots, circled, circling_wait
+
+    def queue_retries(self, retry_queue, vehicles, attempts, step, retry_gaps, num_steps):
+        """
+        Queue the next try of circling vehicles that failed to park in this
+        step (attempts = failures so far), or let them give up; the same
+        rules as next_retry_time. retry_queue maps a time step to the
+        (vehicles, attempts) arrays to try then, in the order they were queued.
+        """
+        config = self.config
+        gap = retry_gaps[vehicles, np.minimum(attempts, retry_gaps.shape[1]) - 1]
+        retry_step = step + np.ceil(gap / config.time_step).astype(int)
+        queued = (attempts < config.max_search_attempts) & (gap <= config.circling_timeout) & (retry_step < num_steps)
+        if not queued.any():
+            return
+        vehicles, attempts, retry_step = vehicles[queued], attempts[queued], retry_step[queued]
+
+        # Group by target step; the stable sort keeps queue order within each
+        order = np.argsort(retry_step, kind='stable')
+        targets, starts = np.unique(retry_step[order], return_index=True)
+        for target, part in zip(targets.tolist(), np.split(order, starts[1:])):
+            retry_queue.setdefault(target, []).append((vehicles[part], attempts[part]))
+
+    def take_retries(self, retry_queue, step, capacities, occupied, vehicle_iteration, vehicle_type,
+                     retry_gaps, num_steps):
+        """
+        Try again for the circling vehicles queued for this step: in queue
+        order, the first `free slots` of each iteration and vehicle type park
+        and the rest are queued again. Returns the indices of those that
+        park and their rank within their iteration and type.
+        """
+        vehicles, attempts = (np.concatenate(arrays) for arrays in zip(*retry_queue.pop(step)))
+        it, vt = vehicle_iteration[vehicles], vehicle_type[vehicles]
+
+        # Rank within each (iteration, type), keeping queue order
+        key = it * 3 + vt
+        order = np.argsort(key, kind='stable')
+        rank = np.empty(len(vehicles), dtype=int)
+        rank[order] = np.arange(len(vehicles)) - np.searchsorted(key[order], key[order])
+
+        parks = rank < (capacities - occupied)[it, vt]
+        self.queue_retries(retry_queue, vehicles[~parks], attempts[~parks] + 1, step, retry_gaps, num_steps)
+        return vehicles[parks], rank[parks]
+
+    def place_vehicles(self, step, num_steps, parked, retried, collection):
+        """
+        Per-step hook of advance_occupancy, called at the end of each step.
+        parked is (iteration, vehicle type, rank, departure step) of the
+        vehicles that parked on arrival at this step, or None; retried is
+        the same for circling vehicles that parked after the step's
+        departures, or None. collection is the snapshot index of the step
+        (-1 if none). Subclasses use it to track where vehicles park.
+        """
+
+    def __getstate__(self):
+        # Worker processes get a copy without the open output files, profiling
+        # wrappers or results collected so far (e.g. from a checkpoint)
+        state = self.__dict__.copy()
+        state['result_writer'] = None
+        state['results'] = []
+        if self.profiler is not None:
+            for _, method_name in self.profiler.wrapped:
+                state.pop(method_name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.profiler is not None:
+            self.profiler.reattach(self)
+
+    def block_generator(self, block_index):
+        """Independent random generator for one block of iterations"""
+        seed = np.random.SeedSequence(self.seed_sequence.entropy,
+                                      spawn_key=self.seed_sequence.spawn_key + (block_index,))
+        return np.random.default_rng(seed)
+
+    def num_blocks(self):
+        return -(-self.num_iterations // ITERATION_BLOCK_SIZE)
+
+    def run_block(self, block_index):
+        """Run one block of iterations on its own random stream"""
+        self.rng = self.block_generator(block_index)
+        first = block_index * ITERATION_BLOCK_SIZE
+        size = min(ITERATION_BLOCK_SIZE, self.num_iterations - first)
+
+        if self.profile_iteration is not None and first <= self.profile_iteration < first + size:
+            return self.run_profiled_block(first, size)
+        if self.engine == 'vectorized':
+            return self.run_vectorized_batch(first, size)
+        return [self.run_single_iteration(i) for i in range(first, first + size)]
+
+    def run_profiled_block(self, first, size):
+        """run_block() with cProfile running during profile_iteration (its whole batch if vectorized)"""
+        profile = cProfile.Profile()
+        if self.engine == 'vectorized':
+            profile.enable()
+            results = self.run_vectorized_batch(first, size)
+            profile.disable()
+            label = f'iterations {first}-{first + size - 1} (vectorized batch)'
+        else:
+            results = []
+            for i in range(first, first + size):
+                if i == self.profile_iteration:
+                    profile.enable()
+                    results.append(self.run_single_iteration(i))
+                    profile.disable()
+                else:
+                    results.append(self.run_single_iteration(i))
+            label = f'iteration {self.profile_iteration}'
+        profile.create_stats()
+        self.profiler.cprofile_stats, self.profiler.cprofile_label = profile.stats, label
+        return results
+
+    def run_and_summarize_block(self, block_index):
+        """
+        Run one block and fold it into a StreamingStatistics.
+        Returns (results, statistics); results is empty when results are
+        not kept, so only the small summary travels back from a worker.
+        """
+        results = self.run_block(block_index)
+        statistics = StreamingStatistics(self.config, self.group_size)
+        statistics.add_many(results)
+        return (results if self.keep_results or self.stream_output else []), statistics
+
+    def run(self):
+        """Run all Monte Carlo iterations (or, with a tolerance, until the CIs are tight enough)"""
+        if self.tolerance is not None:
+            print(f"Running up to {self.max_iterations} iterations...")
+        else:
+            print(f"Running {self.num_iterations} iterations...")
+
+        # A resumed run starts after the checkpointed blocks (or has nothing left if it had converged)
+        blocks = range(self.completed_blocks, self.completed_blocks if self.converged else self.num_blocks())
+        self._last_checkpoint = time.monotonic()
+        if self.workers > 1:
+            # Each worker gets a copy of this simulation once; tasks are block numbers
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_init_worker, initargs=(self,)) as pool:
+                self._collect_blocks(self._map_blocks(pool, blocks))
+        else:
+            self._collect_blocks((*self.run_and_summarize_block(b), None) for b in blocks)
+
+        if self.tolerance is not None:
+            # Report the iterations actually used from here on
+            self.num_iterations = self.statistics.iterations
+            if self.converged:
+                print(f"\n[OK] Converged after {self.num_iterations} iterations")
+            else:
+                print(f"\n[--] Tolerance not reached within {self.max_iterations} iterations")
 
         print(f"\nAll {self.num_iterations} iterations completed!\n")
 
+    def _map_blocks(self, pool, blocks):
+        """Block results from the pool, in order"""
+        if self.tolerance is None:
+            yield from pool.map(_run_worker_block, blocks)
+            return
+        # Adaptive runs hand out one block per worker at a time, so stopping
+        # early wastes at most one round of blocks
+        for start in range(0, len(blocks), self.workers):
+            yield from pool.map(_run_worker_block, blocks[start:start + self.workers])
+
+    def confidence_intervals(self):
+        """metric -> (estimate, 95% CI half-width) for the adaptive metrics"""
+        return {metric: self.statistics.confidence_interval(metric) for metric in self.adaptive_metrics}
+
+    def check_convergence(self):
+        """True once every adaptive metric's CI half-width is within tolerance"""
+        if self.statistics.iterations < min(ADAPTIVE_MIN_ITERATIONS, self.max_iterations):
+            return False
+        return all(half_width <= self.tolerance * abs(estimate)
+                   for estimate, half_width in self.confidence_intervals().values())
+
+    def add_block_result(self, results, statistics):
+        """Fold one finished block (from run_and_summarize_block) into this simulation"""
+        if self.result_writer is not None:
+            self.result_writer.write_block(results, self.config)
+        if self.keep_results:
+            self.results.extend(results)
+        self.statistics.merge(statistics)
+
+    def _collect_blocks(self, block_results):
+        """Merge block results in iteration order with a progress indicator"""
+        for results, statistics, profile in block_results:
+            self.add_block_result(results, statistics)
+            self.completed_blocks += 1
+            if profile is not None:
+                self.profiler.merge(profile)
+            if self.tolerance is None:
+                print(f"  Completed {self.statistics.iterations}/{self.num_iterations} iterations...")
+            else:
+                widths = ', '.join(f"{metric} {estimate:.4g} +/- {half_width:.3g}"
+                                   for metric, (estimate, half_width) in self.confidence_intervals().items())
+                print(f"  Completed {self.statistics.iterations} iterations... ({widths})")
+                # Blocks are checked in order, so the stopping point does not depend on --workers
+                self.converged = self.check_convergence()
+
+            if self.checkpoint_file is not None and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+                self._last_checkpoint = time.monotonic()
+            if self.converged:
+                break
+
+    def checkpoint_settings(self):
+        """Everything that must match for a checkpoint to be resumed by this simulation"""
+        return {
+            'config': self.config.to_dict(),
+            'engine': self.engine,
+            'backend': self.backend,
+            'iterations': self.max_iterations,
+            'tolerance': self.tolerance,
+            'adaptive_metrics': self.adaptive_metrics,
+            'keep_results': self.keep_results,
+            'output_format': 'parquet' if isinstance(self.result_writer, ParquetResultWriter) else 'csv',
+            'seed_entropy': self.seed_sequence.entropy,
+            'spawn_key': self.seed_sequence.spawn_key,
+            'iteration_block_size': ITERATION_BLOCK_SIZE,
+            'variance_reduction': self.variance_reduction,
+        }
+
+    def checkpoint_results_file(self):
+        return self.checkpoint_file + '.results'
+
+    def append_checkpoint_results(self):
+        """
+        Append the results kept since the last checkpoint to the checkpoint
+        results file, as one pickled list; earlier results are never
+        written again. Anything after the last checkpoint's size (from an
+        interrupted save) is dropped first.
+        """
+        if not self.keep_results:
+            return
+        with open(self.checkpoint_results_file(), 'ab') as f:
+            f.truncate(self._results_file_size)
+            if self._saved_results < len(self.results):
+                pickle.dump(self.results[self._saved_results:], f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            self._saved_results = len(self.results)
+            self._results_file_size = f.tell()
+
+    def load_checkpoint_results(self, size):
+        """Kept results from the first `size` bytes of the checkpoint results file"""
+        results = []
+        if size == 0:
+            return results
+        with open(self.checkpoint_results_file(), 'r+b') as f:
+            f.truncate(size)
+            while f.tell() < size:
+                results.extend(pickle.load(f))
+        return results
+
+    def save_checkpoint(self):
+        """
+        Write the finished blocks to checkpoint_file: the mergeable
+        statistics, the block count and the writer state. Kept results go
+        to the append-only checkpoint results file first. The checkpoint is
+        written under a temporary name and then renamed, so an interruption
+        while saving leaves the previous checkpoint intact.
+        """
+        self.append_checkpoint_results()
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'settings': self.checkpoint_settings(),
+            'timestamp': self.timestamp,
+            'completed_blocks': self.completed_blocks,
+            'converged': self.converged,
+            'statistics': self.statistics,
+            'results_file_size': self._results_file_size,
+            'profiler': self.profiler,
+            'parquet_parts': self.result_writer.checkpoint() if self.result_writer is not None else None,
+        }
+        temporary_file = self.checkpoint_file + '.tmp'
+        with open(temporary_file, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_file, self.checkpoint_file)
+
+    def resume_from(self, checkpoint):
+        """Continue from a checkpoint (see load_checkpoint) instead of starting at block 0"""
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            raise ValueError("Checkpoint was written by a different version of this engine")
+        settings = self.checkpoint_settings()
+        different = [name for name, value in checkpoint['settings'].items() if settings.get(name) != value]
+        if different:
+            raise ValueError(f"Checkpoint does not match this run's settings: {', '.join(different)}")
+
+        self.timestamp = checkpoint['timestamp']
+        self.completed_blocks = checkpoint['completed_blocks']
+        self.converged = checkpoint['converged']
+        self.statistics = checkpoint['statistics']
+        self.results = self.load_checkpoint_results(checkpoint['results_file_size'])
+        self._saved_results = len(self.results)
+        self._results_file_size = checkpoint['results_file_size']
+        if self.profiler is not None and checkpoint['profiler'] is not None:
+            self.profiler.merge(checkpoint['profiler'])
+        if self.result_writer is not None:
+            self.result_writer.resume(checkpoint['parquet_parts'])
+        print(f"[OK] Resuming from checkpoint: {self.statistics.iterations} iterations already done")
+
+    def remove_checkpoint(self):
+        """Delete the checkpoint once the run's output has been written"""
+        if self.checkpoint_file is None:
+            return
+        for path in (self.checkpoint_file, self.checkpoint_results_file()):
+            if os.path.exists(path):
+                os.remove(path)
+
     def calculate_statistics(self):
         """Calculate statistical measures across all iterations"""
-        arrivals = [r.arrivals for r in self.results]
-        parked = [r.parked for r in self.results]
-        rejected = [r.rejected for r in self.results]
-        peak_occupancy = [r.peak_occupancy for r in self.results]
-        peak_utilization = [r.peak_utilization for r in self.results]
-        times_full = [r.times_full for r in self.results]
+        metrics = self.statistics.metrics
+        quantiles = self.statistics.quantiles
 
         # Calculate P(Full) - Equation 4 from manuscript
-        total_observations = sum(len(r.time_series) for r in self.results)
-        total_full_observations = sum(r.times_full for r in self.results)
+        total_observations = self.statistics.total_observations
+        total_full_observations = self.statistics.total_full_observations
         prob_full = total_full_observations / total_observations if total_observations > 0 else 0
 
         stats = {
             'iterations': self.num_iterations,
-            'total_capacity': TOTAL_CAPACITY,
-            'mc_capacity': TOTAL_MC_CAPACITY,
-            'car_capacity': TOTAL_CAR_CAPACITY,
-            'truck_capacity': TOTAL_TRUCK_CAPACITY,
+            'total_capacity': self.config.total_capacity,
+            'mc_capacity': self.config.mc_capacity,
+            'car_capacity': self.config.car_capacity,
+            'truck_capacity': self.config.truck_capacity,
 
             # Arrivals
-            'arrivals_mean': np.mean(arrivals),
-            'arrivals_std': np.std(arrivals),
-            'arrivals_min': np.min(arrivals),
-            'arrivals_max': np.max(arrivals),
-            'arrivals_ci_95': (np.percentile(arrivals, 2.5), np.percentile(arrivals, 97.5)),
+            'arrivals_mean': metrics['arrivals'].mean,
+            'arrivals_std': metrics['arrivals'].std(),
+            'arrivals_min': metrics['arrivals'].min,
+            'arrivals_max': metrics['arrivals'].max,
+            'arrivals_ci_95': (quantiles['arrivals'].percentile(2.5), quantiles['arrivals'].percentile(97.5)),
 
             # Parked
-            'parked_mean': np.mean(parked),
-            'parked_std': np.std(parked),
-            'parked_min': np.min(parked),
-            'parked_max': np.max(parked),
-            'parked_ci_95': (np.percentile(parked, 2.5), np.percentile(parked, 97.5)),
+            'parked_mean': metrics['parked'].mean,
+            'parked_std': metrics['parked'].std(),
+            'parked_min': metrics['parked'].min,
+            'parked_max': metrics['parked'].max,
+            'parked_ci_95': (quantiles['parked'].percentile(2.5), quantiles['parked'].percentile(97.5)),
 
             # Rejected
-            'rejected_mean': np.mean(rejected),
-            'rejected_std': np.std(rejected),
-            'rejected_min': np.min(rejected),
-            'rejected_max': np.max(rejected),
-            'rejected_ci_95': (np.percentile(rejected, 2.5), np.percentile(rejected, 97.5)),
+            'rejected_mean': metrics['rejected'].mean,
+            'rejected_std': metrics['rejected'].std(),
+            'rejected_min': metrics['rejected'].min,
+            'rejected_max': metrics['rejected'].max,
+            'rejected_ci_95': (quantiles['rejected'].percentile(2.5), quantiles['rejected'].percentile(97.5)),
 
             # Peak occupancy
-            'peak_occupancy_mean': np.mean(peak_occupancy),
-            'peak_occupancy_std': np.std(peak_occupancy),
-            'peak_occupancy_min': np.min(peak_occupancy),
-            'peak_occupancy_max': np.max(peak_occupancy),
+            'peak_occupancy_mean': metrics['peak_occupancy'].mean,
+            'peak_occupancy_std': metrics['peak_occupancy'].std(),
+            'peak_occupancy_min': metrics['peak_occupancy'].min,
+            'peak_occupancy_max': metrics['peak_occupancy'].max,
 
             # Peak utilization
-            'peak_utilization_mean': np.mean(peak_utilization),
-            'peak_utilization_std': np.std(peak_utilization),
+            'peak_utilization_mean': metrics['peak_utilization'].mean,
+            'peak_utilization_std': metrics['peak_utilization'].std(),
 
             # Probability of full capacity (Equation 4)
             'probability_full': prob_full,
-            'times_full_mean': np.mean(times_full),
+            'times_full_mean': metrics['times_full'].mean,
         }
 
+        if self.config.circling:
+            # Vehicles that found their type full, and how many of them parked after all
+            circled = metrics['circled'].mean
+            waits = self.statistics.circling_wait_quantiles
+            stats.update({
+                'circled_mean': circled,
+                'parked_after_circling_mean': metrics['parked_after_circling'].mean,
+                'parked_after_circling_percent': (metrics['parked_after_circling'].mean / circled * 100
+                                                  if circled else 0.0),
+                'circling_wait_mean': self.statistics.circling_wait.mean,
+                'circling_wait_median': waits.percentile(50),
+                'circling_wait_p95': waits.percentile(95),
+                'circling_wait_max': self.statistics.circling_wait.max,
+            })
+
+        if self.variance_reduction is not None:
+            # Effective sample size: iterations of plain Monte Carlo giving the same CI width
+            for metric in VARIANCE_REDUCTION_METRICS:
+                _, half_width = self.statistics.confidence_interval(metric)
+                stats[f'{metric}_ci_half_width'] = half_width
+                stats[f'{metric}_effective_sample_size'] = self.statistics.effective_sample_size(metric)
+
         return stats
 
     def export_results(self, output_dir='monte_carlo_results'):
         """Export results to CSV files"""
-        import os
         os.makedirs(output_dir, exist_ok=True)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = self.timestamp or datetime.now().strftime('%Y%m%d_%H%M%S')
 
         # 1. Summary statistics
         stats = self.calculate_statistics()
@@ -458,94 +2295,125 @@ class MonteCarloSimulation:
         print(f"[OK] Summary statistics saved to: {stats_file}")
 
         # 2. Iteration-level results
-        iteration_data = []
-        for r in self.results:
-            iteration_data.append({
-                'iteration': r.iteration,
-                'arrivals': r.arrivals,
-                'parked': r.parked,
-                'rejected': r.rejected,
-                'peak_occupancy': r.peak_occupancy,
-                'peak_utilization': r.peak_utilization,
-                'times_full': r.times_full,
-                'mc_arrivals': r.mc_arrivals,
-                'car_arrivals': r.car_arrivals,
-                'truck_arrivals': r.truck_arrivals,
-                'mc_rejected': r.mc_rejected,
-                'car_rejected': r.car_rejected,
-                'truck_rejected': r.truck_rejected,
-            })
-
-        iterations_df = pd.DataFrame(iteration_data)
-        iterations_file = os.path.join(output_dir, f'iteration_results_{timestamp}.csv')
-        iterations_df.to_csv(iterations_file, index=False)
-        print(f"[OK] Iteration results saved to: {iterations_file}")
-
-        # 3. Time series data (aggregate across all iterations)
-        time_series_data = []
-        for result in self.results:
-            for state in result.time_series:
-                hour = state.time / 3600.0
-                time_series_data.append({
-                    'iteration': result.iteration,
-                    'hour': hour,
-                    'time_str': f"{int(hour):02d}:{int((hour % 1) * 60):02d}",
-                    'total_occupied': state.total_occupied,
-                    'utilization_percent': state.utilization_percent,
-                    'mc_occupied': state.mc_occupied,
-                    'car_occupied': state.car_occupied,
-                    'truck_occupied': state.truck_occupied,
-                    'mc_utilization': state.mc_utilization,
-                    'car_utilization': state.car_utilization,
-                    'truck_utilization': state.truck_utilization,
-                    'is_full': state.is_full(),
+        if self.result_writer is not None:
+            # Rows were streamed out during the run
+            self.result_writer.close()
+        elif self.keep_results:
+            iteration_data = []
+            for r in self.results:
+                iteration_data.append({
+                    'iteration': r.iteration,
+                    'arrivals': r.arrivals,
+                    'parked': r.parked,
+                    'rejected': r.rejected,
+                    'peak_occupancy': r.peak_occupancy,
+                    'peak_utilization': r.peak_utilization,
+                    'times_full': r.times_full,
+                    'mc_arrivals': r.mc_arrivals,
+                    'car_arrivals': r.car_arrivals,
+                    'truck_arrivals': r.truck_arrivals,
+                    'mc_rejected': r.mc_rejected,
+                    'car_rejected': r.car_rejected,
+                    'truck_rejected': r.truck_rejected,
                 })
+                if self.config.circling:
+                    iteration_data[-1].update(circled=r.circled, parked_after_circling=r.parked_after_circling)
+
+            iterations_df = pd.DataFrame(iteration_data)
+            iterations_file = os.path.join(output_dir, f'iteration_results_{timestamp}.csv')
+            iterations_df.to_csv(iterations_file, index=False)
+            print(f"[OK] Iteration results saved to: {iterations_file}")
+
+            # 3. Time series data (aggregate across all iterations), derived columns in one pass
+            time_series, iterations = concatenate_time_series(self.results)
+            time_series_data = {'iteration': iterations, **time_series_columns(time_series, self.config)}
+
+            time_series_df = pd.DataFrame(time_series_data)
+            time_series_file = os.path.join(output_dir, f'time_series_{timestamp}.csv')
+            time_series_df.to_csv(time_series_file, index=False)
+            print(f"[OK] Time series data saved to: {time_series_file}")
+        else:
+            print("[--] Streaming mode: iteration results and time series were not kept")
 
-        time_series_df = pd.DataFrame(time_series_data)
-        time_series_file = os.path.join(output_dir, f'time_series_{timestamp}.csv')
-        time_series_df.to_csv(time_series_file, index=False)
-        print(f"[OK] Time series data saved to: {time_series_file}")
-
-        # 4. Aggregated time series (mean by hour)
-        if len(time_series_df) > 0:
-            hourly_avg = time_series_df.groupby('time_str').agg({
-                'total_occupied': ['mean', 'std', 'min', 'max'],
-                'utilization_percent': ['mean', 'std'],
-                'mc_occupied': ['mean', 'std'],
-                'car_occupied': ['mean', 'std'],
-                'truck_occupied': ['mean', 'std'],
-                'is_full': 'mean',  # Probability of being full at this time
-            }).reset_index()
-
-            hourly_avg.columns = ['_'.join(col).strip('_') for col in hourly_avg.columns.values]
+        # 4. Aggregated time series (mean by hour), from the streaming accumulators
+        if self.statistics.slots:
+            hourly_avg = self.statistics.hourly_averages()
             hourly_file = os.path.join(output_dir, f'hourly_averages_{timestamp}.csv')
             hourly_avg.to_csv(hourly_file, index=False)
             print(f"[OK] Hourly averages saved to: {hourly_file}")
 
+        # 4b. Per-day and per-week breakdown of multi-day runs
+        if self.config.days > 1:
+            daily_file = os.path.join(output_dir, f'daily_summary_{timestamp}.csv')
+            self.statistics.daily_summary().to_csv(daily_file, index=False)
+            print(f"[OK] Daily summary saved to: {daily_file}")
+            weekly_file = os.path.join(output_dir, f'weekly_summary_{timestamp}.csv')
+            self.statistics.weekly_summary().to_csv(weekly_file, index=False)
+            print(f"[OK] Weekly summary saved to: {weekly_file}")
+
+        # 4c. Waiting times of vehicles that parked after circling
+        if self.config.circling:
+            waits_file = os.path.join(output_dir, f'circling_waits_{timestamp}.csv')
+            self.statistics.circling_wait_table().to_csv(waits_file, index=False)
+            print(f"[OK] Circling waits saved to: {waits_file}")
+
         # 5. Save configuration
         config = {
             'timestamp': timestamp,
+            'scenario': self.config.name,
             'iterations': self.num_iterations,
-            'total_capacity': TOTAL_CAPACITY,
-            'mc_capacity': TOTAL_MC_CAPACITY,
-            'car_capacity': TOTAL_CAR_CAPACITY,
-            'truck_capacity': TOTAL_TRUCK_CAPACITY,
-            'hourly_arrival_rates': HOURLY_ARRIVAL_RATES,
+            'engine': self.engine,
+            'backend': self.backend,
+            'workers': self.workers,
+            'seed_entropy': str(self.seed_sequence.entropy),
+            'keep_results': self.keep_results,
+            'output_format': 'parquet' if isinstance(self.result_writer, ParquetResultWriter) else 'csv',
+            'iteration_block_size': ITERATION_BLOCK_SIZE,
+            'adaptive': None if self.tolerance is None else {
+                'tolerance': self.tolerance,
+                'metrics': list(self.adaptive_metrics),
+                'max_iterations': self.max_iterations,
+                'converged': self.converged,
+                'ci_95_half_widths': {metric: half_width
+                                      for metric, (_, half_width) in self.confidence_intervals().items()},
+            },
+            'total_capacity': self.config.total_capacity,
+            'mc_capacity': self.config.mc_capacity,
+            'car_capacity': self.config.car_capacity,
+            'truck_capacity': self.config.truck_capacity,
+            'hourly_arrival_rates': self.config.hourly_arrival_rates,
             'vehicle_distribution': {
-                'motorcycle': PROB_MOTORCYCLE,
-                'car': PROB_CAR,
-                'truck': PROB_TRUCK
+                'motorcycle': self.config.prob_motorcycle,
+                'car': self.config.prob_car,
+                'truck': self.config.prob_truck
             },
-            'peak_hours': PEAK_HOURS,
+            'peak_hours': self.config.peak_hours,
             'simulation_parameters': {
-                'start_hour': START_HOUR,
-                'end_hour': END_HOUR,
-                'time_step_seconds': SIMULATION_TIME_STEP,
-                'data_collection_interval_seconds': DATA_COLLECTION_INTERVAL,
-                'max_search_attempts': MAX_SEARCH_ATTEMPTS,
-                'circling_timeout_seconds': CIRCLING_TIMEOUT,
+                'start_hour': self.config.start_hour,
+                'end_hour': self.config.end_hour,
+                'time_step_seconds': self.config.time_step,
+                'data_collection_interval_seconds': self.config.data_collection_interval,
+                'max_search_attempts': self.config.max_search_attempts,
+                'circling_timeout_seconds': self.config.circling_timeout,
             }
         }
+        if self.variance_reduction is not None:
+            config['variance_reduction'] = {
+                'mode': self.variance_reduction,
+                'group_size': self.group_size,
+                'effective_sample_size': {metric: self.statistics.effective_sample_size(metric)
+                                          for metric in VARIANCE_REDUCTION_METRICS},
+            }
+        if self.config.circling:
+            config['simulation_parameters'].update(circling=True,
+                                                   circling_retry_rate_per_second=self.config.circling_retry_rate)
+        if self.config.days > 1:
+            config['multi_day'] = {
+                'days': self.config.days,
+                'first_weekday': WEEKDAY_NAMES[self.config.first_weekday],
+                'weekday_arrival_scale': dict(zip(WEEKDAY_NAMES, self.config.weekday_arrival_scale)),
+                'prob_overnight': self.config.prob_overnight,
+            }
 
         config_file = os.path.join(output_dir, f'config_{timestamp}.json')
         with open(config_file, 'w') as f:
@@ -554,6 +2422,21 @@ class MonteCarloSimulation:
 
         return output_dir, timestamp
 
+    def export_profile(self, output_dir, timestamp):
+        """Write the phase profile (and cProfile stats, if any) next to config_TIMESTAMP.json"""
+        self.profiler.print_summary(f"PHASE PROFILE ({self.engine} engine, {self.num_iterations} iterations)")
+
+        profile_file = os.path.join(output_dir, f'profile_{timestamp}.json')
+        self.profiler.save(profile_file, timestamp=timestamp, engine=self.engine,
+                           iterations=self.num_iterations, workers=self.workers)
+        print(f"[OK] Phase profile saved to: {profile_file}")
+
+        if self.profiler.cprofile_stats is not None:
+            pstats_file = os.path.join(output_dir, f'profile_iteration_{self.profile_iteration}_{timestamp}.pstats')
+            self.profiler.save_cprofile(pstats_file)
+            print(f"[OK] cProfile stats for {self.profiler.cprofile_label} saved to: {pstats_file}")
+            pstats.Stats(pstats_file).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+
     def print_summary(self):
         """Print summary of results"""
         stats = self.calculate_statistics()
@@ -563,6 +2446,11 @@ class MonteCarloSimulation:
         print(f"{'='*70}\n")
 
         print(f"Number of Iterations: {stats['iterations']}")
+        if self.tolerance is not None:
+            status = 'converged' if self.converged else 'tolerance not reached'
+            print(f"  Adaptive stop ({status}, maximum {self.max_iterations}):")
+            for metric, (estimate, half_width) in self.confidence_intervals().items():
+                print(f"    {metric}: {estimate:.4f} +/- {half_width:.4f} (95% CI)")
         print(f"Total Capacity: {stats['total_capacity']} (MC:{stats['mc_capacity']}, C:{stats['car_capacity']}, T:{stats['truck_capacity']})")
         print()
 
@@ -595,12 +2483,83 @@ class MonteCarloSimulation:
 
         print(f"PROBABILITY OF FULL CAPACITY (Equation 4):")
         print(f"  P(Full) = {stats['probability_full']:.4f} ({stats['probability_full']*100:.2f}%)")
-        print(f"  Average times full per day: {stats['times_full_mean']:.2f}")
+        print(f"  Average times full per day: {stats['times_full_mean'] / self.config.days:.2f}")
         print()
 
+        if self.config.circling:
+            print(f"CIRCLING (up to {self.config.max_search_attempts} tries, "
+                  f"gives up after {self.config.circling_timeout:g} s without one):")
+            print(f"  Found their type full: {stats['circled_mean']:.2f} per iteration")
+            print(f"  Parked after circling (rejections avoided): {stats['parked_after_circling_mean']:.2f} "
+                  f"({stats['parked_after_circling_percent']:.1f}% of those circling)")
+            if self.statistics.circling_wait.count:
+                print(f"  Wait before parking: mean {stats['circling_wait_mean']:.0f} s, "
+                      f"median {stats['circling_wait_median']:.0f} s, 95th percentile {stats['circling_wait_p95']:.0f} s, "
+                      f"max {stats['circling_wait_max']} s")
+            print()
+
+        if self.variance_reduction is not None:
+            print(f"VARIANCE REDUCTION ({self.variance_reduction}, "
+                  f"{self.statistics.group_metrics['times_full'].count} groups of {self.group_size} iterations):")
+            print(f"  {'Metric':<22} {'Estimate':>10} {'95% CI +/-':>11} {'Effective n':>12} {'Gain':>7}")
+            for metric in VARIANCE_REDUCTION_METRICS:
+                estimate, half_width = self.statistics.confidence_interval(metric)
+                ess = stats[f'{metric}_effective_sample_size']
+                if math.isnan(ess):
+                    # The metric did not vary between groups (e.g. the peak is always the full capacity)
+                    print(f"  {metric:<22} {estimate:>10.4f} {half_width:>11.4f} {'-':>12} {'-':>7}")
+                else:
+                    print(f"  {metric:<22} {estimate:>10.4f} {half_width:>11.4f} {ess:>12.0f} "
+                          f"{ess / self.statistics.iterations:>6.2f}x")
+            print(f"  (Effective n: plain Monte Carlo iterations needed for the same CI width)")
+            print()
+
+        if self.config.days > 1:
+            print(f"DAILY BREAKDOWN ({self.config.days} days; totals above cover the whole run):")
+            print(f"  {'Day':>4} {'':>4} {'Arrivals':>10} {'Parked':>10} {'Rejected':>10} "
+                  f"{'Peak':>8} {'P(Full)':>8} {'Overnight':>10}")
+            for _, row in self.statistics.daily_summary().iterrows():
+                print(f"  {row['day']:>4} {row['weekday']:>4} {row['arrivals_mean']:>10.2f} "
+                      f"{row['parked_mean']:>10.2f} {row['rejected_mean']:>10.2f} "
+                      f"{row['peak_occupancy_mean']:>8.2f} {row['probability_full']:>8.4f} "
+                      f"{row['carried_over_mean']:>10.2f}")
+            print()
+
         print(f"{'='*70}\n")
 
 
+# Worker-process state for parallel runs (one simulation copy per process)
+_worker_simulation = None
+
+
+def checkpoint_path(output_dir, timestamp):
+    return os.path.join(output_dir, f'checkpoint_{timestamp}.pkl')
+
+
+def load_checkpoint(output_dir, path=None):
+    """Read a checkpoint: the given file, else the newest one in output_dir"""
+    if path is None:
+        checkpoints = glob.glob(os.path.join(output_dir, 'checkpoint_*.pkl'))
+        if not checkpoints:
+            raise FileNotFoundError(f"No checkpoint found in {output_dir}/")
+        path = max(checkpoints, key=os.path.getmtime)
+    with open(path, 'rb') as f:
+        checkpoint = pickle.load(f)
+    return path, checkpoint
+
+
+def _init_worker(simulation):
+    global _worker_simulation
+    _worker_simulation = simulation
+
+
+def _run_worker_block(block_index):
+    results, statistics = _worker_simulation.run_and_summarize_block(block_index)
+    # Phase times measured in this worker for this block (None unless profiling)
+    profiler = _worker_simulation.profiler
+    return results, statistics, (profiler.take() if profiler is not None else None)
+
+
 def main():
     parser = argparse.ArgumentParser(description='Monte Carlo Parking Simulation')
     parser.add_argument('--iterations', type=int, default=1000,
@@ -609,11 +2568,86 @@ def main():
                        help='Random seed for reproducibility (default: None)')
     parser.add_argument('--output-dir', type=str, default='monte_carlo_results',
                        help='Output directory for results (default: monte_carlo_results)')
+    parser.add_argument('--engine', type=str, default='loop', choices=ENGINES,
+                       help='Simulation engine: loop (reference) or vectorized (whole batches as NumPy arrays) (default: loop)')
+    parser.add_argument('--backend', type=str, default='python', choices=BACKENDS,
+                       help='Vectorized engine time-step loop: python (NumPy) or numba (compiled, same results; '
+                            'falls back to python if Numba is not installed) (default: python)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes to spread iteration blocks across (default: 1)')
+    parser.add_argument('--format', type=str, default='csv', choices=OUTPUT_FORMATS,
+                       help='Format for iteration and time series tables; parquet streams row groups during the run (default: csv)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Constant-memory mode: keep only running statistics, skip the iteration and time series CSVs')
+    parser.add_argument('--tolerance', type=float, default=None,
+                       help='Adaptive mode: stop once the 95%% CI half-width of each adaptive metric is below '
+                            'this fraction of its estimate, e.g. 0.01; --iterations becomes the maximum (default: off)')
+    parser.add_argument('--adaptive-metrics', type=str, nargs='+', default=list(ADAPTIVE_METRICS),
+                       help=f"Metrics checked in adaptive mode (default: {' '.join(ADAPTIVE_METRICS)})")
+    parser.add_argument('--profile', action='store_true',
+                       help='Time each simulation phase and save profile_TIMESTAMP.json next to the config file')
+    parser.add_argument('--profile-iteration', type=int, default=None,
+                       help='Also save cProfile stats for this iteration number (implies --profile)')
+    parser.add_argument('--days', type=int, default=SIMULATION_DAYS,
+                       help='Consecutive days per iteration; vehicles parked overnight carry over to the next day '
+                            f'(default: {SIMULATION_DAYS})')
+    parser.add_argument('--circling', action='store_true',
+                       help='Vehicles that find their type full circle and try again (as in the pygame model) '
+                            'instead of being rejected at once')
+    parser.add_argument('--first-weekday', type=str, default=WEEKDAY_NAMES[FIRST_WEEKDAY], choices=WEEKDAY_NAMES,
+                       help=f'Weekday of day 1, which picks its arrival scale (default: {WEEKDAY_NAMES[FIRST_WEEKDAY]})')
+    parser.add_argument('--variance-reduction', type=str, default=None, choices=VARIANCE_REDUCTION_MODES,
+                       help='Vectorized engine sampling: antithetic iteration pairs, stratified daily arrival '
+                            'totals or a Latin hypercube over hourly totals; reports effective sample sizes '
+                            '(default: plain Monte Carlo)')
+    parser.add_argument('--checkpoint', action='store_true',
+                       help='Save finished iterations to OUTPUT_DIR/checkpoint_TIMESTAMP.pkl periodically, '
+                            'so an interrupted run can be resumed')
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL,
+                       help=f'Seconds between checkpoints (default: {CHECKPOINT_INTERVAL})')
+    parser.add_argument('--resume', nargs='?', const='', default=None, metavar='CHECKPOINT',
+                       help='Continue an interrupted run from its checkpoint (default: the newest in --output-dir); '
+                            'use the same options as the original run')
 
     args = parser.parse_args()
 
+    # A resumed run keeps the original timestamp (file names) and seed
+    checkpoint = None
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    seed = args.seed
+    if args.resume is not None:
+        checkpoint_file, checkpoint = load_checkpoint(args.output_dir, args.resume or None)
+        timestamp = checkpoint['timestamp']
+        if seed is None:
+            seed = checkpoint['settings']['seed_entropy']
+    elif args.checkpoint:
+        checkpoint_file = checkpoint_path(args.output_dir, timestamp)
+    else:
+        checkpoint_file = None
+
+    result_writer = None
+    if args.format == 'parquet':
+        result_writer = ParquetResultWriter(args.output_dir, timestamp, parts=checkpoint_file is not None,
+                                            circling=args.circling)
+
+    if args.days < 1:
+        parser.error('--days must be at least 1')
+    config = SimulationConfig(days=args.days, first_weekday=WEEKDAY_NAMES.index(args.first_weekday),
+                              circling=args.circling)
+
     # Create and run simulation
-    sim = MonteCarloSimulation(num_iterations=args.iterations, random_seed=args.seed)
+    sim = MonteCarloSimulation(num_iterations=args.iterations, random_seed=seed, config=config,
+                               engine=args.engine, workers=args.workers, keep_results=not args.stream,
+                               result_writer=result_writer, tolerance=args.tolerance,
+                               adaptive_metrics=args.adaptive_metrics, profile=args.profile,
+                               profile_iteration=args.profile_iteration, backend=args.backend,
+                               checkpoint_file=checkpoint_file, checkpoint_interval=args.checkpoint_interval,
+                               variance_reduction=args.variance_reduction)
+    if checkpoint_file is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+        sim.timestamp = timestamp
+    if checkpoint is not None:
+        sim.resume_from(checkpoint)
     sim.run()
 
     # Print summary
@@ -621,6 +2655,9 @@ def main():
 
     # Export results
     output_dir, timestamp = sim.export_results(args.output_dir)
+    if sim.profiler is not None:
+        sim.export_profile(output_dir, timestamp)
+    sim.remove_checkpoint()
 
     print(f"\n[SUCCESS] Monte Carlo simulation completed successfully!")
     print(f"Results saved to: {output_dir}/")
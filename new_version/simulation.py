@@ -10,14 +10,25 @@ CNSC CUSTOM MAP PARKING SIMULATION - CLEAN VERSION
 import pygame
 import random
 import math
+import heapq
+import itertools
+from collections import OrderedDict
 import tkinter as tk
+import argparse
+import os
+import sys
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import NamedTuple, Tuple
 from enum import Enum
 
 # Import layout from generated file
 from generated_parking_zones import PARKING_ZONES, BUILDINGS, ROADS, ENTRY_GATE, EXIT_GATE
 
+# The phase profiler is shared with the main simulation in the parent directory
+# (appended, so this directory's layout file still comes first)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from phase_profiler import PhaseProfiler
+
 # Window settings
 WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
@@ -67,6 +78,27 @@ BATCH_SIZE_MIN = 2
 BATCH_SIZE_MAX = 6
 MAX_SEARCH_ATTEMPTS = 4
 
+# Moving vehicles closer than this (pixels) block each other; also the cell
+# size of the collision spatial hash, so only neighbouring cells are checked
+COLLISION_DISTANCE = 12
+
+# RoadNetwork route cache: at most ROUTE_CACHE_SIZE routes (LRU); route
+# starts closer than ROUTE_CACHE_GRID pixels on a road share a cached route
+ROUTE_CACHE_SIZE = 4096
+ROUTE_CACHE_GRID = 20
+
+# Cell size (pixels) of the SpatialGrid used for road lookups
+SPATIAL_GRID_CELL_SIZE = 120
+
+# Phases timed by --profile: phase -> Simulation methods
+PROFILE_PHASES = {
+    'update': ['update'],
+    'draw': ['draw'],
+    'spawning': ['spawn_vehicle'],
+    'parking': ['assign_parking'],
+    'collision': ['check_collision', 'rebuild_collision_grid'],
+}
+
 
 class VehicleState(Enum):
     ENTERING = 1
@@ -76,13 +108,17 @@ class VehicleState(Enum):
     CIRCLING = 5
 
 
-@dataclass
-class Waypoint:
+# dataclass(slots=True) needs Python 3.10+; older versions keep a per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+class Waypoint(NamedTuple):
+    """Immutable path point; routes are tuples of these shared between vehicles"""
     x: float
     y: float
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class Vehicle:
     id: int
     type: str
@@ -94,7 +130,7 @@ class Vehicle:
     y: float = 0
     color: Tuple[int, int, int] = None
     rejected: bool = False
-    path: List[Waypoint] = None
+    path: Tuple[Waypoint, ...] = ()
     current_waypoint: int = 0
     base_speed: float = 2.5  # Base movement speed
     parking_slot: Tuple[int, int] = None
@@ -109,8 +145,6 @@ class Vehicle:
                 self.color = TRUCK_COLOR
             else:
                 self.color = MOTORCYCLE_COLOR
-        if self.path is None:
-            self.path = []
 
 
 class ParkingZone:
@@ -123,7 +157,7 @@ class ParkingZone:
         self.capacity = int(capacity)
         self.type = zone_type
         self.occupied = 0
-        self.parked_vehicles = []
+        self.parked_vehicles = {}  # vehicle.id -> Vehicle
 
         self.padding = 2
         self.gap = 1
@@ -161,19 +195,29 @@ class ParkingZone:
         self._init_slots()
 
     def _init_slots(self):
+        self.slot_positions = []  # slot index -> (row, col)
         row = col = 0
         for i in range(self.capacity):
             self.slots[(row, col)] = None
+            self.slot_positions.append((row, col))
             col += 1
             if col >= self.slots_per_row:
                 col = 0
                 row += 1
+        self.slot_index = {pos: i for i, pos in enumerate(self.slot_positions)}
+
+        # Min-heap of free slot indices: lowest index first, the same slot
+        # the old front-to-back scan picked (a sorted list is already a heap)
+        self.free_slots = list(range(self.capacity))
+
+    def clear(self):
+        """Empty every slot"""
+        self.occupied = 0
+        self.parked_vehicles = {}
+        self._init_slots()
 
     def find_empty_slot(self):
-        for pos, vehicle in self.slots.items():
-            if vehicle is None:
-                return pos
-        return None
+        return self.slot_positions[self.free_slots[0]] if self.free_slots else None
 
     def get_slot_position(self, slot):
         row, col = slot
@@ -185,34 +229,110 @@ class ParkingZone:
         return self.type == vehicle_type and self.occupied < self.capacity
 
     def park_vehicle(self, vehicle):
-        if self.can_park(vehicle.type):
-            slot = self.find_empty_slot()
-            if slot:
-                self.slots[slot] = vehicle
-                vehicle.parking_slot = slot
-                self.occupied += 1
-                self.parked_vehicles.append(vehicle)
-                return True
+        if self.can_park(vehicle.type) and self.free_slots:
+            slot = self.slot_positions[heapq.heappop(self.free_slots)]
+            self.slots[slot] = vehicle
+            vehicle.parking_slot = slot
+            self.occupied += 1
+            self.parked_vehicles[vehicle.id] = vehicle
+            return True
         return False
 
     def remove_vehicle(self, vehicle):
-        if vehicle in self.parked_vehicles:
+        if self.parked_vehicles.pop(vehicle.id, None) is not None:
             if vehicle.parking_slot:
                 self.slots[vehicle.parking_slot] = None
-            self.parked_vehicles.remove(vehicle)
+                heapq.heappush(self.free_slots, self.slot_index[vehicle.parking_slot])
             self.occupied -= 1
 
     def get_utilization(self):
         return (self.occupied / self.capacity * 100) if self.capacity > 0 else 0
 
 
+class SpatialGrid:
+    """
+    Uniform-grid index of axis-aligned rectangles (x, y, width, height).
+    Each cell lists the rectangles that overlap it, so point and nearest
+    queries only look at nearby rectangles instead of all of them.
+    """
+    def __init__(self, rects, cell_size=SPATIAL_GRID_CELL_SIZE):
+        self.rects = list(rects)
+        self.cell_size = cell_size
+        self.cells = {}  # (col, row) -> rect indices, ascending
+        for index, (x, y, w, h) in enumerate(self.rects):
+            for col in range(int(x // cell_size), int((x + w) // cell_size) + 1):
+                for row in range(int(y // cell_size), int((y + h) // cell_size) + 1):
+                    self.cells.setdefault((col, row), []).append(index)
+
+        if self.cells:
+            self.min_col = min(col for col, _ in self.cells)
+            self.max_col = max(col for col, _ in self.cells)
+            self.min_row = min(row for _, row in self.cells)
+            self.max_row = max(row for _, row in self.cells)
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def find(self, x, y):
+        """Index of the first rectangle containing the point (same edges as pygame.Rect), or None"""
+        for index in self.cells.get(self._cell(x, y), ()):
+            rx, ry, rw, rh = self.rects[index]
+            if rx <= x < rx + rw and ry <= y < ry + rh:
+                return index
+        return None
+
+    def nearest(self, x, y):
+        """
+        (index, nearest point) of the rectangle closest to the point, first
+        one on ties, or (None, None) if there are no rectangles.
+        Searches rings of cells outwards until no closer rectangle can exist.
+        """
+        if not self.cells:
+            return None, None
+        col, row = self._cell(x, y)
+        max_ring = max(abs(col - self.min_col), abs(col - self.max_col),
+                       abs(row - self.min_row), abs(row - self.max_row))
+
+        best_index, best_point, best_dist_sq = None, None, float('inf')
+        seen = set()
+        for ring in range(max_ring + 1):
+            for cell in self._ring(col, row, ring):
+                for index in self.cells.get(cell, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    rx, ry, rw, rh = self.rects[index]
+                    cx = max(rx, min(x, rx + rw))
+                    cy = max(ry, min(y, ry + rh))
+                    dist_sq = (x - cx) ** 2 + (y - cy) ** 2
+                    if dist_sq < best_dist_sq or (dist_sq == best_dist_sq and index < best_index):
+                        best_index, best_point, best_dist_sq = index, (cx, cy), dist_sq
+            # Everything outside the searched rings is at least ring * cell_size away
+            if best_dist_sq <= (ring * self.cell_size) ** 2:
+                break
+        return best_index, best_point
+
+    @staticmethod
+    def _ring(col, row, ring):
+        """Cells at Chebyshev distance `ring` from (col, row)"""
+        if ring == 0:
+            yield col, row
+            return
+        for c in range(col - ring, col + ring + 1):
+            yield c, row - ring
+            yield c, row + ring
+        for r in range(row - ring + 1, row + ring):
+            yield col - ring, r
+            yield col + ring, r
+
+
 class RoadNetwork:
     def __init__(self, roads):
         self.roads = roads
         self.road_rects = []
         self.road_centers = []
 
-        for road in roads:
+        for index, road in enumerate(roads):
             rect = pygame.Rect(road["x"], road["y"], road["width"], road["height"])
             self.road_rects.append(rect)
             cx = road["x"] + road["width"] // 2
@@ -223,26 +343,25 @@ class RoadNetwork:
                 'cx': cx, 'cy': cy,
                 'x': road["x"], 'y': road["y"],
                 'w': road["width"], 'h': road["height"],
-                'horizontal': is_horizontal
+                'horizontal': is_horizontal,
+                'index': index
             })
 
+        # Spatial index for the point and nearest-road queries
+        self.grid = SpatialGrid((r['x'], r['y'], r['w'], r['h']) for r in self.road_centers)
+
+        # Intersection graph and LRU route cache, built once
+        self._build_graph()
+        self.route_cache = OrderedDict()  # (road, snapped road point, end) -> waypoints
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     def get_nearest_road_point(self, x, y):
-        min_dist = float('inf')
-        nearest = (x, y)
-        nearest_road = None
-
-        for road in self.road_centers:
-            rx, ry = road['x'], road['y']
-            rw, rh = road['w'], road['h']
-            cx = max(rx, min(x, rx + rw))
-            cy = max(ry, min(y, ry + rh))
-            dist = math.sqrt((x - cx)**2 + (y - cy)**2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = (cx, cy)
-                nearest_road = road
-
-        return nearest, nearest_road
+        """Find nearest point on any road - returns (point, road_info)"""
+        index, nearest = self.grid.nearest(x, y)
+        if index is None:
+            return (x, y), None
+        return nearest, self.road_centers[index]
 
     def find_intersections(self, road1, road2):
         r1 = road1['rect']
@@ -253,43 +372,110 @@ class RoadNetwork:
             return (ix, iy)
         return None
 
+    def _build_graph(self):
+        """
+        Road graph: nodes are road crossings (centre of the overlap, as in
+        find_intersections), edges join crossings on the same road.
+        """
+        self.nodes = []  # node index -> (x, y)
+        self.road_nodes = [[] for _ in self.road_centers]  # road index -> node indices on that road
+        for i, j in itertools.combinations(range(len(self.road_centers)), 2):
+            point = self.find_intersections(self.road_centers[i], self.road_centers[j])
+            if point:
+                self.road_nodes[i].append(len(self.nodes))
+                self.road_nodes[j].append(len(self.nodes))
+                self.nodes.append(point)
+
+        self.edges = [[] for _ in self.nodes]  # node index -> [(neighbour, distance)]
+        for nodes_on_road in self.road_nodes:
+            for a, b in itertools.combinations(nodes_on_road, 2):
+                distance = math.dist(self.nodes[a], self.nodes[b])
+                self.edges[a].append((b, distance))
+                self.edges[b].append((a, distance))
+
+    def shortest_route(self, start_pt, road_start, end_pt, road_end):
+        """
+        Dijkstra from a point on road_start to a point on road_end.
+        Returns the crossings to drive through, or None if the roads are not connected.
+        """
+        goal_nodes = {n: math.dist(self.nodes[n], end_pt) for n in self.road_nodes[road_end['index']]}
+        heap = [(math.dist(start_pt, self.nodes[n]), n, -1) for n in self.road_nodes[road_start['index']]]
+        heapq.heapify(heap)
+        previous = {}
+        best_length, best_node = float('inf'), None
+
+        while heap:
+            distance, node, parent = heapq.heappop(heap)
+            if node in previous:
+                continue
+            if distance >= best_length:
+                break
+            previous[node] = parent
+            if node in goal_nodes and distance + goal_nodes[node] < best_length:
+                best_length, best_node = distance + goal_nodes[node], node
+            for neighbour, length in self.edges[node]:
+                if neighbour not in previous:
+                    heapq.heappush(heap, (distance + length, neighbour, node))
+
+        if best_node is None:
+            return None
+        route = []
+        node = best_node
+        while node != -1:
+            route.append(self.nodes[node])
+            node = previous[node]
+        return route[::-1]
+
     def create_road_path(self, start, end):
-        path = [Waypoint(start[0], start[1])]
+        """
+        Path that follows the roads. The part from the nearest road point
+        onwards is cached by (road point snapped to ROUTE_CACHE_GRID, end),
+        so vehicles leaving from the same gate, slot or road spot share it.
+        """
         road_start_pt, road_start = self.get_nearest_road_point(start[0], start[1])
+        if road_start is None:
+            # No roads found, direct path
+            return (Waypoint(start[0], start[1]), Waypoint(end[0], end[1]))
+
+        key = (road_start['index'], round(road_start_pt[0] / ROUTE_CACHE_GRID),
+               round(road_start_pt[1] / ROUTE_CACHE_GRID), round(end[0]), round(end[1]))
+        route = self.route_cache.get(key)
+        if route is not None:
+            self.route_cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            route = tuple(self._route_from_road(road_start_pt, road_start, end))
+            self.route_cache[key] = route
+            if len(self.route_cache) > ROUTE_CACHE_SIZE:
+                self.route_cache.popitem(last=False)
+
+        return (Waypoint(start[0], start[1]),) + route
+
+    def _route_from_road(self, road_start_pt, road_start, end):
+        """Waypoints from a point on road_start to end, following actual road segments"""
+        # Move to nearest road
+        path = [Waypoint(road_start_pt[0], road_start_pt[1])]
         road_end_pt, road_end = self.get_nearest_road_point(end[0], end[1])
 
-        if road_start is None or road_end is None:
-            path.append(Waypoint(end[0], end[1]))
-            return path
-
-        path.append(Waypoint(road_start_pt[0], road_start_pt[1]))
-
-        if road_start == road_end:
+        # If start and end are on the same road, go directly
+        if road_start is road_end:
             path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
         else:
-            intersection = self.find_intersections(road_start, road_end)
-            if intersection:
-                path.append(Waypoint(intersection[0], intersection[1]))
-                path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
+            route = self.shortest_route(road_start_pt, road_start, road_end_pt, road_end)
+            if route is not None:
+                path.extend(Waypoint(x, y) for x, y in route)
+            elif road_start['horizontal']:
+                # Roads not connected: go horizontally first to align X
+                path.append(Waypoint(road_end_pt[0], road_start_pt[1]))
             else:
-                for mid_road in self.road_centers:
-                    if mid_road == road_start or mid_road == road_end:
-                        continue
-                    int1 = self.find_intersections(road_start, mid_road)
-                    int2 = self.find_intersections(mid_road, road_end)
-                    if int1 and int2:
-                        path.append(Waypoint(int1[0], int1[1]))
-                        path.append(Waypoint(int2[0], int2[1]))
-                        path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
-                        break
-                else:
-                    if road_start['horizontal']:
-                        path.append(Waypoint(road_end_pt[0], road_start_pt[1]))
-                    else:
-                        path.append(Waypoint(road_start_pt[0], road_end_pt[1]))
-                    path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
+                # Roads not connected: go vertically first to align Y
+                path.append(Waypoint(road_start_pt[0], road_end_pt[1]))
+            path.append(Waypoint(road_end_pt[0], road_end_pt[1]))
 
+        # Move to final destination
         path.append(Waypoint(end[0], end[1]))
+
         return path
 
 
@@ -431,7 +617,7 @@ class StatsWindow:
 
 
 class Simulation:
-    def __init__(self):
+    def __init__(self, profile=False):
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("CNSC Parking Simulation")
@@ -456,6 +642,10 @@ class Simulation:
         self.total_departed = 0
         self.paused = False
 
+        # Spatial hash of non-parked vehicles for check_collision
+        self.collision_grid = {}  # (col, row) -> {vehicle.id: Vehicle}
+        self.collision_cells = {}  # vehicle.id -> (col, row)
+
         # Auto-calculate zoom
         max_x = max(
             max((z["x"] + z["width"]) for z in PARKING_ZONES),
@@ -473,6 +663,13 @@ class Simulation:
         self.view_offset_x = 15
         self.view_offset_y = 15
 
+        # Opt-in phase timing (wraps this instance's methods; nothing is timed otherwise)
+        self.profiler = None
+        if profile:
+            self.profiler = PhaseProfiler()
+            self.profiler.attach(self, PROFILE_PHASES)
+            self.profiler.attach(self.road_network, {'routing': ['create_road_path']})
+
     def get_current_hour(self):
         return int(self.sim_time // 3600) % 24
 
@@ -559,15 +756,50 @@ class Simulation:
             if not was_circling:
                 self.total_parked += 1
 
+    def grid_cell(self, x, y):
+        return int(x // COLLISION_DISTANCE), int(y // COLLISION_DISTANCE)
+
+    def rebuild_collision_grid(self):
+        """Put every non-parked vehicle into the collision spatial hash"""
+        self.collision_grid = {}
+        self.collision_cells = {}
+        for vehicle in self.vehicles:
+            if vehicle.state != VehicleState.PARKED:
+                self.grid_insert(vehicle)
+
+    def grid_insert(self, vehicle):
+        cell = self.grid_cell(vehicle.x, vehicle.y)
+        self.collision_grid.setdefault(cell, {})[vehicle.id] = vehicle
+        self.collision_cells[vehicle.id] = cell
+
+    def grid_remove(self, vehicle):
+        cell = self.collision_cells.pop(vehicle.id, None)
+        if cell is not None:
+            bucket = self.collision_grid[cell]
+            del bucket[vehicle.id]
+            if not bucket:
+                del self.collision_grid[cell]
+
+    def grid_move(self, vehicle):
+        """Update the spatial hash after a non-parked vehicle moved"""
+        if self.collision_cells.get(vehicle.id) != self.grid_cell(vehicle.x, vehicle.y):
+            self.grid_remove(vehicle)
+            self.grid_insert(vehicle)
+
     def check_collision(self, vehicle, new_x, new_y):
-        """Check collision with other moving vehicles only"""
-        min_distance = 12
-        for other in self.vehicles:
-            if other.id == vehicle.id or other.state == VehicleState.PARKED:
-                continue
-            dist = math.sqrt((new_x - other.x)**2 + (new_y - other.y)**2)
-            if dist < min_distance:
-                return True
+        """Check collision with other moving vehicles only (neighbouring grid cells)"""
+        col, row = self.grid_cell(new_x, new_y)
+        for cell_col in (col - 1, col, col + 1):
+            for cell_row in (row - 1, row, row + 1):
+                bucket = self.collision_grid.get((cell_col, cell_row))
+                if not bucket:
+                    continue
+                for other in bucket.values():
+                    if other.id == vehicle.id:
+                        continue
+                    dist = math.sqrt((new_x - other.x)**2 + (new_y - other.y)**2)
+                    if dist < COLLISION_DISTANCE:
+                        return True
         return False
 
     def update(self, dt):
@@ -602,6 +834,10 @@ class Simulation:
 
         vehicles_to_remove = []
 
+        # Rebuilt once per frame, then kept up to date as vehicles move,
+        # park or leave their slot
+        self.rebuild_collision_grid()
+
         for vehicle in self.vehicles:
             # Departure check
             if vehicle.state == VehicleState.PARKED and self.sim_time >= vehicle.departure_time:
@@ -612,6 +848,7 @@ class Simulation:
                     (vehicle.x, vehicle.y), EXIT_GATE)
                 vehicle.current_waypoint = 0
                 self.total_departed += 1
+                self.grid_insert(vehicle)
 
             # Circling timeout
             if vehicle.state == VehicleState.CIRCLING:
@@ -649,6 +886,7 @@ class Simulation:
                         if not self.check_collision(vehicle, new_x, new_y):
                             vehicle.x = new_x
                             vehicle.y = new_y
+                            self.grid_move(vehicle)
                             movement_budget -= step
                         else:
                             # Blocked, stop moving
@@ -661,12 +899,14 @@ class Simulation:
                 if vehicle.current_waypoint >= len(vehicle.path):
                     if vehicle.state in [VehicleState.ENTERING, VehicleState.ON_ROAD]:
                         vehicle.state = VehicleState.PARKED
+                        self.grid_remove(vehicle)
                     elif vehicle.state == VehicleState.EXITING:
                         vehicles_to_remove.append(vehicle)
 
             elif vehicle.state == VehicleState.CIRCLING:
                 vehicle.x += random.uniform(-2, 2)
                 vehicle.y += random.uniform(-2, 2)
+                self.grid_move(vehicle)
 
         for v in vehicles_to_remove:
             self.vehicles.remove(v)
@@ -791,9 +1031,7 @@ class Simulation:
         self.total_rejected = 0
         self.total_departed = 0
         for zone in self.zones:
-            zone.occupied = 0
-            zone.parked_vehicles = []
-            zone._init_slots()
+            zone.clear()
 
     def run(self, stats_window):
         running = True
@@ -813,6 +1051,11 @@ class Simulation:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='CNSC Parking Simulation - Clean Version')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time update(), draw() and their phases; the summary is printed at the end')
+    args = parser.parse_args()
+
     print("=" * 70)
     print("CNSC PARKING SIMULATION - CLEAN VERSION")
     print("=" * 70)
@@ -824,7 +1067,9 @@ if __name__ == "__main__":
     print(f"Collision avoidance: Enabled")
     print("=" * 70)
 
-    sim = Simulation()
+    sim = Simulation(profile=args.profile)
     stats_win = StatsWindow(sim)
     stats_win.update()
     sim.run(stats_win)
+    if sim.profiler is not None:
+        sim.profiler.print_summary()
@@ -0,0 +1,413 @@
+"""
+PARAMETER SWEEP RUNNER
+======================
+Runs many parking scenarios (capacities, arrival rates, vehicle mix, ...)
+in one process and writes one results table keyed by scenario.
+
+All scenarios share one worker pool and the same random streams (common
+random numbers): block k of every scenario draws from the same seeded
+stream, so differences between scenarios come from the parameters rather
+than from sampling noise. With a baseline scenario ("baseline" in the
+sweep file or --baseline NAME) the results table also gives every
+scenario's difference from the baseline, with a paired 95% CI and the
+factor by which the shared streams shrank its variance compared with
+independent runs.
+
+Sweep file (JSON, or YAML if PyYAML is installed):
+    {
+        "iterations": 1000,
+        "seed": 42,
+        "engine": "vectorized",
+        "base": {"truck_capacity": 12},
+        "scenarios": [
+            {"name": "current"},
+            {"name": "new_mc_lot", "mc_capacity": 200}
+        ],
+        "grid": {"arrival_rate_scale": [1.0, 1.2, 1.5]}
+    }
+
+Any SimulationConfig field can be set in "base", a scenario or the grid.
+"arrival_rate_scale" multiplies every hourly arrival rate. The grid is
+crossed with every scenario (or with "base" alone if there are none).
+
+Every scenario is first scored with the fast analytical estimator
+(fast_estimator.py, milliseconds per scenario). With "prune": [low, high]
+in the sweep file or --prune LOW HIGH, only scenarios whose estimated
+P(Full) lies in that range are simulated; the others keep their estimates
+in the results table with empty simulation columns.
+
+Usage:
+    python parameter_sweep.py sweep.json
+    python parameter_sweep.py sweep.yaml --workers 8 --output-dir sweep_results
+    python parameter_sweep.py sweep.json --prune 0.05 0.95
+    python parameter_sweep.py sweep.json --baseline current --variance-reduction lhs
+"""
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import argparse
+import itertools
+import json
+import os
+
+from monte_carlo_engine import (MonteCarloSimulation, SimulationConfig, StreamingStatistics, ENGINES,
+                                VARIANCE_REDUCTION_MODES, VARIANCE_REDUCTION_METRICS, CONFIDENCE_Z)
+import fast_estimator
+
+# Optional: YAML sweep files
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+# Scenario keys that are not SimulationConfig fields
+SWEEP_ONLY_KEYS = ('name', 'arrival_rate_scale')
+
+# Columns of the results table, after the scenario name and parameters
+RESULT_METRICS = [
+    'probability_full', 'times_full_mean',
+    'arrivals_mean', 'arrivals_std', 'arrivals_ci_95',
+    'parked_mean', 'parked_std', 'parked_ci_95',
+    'rejected_mean', 'rejected_std', 'rejected_ci_95',
+    'peak_occupancy_mean', 'peak_occupancy_std', 'peak_occupancy_max',
+    'peak_utilization_mean', 'peak_utilization_std',
+]
+
+# Fast estimator columns, added to every row (simulated or pruned)
+ESTIMATE_METRICS = ['probability_full', 'rejected_mean']
+
+# Differences from the baseline scenario: summary metric -> per-iteration value it averages
+PAIRED_METRICS = {'probability_full': 'times_full', 'rejected_mean': 'rejected',
+                  'peak_utilization_mean': 'peak_utilization'}
+
+
+def load_sweep_file(path):
+    """Read a sweep definition from JSON or YAML"""
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ImportError("YAML sweep files need PyYAML (pip install pyyaml), or use JSON")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def build_config(base: SimulationConfig, overrides):
+    """SimulationConfig for one scenario: base config plus overrides"""
+    overrides = dict(overrides)
+    name = overrides.pop('name', None)
+    scale = overrides.pop('arrival_rate_scale', None)
+    config = base.replace(**overrides)
+    if scale is not None:
+        config = config.replace(hourly_arrival_rates={h: r * scale for h, r in config.hourly_arrival_rates.items()})
+    if name is not None:
+        config = config.replace(name=str(name))
+    return config
+
+
+def build_scenarios(sweep):
+    """
+    Expand a sweep definition into a list of (parameters, SimulationConfig).
+    parameters holds only the values set by the scenario/grid, for the results table.
+    """
+    base = build_config(SimulationConfig(), sweep.get('base', {}))
+    scenarios = sweep.get('scenarios') or [{'name': base.name}]
+
+    grid = sweep.get('grid', {})
+    grid_keys = list(grid)
+    grid_points = [dict(zip(grid_keys, values)) for values in itertools.product(*grid.values())]
+
+    expanded = []
+    for scenario in scenarios:
+        for point in grid_points:
+            parameters = {**scenario, **point}
+            if point:
+                label = ','.join(f'{k}={v}' for k, v in point.items())
+                parameters['name'] = f"{scenario.get('name', base.name)}[{label}]"
+            config = build_config(base, parameters)
+            parameters.pop('name', None)
+            expanded.append((parameters, config))
+
+    names = [config.name for _, config in expanded]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate scenario name(s): {', '.join(duplicates)}")
+    return expanded
+
+
+# Worker-process state for sweeps: every scenario's simulation, sent once per worker
+_worker_simulations = None
+
+
+def _init_worker(simulations):
+    global _worker_simulations
+    _worker_simulations = simulations
+
+
+def _run_worker_task(task):
+    scenario_index, block_index, paired = task
+    return scenario_index, block_index, run_sweep_block(_worker_simulations[scenario_index], block_index, paired)
+
+
+def run_sweep_block(sim, block_index, paired):
+    """
+    Run one block of a scenario: its statistics, plus (if paired) the
+    per-iteration values behind PAIRED_METRICS for baseline differences
+    """
+    results = sim.run_block(block_index)
+    statistics = StreamingStatistics(sim.config, sim.group_size)
+    statistics.add_many(results)
+    values = None
+    if paired:
+        values = {name: np.array([getattr(r, name) for r in results], dtype=float)
+                  for name in PAIRED_METRICS.values()}
+    return statistics, values
+
+
+class ParameterSweep:
+    """
+    Runs a list of scenarios on one shared pool with common random numbers.
+    prune=(low, high) skips scenarios whose estimated P(Full) is outside
+    that range. baseline names the scenario others are compared with
+    (always simulated); variance_reduction is passed to every simulation.
+    """
+
+    def __init__(self, scenarios, num_iterations=1000, random_seed=None, engine='vectorized', workers=1,
+                 prune=None, baseline=None, variance_reduction=None):
+        self.scenarios = scenarios
+        self.num_iterations = num_iterations
+        self.engine = engine
+        self.workers = workers
+        self.prune = tuple(prune) if prune else None
+        self.variance_reduction = variance_reduction
+
+        names = [config.name for _, config in scenarios]
+        if baseline is not None and baseline not in names:
+            raise ValueError(f"Unknown baseline scenario '{baseline}' (choose from {', '.join(names)})")
+        self.baseline = baseline
+        self.baseline_index = names.index(baseline) if baseline is not None else None
+        # scenario index -> block index -> per-iteration values (with a baseline only)
+        self.paired_values = {}
+
+        self.estimates = [fast_estimator.estimate(config) for _, config in scenarios]
+        self.active = [
+            i for i, estimate in enumerate(self.estimates)
+            if self.prune is None or self.prune[0] <= estimate['probability_full'] <= self.prune[1]
+            or i == self.baseline_index
+        ]
+
+        # Resolve the seed once so that every scenario uses the same block streams
+        self.seed_entropy = np.random.SeedSequence(random_seed).entropy
+        self.simulations = [
+            MonteCarloSimulation(num_iterations=num_iterations, random_seed=self.seed_entropy,
+                                 engine=engine, keep_results=False, config=config, verbose=False,
+                                 variance_reduction=variance_reduction)
+            for _, config in scenarios
+        ]
+
+        print(f"\n{'='*70}")
+        print(f"PARAMETER SWEEP")
+        print(f"{'='*70}")
+        print(f"Scenarios: {len(scenarios)}")
+        if self.prune:
+            print(f"Pruning: estimated P(Full) outside [{self.prune[0]}, {self.prune[1]}] "
+                  f"({len(scenarios) - len(self.active)} of {len(scenarios)} scenarios skipped)")
+        print(f"Estimates: {sum(e['elapsed_ms'] for e in self.estimates):.0f} ms for all scenarios")
+        print(f"Iterations per scenario: {num_iterations}")
+        print(f"Engine: {engine}")
+        print(f"Workers: {workers}")
+        if baseline is not None:
+            print(f"Baseline: {baseline} (paired differences)")
+        if variance_reduction is not None:
+            print(f"Variance reduction: {variance_reduction}")
+        print(f"{'='*70}\n")
+
+    def run(self):
+        """Run every block of every scenario"""
+        paired = self.baseline is not None
+        tasks = [(s, b, paired) for b in range(self.simulations[0].num_blocks()) for s in self.active]
+        print(f"Running {len(tasks)} blocks...")
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     initializer=_init_worker, initargs=(self.simulations,)) as pool:
+                self._collect(pool.map(_run_worker_task, tasks), len(tasks))
+        else:
+            self._collect(((s, b, run_sweep_block(self.simulations[s], b, paired)) for s, b, paired in tasks),
+                          len(tasks))
+
+        print(f"\nAll {len(self.active)} simulated scenarios completed!\n")
+
+    def _collect(self, task_results, num_tasks):
+        for done, (scenario_index, block_index, (statistics, values)) in enumerate(task_results, 1):
+            self.simulations[scenario_index].add_block_result([], statistics)
+            if values is not None:
+                self.paired_values.setdefault(scenario_index, {})[block_index] = values
+            if done % len(self.active) == 0 or done == num_tasks:
+                print(f"  Completed {done}/{num_tasks} blocks...")
+
+    def iteration_values(self, index, metric):
+        """Per-iteration values of one PAIRED_METRICS metric for a scenario, in iteration order"""
+        blocks = self.paired_values[index]
+        values = np.concatenate([blocks[b][PAIRED_METRICS[metric]] for b in sorted(blocks)])
+        if metric == 'probability_full':
+            statistics = self.simulations[index].statistics
+            values = values / (statistics.total_observations / statistics.iterations)
+        return values
+
+    def paired_difference(self, index, metric):
+        """
+        (difference from the baseline, 95% CI half-width, CRN gain). Both
+        scenarios drew from the same streams, so the CI comes from the
+        per-iteration differences (per-group with variance reduction); the
+        gain is the variance of the difference for independent runs divided
+        by the paired variance.
+        """
+        x = self.iteration_values(index, metric)
+        y = self.iteration_values(self.baseline_index, metric)
+        difference = x.mean() - y.mean()
+        groups = np.arange(len(x)) // self.simulations[index].group_size
+        sizes = np.bincount(groups)
+        x, y = np.bincount(groups, x) / sizes, np.bincount(groups, y) / sizes
+        if len(x) < 2:
+            return difference, float('nan'), float('nan')
+        paired = np.var(x - y, ddof=1)
+        independent = np.var(x, ddof=1) + np.var(y, ddof=1)
+        gain = independent / paired if paired > 0 else float('nan')
+        return difference, CONFIDENCE_Z * np.sqrt(paired / len(x)), gain
+
+    def results_table(self):
+        """One row per scenario: swept parameters, fast estimates, then summary metrics"""
+        rows = []
+        for index, ((parameters, config), sim) in enumerate(zip(self.scenarios, self.simulations)):
+            estimate = self.estimates[index]
+            row = {'scenario': config.name, **parameters,
+                   'total_capacity': config.total_capacity,
+                   'mc_capacity': config.mc_capacity,
+                   'car_capacity': config.car_capacity,
+                   'truck_capacity': config.truck_capacity,
+                   'daily_arrival_rate': sum(config.hourly_arrival_rates.values()),
+                   'simulated': index in self.active}
+            for metric in ESTIMATE_METRICS:
+                row[f'estimated_{metric}'] = estimate[metric]
+            if index not in self.active:
+                rows.append(row)
+                continue
+
+            stats = sim.calculate_statistics()
+            for metric in RESULT_METRICS:
+                value = stats[metric]
+                if isinstance(value, tuple):
+                    row[f'{metric}_low'], row[f'{metric}_high'] = value
+                else:
+                    row[metric] = value
+            row['estimate_error'] = estimate['probability_full'] - stats['probability_full']
+            if self.variance_reduction is not None:
+                for metric in VARIANCE_REDUCTION_METRICS:
+                    row[f'{metric}_effective_sample_size'] = stats[f'{metric}_effective_sample_size']
+            if self.baseline is not None:
+                for metric in PAIRED_METRICS:
+                    difference, half_width, gain = self.paired_difference(index, metric)
+                    row[f'{metric}_diff'] = difference
+                    row[f'{metric}_diff_low'] = difference - half_width
+                    row[f'{metric}_diff_high'] = difference + half_width
+                    row[f'{metric}_crn_gain'] = gain
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def export_results(self, output_dir='sweep_results'):
+        """Write the consolidated results table and the resolved scenario configs"""
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        table = self.results_table()
+        results_file = os.path.join(output_dir, f'sweep_results_{timestamp}.csv')
+        table.to_csv(results_file, index=False)
+        print(f"[OK] Sweep results saved to: {results_file}")
+
+        config = {
+            'timestamp': timestamp,
+            'iterations': self.num_iterations,
+            'engine': self.engine,
+            'workers': self.workers,
+            'prune': self.prune,
+            'baseline': self.baseline,
+            'variance_reduction': self.variance_reduction,
+            'seed_entropy': str(self.seed_entropy),
+            'scenarios': [config.to_dict() for _, config in self.scenarios],
+        }
+        config_file = os.path.join(output_dir, f'sweep_config_{timestamp}.json')
+        with open(config_file, 'w') as f:
+            json.dump(config, f, indent=2)
+        print(f"[OK] Sweep configuration saved to: {config_file}")
+
+        return table
+
+    def print_summary(self, table):
+        print(f"\n{'='*70}")
+        print(f"SWEEP SUMMARY")
+        print(f"{'='*70}")
+        columns = ['scenario', 'total_capacity', 'daily_arrival_rate', 'estimated_probability_full',
+                   'probability_full', 'rejected_mean', 'peak_utilization_mean']
+        gains = ['probability_full_crn_gain', 'rejected_mean_crn_gain']
+        if self.baseline is not None:
+            columns += ['probability_full_diff', gains[0], 'rejected_mean_diff', gains[1]]
+        shown = table.reindex(columns=columns)
+        if self.baseline is not None:
+            shown[gains] = shown[gains].astype(object)
+            shown.loc[self.baseline_index, gains] = '(baseline)'
+        print(shown.to_string(index=False, float_format=lambda v: f'{v:.3f}', na_rep='(pruned)'))
+        if self.baseline is not None:
+            print(f"(diff: scenario minus {self.baseline}; crn_gain: variance of the difference for independent "
+                  f"runs / with common random numbers)")
+        print(f"{'='*70}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo Parking Parameter Sweep')
+    parser.add_argument('sweep_file', type=str,
+                       help='Sweep definition (JSON, or YAML with PyYAML installed)')
+    parser.add_argument('--iterations', type=int, default=None,
+                       help='Iterations per scenario (default: from sweep file, else 1000)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed shared by all scenarios (default: from sweep file)')
+    parser.add_argument('--engine', type=str, default=None, choices=ENGINES,
+                       help='Simulation engine (default: from sweep file, else vectorized)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes shared by all scenarios (default: 1)')
+    parser.add_argument('--output-dir', type=str, default='sweep_results',
+                       help='Output directory for results (default: sweep_results)')
+    parser.add_argument('--prune', type=float, nargs=2, default=None, metavar=('LOW', 'HIGH'),
+                       help='Only simulate scenarios whose estimated P(Full) is in [LOW, HIGH] '
+                            '(default: from sweep file, else simulate all)')
+    parser.add_argument('--baseline', type=str, default=None,
+                       help='Scenario name to compare every scenario with, using paired CIs '
+                            '(default: from sweep file, else no comparison)')
+    parser.add_argument('--variance-reduction', type=str, default=None, choices=VARIANCE_REDUCTION_MODES,
+                       help='Sampling for every scenario, see monte_carlo_engine.py '
+                            '(default: from sweep file, else plain Monte Carlo)')
+
+    args = parser.parse_args()
+
+    sweep = load_sweep_file(args.sweep_file)
+    scenarios = build_scenarios(sweep)
+
+    runner = ParameterSweep(
+        scenarios,
+        num_iterations=args.iterations or sweep.get('iterations', 1000),
+        random_seed=args.seed if args.seed is not None else sweep.get('seed'),
+        engine=args.engine or sweep.get('engine', 'vectorized'),
+        workers=args.workers,
+        prune=args.prune or sweep.get('prune'),
+        baseline=args.baseline or sweep.get('baseline'),
+        variance_reduction=args.variance_reduction or sweep.get('variance_reduction'),
+    )
+    runner.run()
+    table = runner.export_results(args.output_dir)
+    runner.print_summary(table)
+
+
+if __name__ == '__main__':
+    main()
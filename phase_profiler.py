@@ -0,0 +1,118 @@
+"""
+PHASE PROFILER
+==============
+Opt-in wall time and call counts per simulation phase.
+
+A phase is one or more methods of an object. attach() replaces those
+methods on the instance with timed wrappers, so nothing changes (and
+nothing costs anything) unless a profiler is attached:
+
+    profiler = PhaseProfiler()
+    profiler.attach(sim, {'arrivals': ['generate_arrivals_poisson'],
+                          'parking': ['can_park', 'park_vehicle']})
+    sim.run()
+    profiler.print_summary()
+
+Phases can nest (e.g. 'iteration' contains 'parking'), so the times of
+different phases are not meant to add up.
+"""
+
+import json
+import marshal
+import time
+
+
+class PhaseProfiler:
+    """Wall time and call counts per phase, recorded by wrapping methods"""
+
+    def __init__(self):
+        self.phases = {}  # phase -> [calls, seconds]
+        self.wrapped = []  # (phase, method name) pairs wrapped by attach()
+        # Optional cProfile stats (Profile.stats dict) for one chosen piece of work
+        self.cprofile_stats = None
+        self.cprofile_label = None
+
+    def attach(self, obj, phases):
+        """Time every method in phases ({phase: [method names]}) on this instance"""
+        for phase, method_names in phases.items():
+            for method_name in method_names:
+                self.wrap(obj, method_name, phase)
+
+    def wrap(self, obj, method_name, phase):
+        method = getattr(obj, method_name)
+        counter = self.phases.setdefault(phase, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                counter[0] += 1
+                counter[1] += perf_counter() - start
+
+        # An instance attribute shadows the class method
+        setattr(obj, method_name, timed)
+        self.wrapped.append((phase, method_name))
+
+    def reattach(self, obj):
+        """Wrap the same methods on obj again (e.g. after unpickling it)"""
+        wrapped, self.wrapped = self.wrapped, []
+        for phase, method_name in wrapped:
+            self.wrap(obj, method_name, phase)
+
+    def __getstate__(self):
+        # The wrappers themselves stay behind; only counts travel
+        return {'phases': self.phases, 'wrapped': list(self.wrapped),
+                'cprofile_stats': self.cprofile_stats, 'cprofile_label': self.cprofile_label}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def take(self):
+        """Copy of the counts so far, then reset them (for sending results back from a worker)"""
+        copy = PhaseProfiler()
+        copy.phases = {phase: list(counter) for phase, counter in self.phases.items()}
+        copy.cprofile_stats, copy.cprofile_label = self.cprofile_stats, self.cprofile_label
+        for counter in self.phases.values():
+            counter[0], counter[1] = 0, 0.0
+        self.cprofile_stats = self.cprofile_label = None
+        return copy
+
+    def merge(self, other):
+        """Add another profiler's counts (e.g. from a worker process) to this one"""
+        for phase, (calls, seconds) in other.phases.items():
+            counter = self.phases.setdefault(phase, [0, 0.0])
+            counter[0] += calls
+            counter[1] += seconds
+        if other.cprofile_stats is not None:
+            self.cprofile_stats, self.cprofile_label = other.cprofile_stats, other.cprofile_label
+
+    def summary(self):
+        """{phase: {'calls', 'total_seconds', 'mean_us'}}"""
+        return {
+            phase: {'calls': calls, 'total_seconds': seconds,
+                    'mean_us': seconds / calls * 1e6 if calls else 0.0}
+            for phase, (calls, seconds) in self.phases.items()
+        }
+
+    def print_summary(self, title='PHASE PROFILE'):
+        print(f"\n{'='*70}")
+        print(title)
+        print(f"{'='*70}")
+        print(f"{'Phase':<24}{'Calls':>12}{'Total s':>12}{'Mean us':>12}")
+        for phase, row in self.summary().items():
+            if not row['calls']:
+                continue
+            print(f"{phase:<24}{row['calls']:>12}{row['total_seconds']:>12.3f}{row['mean_us']:>12.1f}")
+        print(f"{'='*70}\n")
+
+    def save(self, path, **extra):
+        """Write the summary (plus any extra keys) as JSON"""
+        with open(path, 'w') as f:
+            json.dump({**extra, 'phases': self.summary()}, f, indent=2)
+
+    def save_cprofile(self, path):
+        """Write the cProfile stats in pstats format (load with pstats.Stats(path))"""
+        with open(path, 'wb') as f:
+            marshal.dump(self.cprofile_stats, f)
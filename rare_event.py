@@ -0,0 +1,541 @@
+"""
+RARE-EVENT MONTE CARLO (IMPORTANCE SAMPLING)
+============================================
+For generous layouts, hitting full capacity is rare (P(Full) around 1e-4)
+and crude Monte Carlo needs hundreds of thousands of iterations to see it
+often enough. This runs the vectorized engine with tilted draws, so that
+full days become common, and weights every iteration by the likelihood
+ratio of its draws. The weighted means are unbiased estimates for the
+nominal scenario of the rare-event metrics:
+
+    P(Full)              - share of data collection times with a type full
+    P(Hit full)          - probability that a type fills at least once
+    rejected             - mean rejections, which only happen on full days
+
+each with its standard error and relative error (standard error /
+estimate). The crude-equivalent column is how many plain iterations would
+give the same relative error, from the weighted spread about each estimate.
+
+Each vehicle type fills for its own reasons (many arrivals overall, or an
+unusual share of cars or trucks), so there is one tilt per type: Poisson
+arrival rates times rate, batch-arrival probability times batch, and a
+vehicle mix. Every iteration is drawn from the nominal scenario (a
+defensive share) or from one of the tilts, and weighted by nominal density
+/ mixture density, which keeps weights below 1 / defensive share.
+
+Each type's tilt is chosen by the cross-entropy method: a few pilot rounds
+raise the target level of that type's peak fill ratio until the pilot
+iterations fill up, each time refitting the tilt to the (weighted) arrival
+counts and vehicle mix of the iterations that reached the level. Pilot
+rounds use their own random streams; --tilts reuses an earlier run's tilts.
+
+Exit times, circling and multi-day runs are simulated as in the vectorized
+engine; only arrival counts and vehicle types are tilted.
+
+Usage:
+    python rare_event.py --mc-capacity 560 --car-capacity 165 --truck-capacity 44
+    python rare_event.py --mc-capacity 560 --car-capacity 165 --truck-capacity 44 --tolerance 0.05
+    python rare_event.py --mc-capacity 560 --car-capacity 165 --truck-capacity 44 --crude 200000 --workers 8
+    python rare_event.py --mc-capacity 600 --tilts monte_carlo_results/rare_event_config_20250101_120000.json
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import List, Optional, Tuple
+import argparse
+import json
+import math
+import os
+import time
+
+from monte_carlo_engine import (MonteCarloSimulation, SimulationConfig, RunningStat, BACKENDS, CONFIDENCE_Z,
+                                ITERATION_BLOCK_SIZE, SIMULATION_DAYS)
+
+VEHICLE_TYPES = ('motorcycle', 'car', 'truck')
+
+# Weighted estimates: name -> per-iteration value (see iteration_values). Only metrics
+# that are zero off the rare event; means such as arrivals are ordinary plain-engine metrics
+RARE_EVENT_METRICS = ('probability_full', 'probability_hit_full', 'rejected')
+
+# Cross-entropy tuning of the tilts
+CE_PILOT_ITERATIONS = 1000  # iterations per pilot round
+CE_ELITE_FRACTION = 0.1  # share of pilot iterations that set the next level
+CE_MAX_ROUNDS = 10
+PILOT_STREAM = 2  # spawn key prefix of the pilot rounds' streams (the main run's blocks use none)
+
+# Tilted probabilities stay inside (0, 1), so every nominal outcome stays possible
+MAX_TILTED_BATCH_PROBABILITY = 0.95
+MIN_TILTED_TYPE_PROBABILITY = 0.001
+# Share of iterations drawn from the nominal scenario (defensive mixture); bounds weights by 1 / share
+DEFENSIVE_FRACTION = 0.1
+MIXTURE_STREAM = 3  # spawn key suffix of each block's choice of nominal or tilted draws
+
+
+@dataclass
+class Tilt:
+    """One importance-sampling proposal"""
+    rate: float = 1.0  # Poisson arrival rates are multiplied by this
+    batch: float = 1.0  # and the batch-arrival probability by this
+    vehicle_mix: Optional[Tuple[float, float, float]] = None  # motorcycle, car, truck; None = nominal
+
+    @classmethod
+    def from_dict(cls, values):
+        mix = values.get('vehicle_mix')
+        return cls(rate=values['rate'], batch=values['batch'], vehicle_mix=tuple(mix) if mix else None)
+
+
+def nominal_mix(config: SimulationConfig):
+    """Vehicle type probabilities as the engine draws them (trucks take the rest)"""
+    return np.array([config.prob_motorcycle, config.prob_car, 1.0 - config.prob_motorcycle - config.prob_car])
+
+
+def iteration_values(results):
+    """RARE_EVENT_METRICS values of a list of IterationResults, as arrays"""
+    times_full = np.array([r.times_full for r in results], dtype=float)
+    observations = np.array([len(r.time_series) for r in results], dtype=float)
+    return {
+        'probability_full': times_full / observations,
+        'probability_hit_full': (times_full > 0).astype(float),
+        'rejected': np.array([r.rejected for r in results], dtype=float),
+    }
+
+
+def type_arrivals(results):
+    """(iterations x 3) arrivals per vehicle type"""
+    return np.array([(r.mc_arrivals, r.car_arrivals, r.truck_arrivals) for r in results], dtype=float)
+
+
+def peak_fill_ratios(results, config: SimulationConfig):
+    """(iterations x 3) highest occupancy / capacity of each vehicle type at any collection time (1 = full)"""
+    time_series = np.stack([r.time_series for r in results])
+    return np.stack([time_series[name].max(axis=1) / max(capacity, 1)
+                     for name, capacity in zip(('mc', 'car', 'truck'), config.capacities)], axis=1)
+
+
+class WeightedSpread:
+    """
+    Mergeable sums of w and w * (g - reference) ^ 2 about a reference value,
+    so the nominal variance of g can be taken about the final estimate
+    without the cancellation of E[w g^2] - estimate^2 for large values
+    """
+
+    def __init__(self):
+        self.reference = 0.0
+        self.weight_sum = 0.0
+        self.first = 0.0  # sum of w * (g - reference)
+        self.second = 0.0  # sum of w * (g - reference) ^ 2
+
+    @classmethod
+    def from_values(cls, values, weights):
+        spread = cls()
+        if len(values) > 0:
+            spread.reference = float(np.mean(values))
+            deviations = values - spread.reference
+            spread.weight_sum = float(weights.sum())
+            spread.first = float(weights @ deviations)
+            spread.second = float(weights @ deviations ** 2)
+        return spread
+
+    def second_about(self, value):
+        """sum of w * (g - value) ^ 2"""
+        shift = self.reference - value
+        return self.second + 2 * shift * self.first + shift ** 2 * self.weight_sum
+
+    def merge(self, other):
+        if other.weight_sum == 0:
+            return
+        if self.weight_sum == 0:
+            self.reference, self.weight_sum, self.first, self.second = (
+                other.reference, other.weight_sum, other.first, other.second)
+            return
+        shift = other.reference - self.reference
+        self.second += other.second_about(self.reference)
+        self.first += other.first + shift * other.weight_sum
+        self.weight_sum += other.weight_sum
+
+
+class WeightedStatistics:
+    """
+    Mergeable importance-sampling accumulators. For each metric g, running
+    stats of w * g (its mean is the estimate) and the spread of g about it
+    under the nominal scenario (for the crude-equivalent variance), with w
+    the likelihood ratio of each iteration.
+    """
+
+    def __init__(self):
+        self.iterations = 0
+        self.weights = RunningStat()
+        self.weighted = {name: RunningStat() for name in RARE_EVENT_METRICS}
+        self.spreads = {name: WeightedSpread() for name in RARE_EVENT_METRICS}
+
+    def add_many(self, results, weights):
+        if not results:
+            return
+        self.iterations += len(results)
+        self.weights.merge(RunningStat.from_values(weights))
+        for name, values in iteration_values(results).items():
+            self.weighted[name].merge(RunningStat.from_values(weights * values))
+            self.spreads[name].merge(WeightedSpread.from_values(values, weights))
+
+    def merge(self, other):
+        self.iterations += other.iterations
+        self.weights.merge(other.weights)
+        for name in RARE_EVENT_METRICS:
+            self.weighted[name].merge(other.weighted[name])
+            self.spreads[name].merge(other.spreads[name])
+
+    def confidence_interval(self, metric, z=CONFIDENCE_Z):
+        """(estimate, half-width); metric is one of RARE_EVENT_METRICS, or 'rejected_mean'"""
+        name = metric[:-len('_mean')] if metric.endswith('_mean') else metric
+        if name not in self.weighted:
+            raise ValueError(f"No confidence interval for '{metric}'")
+        stat = self.weighted[name]
+        if stat.count < 2:
+            return stat.mean, float('inf')
+        return stat.mean, z * stat.std(ddof=1) / math.sqrt(stat.count)
+
+    def effective_weight_count(self):
+        """Kish effective number of iterations, (sum w)^2 / sum w^2"""
+        weights = self.weights
+        sum_squares = weights.m2 + weights.count * weights.mean ** 2
+        return (weights.count * weights.mean) ** 2 / sum_squares if sum_squares > 0 else float('nan')
+
+    def summary(self):
+        """One row per metric: estimate, errors, and the crude Monte Carlo iterations for the same precision"""
+        rows = []
+        for name in RARE_EVENT_METRICS:
+            estimate, half_width = self.confidence_interval(name)
+            std_error = half_width / CONFIDENCE_Z
+            relative_error = std_error / estimate if estimate > 0 else float('nan')
+            # Variance of one crude iteration: E[(g - E[g])^2] under the nominal scenario
+            crude_variance = self.spreads[name].second_about(estimate) / max(self.iterations, 1)
+            weighted_variance = self.weighted[name].std(ddof=1) ** 2
+            rows.append({
+                'metric': name,
+                'estimate': estimate,
+                'std_error': std_error,
+                'relative_error': relative_error,
+                'ci_95_low': estimate - half_width,
+                'ci_95_high': estimate + half_width,
+                'crude_equivalent_iterations': (self.iterations * crude_variance / weighted_variance
+                                                if weighted_variance > 0 else float('nan')),
+            })
+        return pd.DataFrame(rows)
+
+
+class ImportanceSamplingSimulation(MonteCarloSimulation):
+    """
+    Vectorized engine drawing each iteration from the nominal scenario or
+    from one of the tilts, with per-iteration likelihood-ratio weights.
+    Takes the same options as MonteCarloSimulation except engine (always
+    vectorized) and variance_reduction.
+
+    A defensive_fraction of the iterations is nominal and the rest are
+    split evenly between the tilts (chosen on a separate stream). Every
+    weight is nominal / mixture density, so it stays below
+    1 / defensive_fraction, and days that are full for reasons one tilt
+    does not favour are covered by another. With no tilts this is the
+    plain engine with all weights 1.
+    """
+
+    def __init__(self, tilts: List[Tilt] = (), defensive_fraction=DEFENSIVE_FRACTION,
+                 config: SimulationConfig = None, **kwargs):
+        if not 0 < defensive_fraction <= 1:
+            raise ValueError("defensive_fraction must be in (0, 1]")
+        if any(tilt.rate <= 0 or tilt.batch <= 0 for tilt in tilts):
+            raise ValueError("Tilts must be positive")
+        if kwargs.get('variance_reduction') is not None:
+            raise ValueError("Importance sampling replaces variance_reduction, use one or the other")
+        super().__init__(config=config, engine='vectorized', **kwargs)
+        self.tilts = list(tilts)
+        self.defensive_fraction = defensive_fraction if self.tilts else 1.0
+
+        # Proposal 0 is the nominal scenario, proposal j > 0 is tilt j - 1
+        self.proposal_probabilities = np.array([self.defensive_fraction]
+                                               + [(1 - self.defensive_fraction) / max(len(self.tilts), 1)]
+                                               * len(self.tilts))
+        self.proposal_rates = np.array([1.0] + [tilt.rate for tilt in self.tilts])
+        self.proposal_batches = np.array([1.0] + [tilt.batch for tilt in self.tilts])
+        mix = nominal_mix(self.config)
+        self.proposal_mixes = np.array([mix] + [tilt.vehicle_mix or mix for tilt in self.tilts])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Types the nominal scenario never draws keep their nominal (zero) probability
+            self.proposal_mixes[:, mix == 0] = 0.0
+            self.proposal_mixes /= self.proposal_mixes.sum(axis=1, keepdims=True)
+            self.log_mix_ratios = np.where(mix > 0, np.log(self.proposal_mixes / mix), 0.0)
+
+        self.statistics = WeightedStatistics()
+        self.draws = None  # per-iteration proposals, arrival totals and log ratios while run_vectorized_batch runs
+        self.last_draws = None
+
+    def mixture_generator(self, block_index):
+        """Random generator for one block's choice of proposals"""
+        seed = np.random.SeedSequence(self.seed_sequence.entropy,
+                                      spawn_key=self.seed_sequence.spawn_key + (block_index, MIXTURE_STREAM))
+        return np.random.default_rng(seed)
+
+    def run_vectorized_batch(self, first_iteration, batch_size):
+        """run_vectorized_batch, recording each iteration's draws and weight in self.last_draws"""
+        mixture_rng = self.mixture_generator(first_iteration // ITERATION_BLOCK_SIZE)
+        num_proposals = len(self.proposal_probabilities)
+        self.draws = {
+            'proposal': mixture_rng.choice(num_proposals, size=batch_size, p=self.proposal_probabilities),
+            'log_ratio': np.zeros((batch_size, num_proposals)),  # log(proposal / nominal density) per proposal
+            'poisson': np.zeros(batch_size),
+            'batches': np.zeros(batch_size),
+            'poisson_rate': 0.0,
+            'batch_trials': 0.0,
+        }
+        results = super().run_vectorized_batch(first_iteration, batch_size)
+        self.last_draws, self.draws = self.draws, None
+
+        # Vehicle mix term: sum over types of arrivals x log(proposal / nominal type probability)
+        self.last_draws['types'] = type_arrivals(results)
+        self.last_draws['log_ratio'] += self.last_draws['types'] @ self.log_mix_ratios.T
+        # Nominal density / mixture density (the nominal proposal's ratio is exp(0) = 1)
+        self.last_draws['weight'] = 1.0 / (np.exp(self.last_draws['log_ratio']) @ self.proposal_probabilities)
+        return results
+
+    def draw_arrival_counts(self, rates, arrival_hours, is_peak, scale, batch_size):
+        """
+        The plain engine's draws, with each iteration's proposal
+        parameters. Adds every proposal's log likelihood ratio (proposal /
+        nominal) of the day's counts: N log(rate) - (rate - 1) x total rate
+        for N Poisson arrivals, and a Bernoulli term per peak step for batch
+        arrivals
+        """
+        config = self.config
+        draws = self.draws
+        shape = (batch_size, len(rates))
+        batch_probability = min(config.prob_batch_arrival * scale, 1.0)
+        batch_probabilities = np.full(len(self.proposal_batches), batch_probability)
+        if 0 < batch_probability < 1:
+            batch_probabilities = np.minimum(batch_probability * self.proposal_batches, MAX_TILTED_BATCH_PROBABILITY)
+            batch_probabilities[0] = batch_probability
+
+        proposal = draws['proposal'][:, np.newaxis]
+        counts = self.rng.poisson(rates * self.proposal_rates[proposal], size=shape)
+        batch_arrival = is_peak & (self.rng.random(shape) < batch_probabilities[proposal])
+        batch_sizes = self.rng.integers(config.batch_size_min, config.batch_size_max + 1, size=shape)
+
+        poisson = counts.sum(axis=1)
+        batches = batch_arrival.sum(axis=1)
+        peak_steps = int(is_peak.sum())
+        draws['log_ratio'] += np.outer(poisson, np.log(self.proposal_rates)) - (self.proposal_rates - 1) * rates.sum()
+        if 0 < batch_probability < 1:
+            draws['log_ratio'] += (np.outer(batches, np.log(batch_probabilities / batch_probability))
+                                   + np.outer(peak_steps - batches,
+                                              np.log((1 - batch_probabilities) / (1 - batch_probability))))
+        draws['poisson'] += poisson
+        draws['batches'] += batches
+        draws['poisson_rate'] += rates.sum()
+        draws['batch_trials'] += batch_probability * peak_steps
+
+        counts += np.where(batch_arrival, batch_sizes, 0)
+        return counts
+
+    def vehicle_type_thresholds(self, vehicle_iteration):
+        """Cumulative type probabilities of each vehicle's proposal"""
+        thresholds = np.cumsum(self.proposal_mixes, axis=1)[self.draws['proposal'][vehicle_iteration]]
+        return thresholds[:, 0], thresholds[:, 1]
+
+    def run_and_summarize_block(self, block_index):
+        """Run one block and fold it into a WeightedStatistics"""
+        results = self.run_block(block_index)
+        statistics = WeightedStatistics()
+        statistics.add_many(results, self.last_draws['weight'])
+        return (results if self.keep_results or self.stream_output else []), statistics
+
+    def checkpoint_settings(self):
+        settings = super().checkpoint_settings()
+        settings.update(tilts=[asdict(tilt) for tilt in self.tilts], defensive_fraction=self.defensive_fraction)
+        return settings
+
+    def print_rare_event_summary(self, summary):
+        print(f"\n{'='*70}")
+        print(f"RARE-EVENT ESTIMATES ({self.statistics.iterations} iterations, {len(self.tilts)} tilts, "
+              f"{self.defensive_fraction:.0%} nominal)")
+        print(f"{'='*70}")
+        for vehicle_type, tilt in zip(VEHICLE_TYPES, self.tilts):
+            mix = '/'.join(f'{p:.3f}' for p in tilt.vehicle_mix) if tilt.vehicle_mix else 'nominal'
+            print(f"Tilt {vehicle_type:<11} rate x{tilt.rate:.3f}, batch x{tilt.batch:.3f}, mix {mix}")
+        print(f"{'Metric':<22}{'Estimate':>12}{'Rel. error':>12}{'95% CI':>26}{'Crude equiv.':>14}")
+        for _, row in summary.iterrows():
+            ci = f"[{row['ci_95_low']:.4g}, {row['ci_95_high']:.4g}]"
+            print(f"{row['metric']:<22}{row['estimate']:>12.4g}{row['relative_error']:>12.2%}{ci:>26}"
+                  f"{row['crude_equivalent_iterations']:>14,.0f}")
+        print(f"Mean weight: {self.statistics.weights.mean:.3f} (should be close to 1); "
+              f"effective iterations by weight: {self.statistics.effective_weight_count():,.0f}")
+        print("(Crude equiv.: plain Monte Carlo iterations needed for the same relative error)")
+        print(f"{'='*70}\n")
+
+
+def cross_entropy_tilt(config: SimulationConfig, vehicle_type, seed=None, pilot_iterations=CE_PILOT_ITERATIONS,
+                       elite_fraction=CE_ELITE_FRACTION, max_rounds=CE_MAX_ROUNDS, backend='python'):
+    """
+    Tilt that fills vehicle_type (0 = motorcycle, 1 = car, 2 = truck), by
+    the cross-entropy method. Each round runs pilot_iterations with the
+    current tilt and takes as the level the (1 - elite_fraction) quantile
+    of that type's peak fill ratio, capped at 1 (full). The new tilt is the
+    weighted maximum-likelihood fit to the elite iterations: weighted
+    Poisson arrivals / nominal Poisson rate total, likewise for batch
+    arrivals, and the weighted share of each vehicle type. Stops once the
+    level reaches 1. Returns (Tilt, list of rounds).
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    tilt = Tilt()
+    rounds = []
+    for round_number in range(max_rounds):
+        sim = ImportanceSamplingSimulation([tilt], defensive_fraction=DEFENSIVE_FRACTION, config=config,
+                                           num_iterations=pilot_iterations, backend=backend,
+                                           keep_results=False, verbose=False)
+        sim.seed_sequence = np.random.SeedSequence(entropy, spawn_key=(PILOT_STREAM, vehicle_type, round_number))
+
+        results, draws = [], {name: [] for name in ('weight', 'poisson', 'batches', 'types')}
+        for block_index in range(sim.num_blocks()):
+            results.extend(sim.run_block(block_index))
+            for name in draws:
+                draws[name].append(sim.last_draws[name])
+        draws = {name: np.concatenate(values) for name, values in draws.items()}
+        poisson_rate, batch_trials = sim.last_draws['poisson_rate'], sim.last_draws['batch_trials']
+
+        scores = peak_fill_ratios(results, config)[:, vehicle_type]
+        level = min(np.quantile(scores, 1 - elite_fraction), 1.0)
+        elite = scores >= level
+        weights = draws['weight'][elite]
+        mix = np.maximum(weights @ draws['types'][elite], 0.0)
+        mix = np.maximum(mix / mix.sum(), MIN_TILTED_TYPE_PROBABILITY) if mix.sum() > 0 else nominal_mix(config)
+        tilt = Tilt(rate=float(weights @ draws['poisson'][elite] / (weights.sum() * poisson_rate)),
+                    batch=(float(weights @ draws['batches'][elite] / (weights.sum() * batch_trials))
+                           if batch_trials > 0 else 1.0),
+                    vehicle_mix=tuple(float(p) for p in mix / mix.sum()))
+        rounds.append({'vehicle_type': VEHICLE_TYPES[vehicle_type], 'round': round_number + 1,
+                       'level': float(level), 'elite': int(elite.sum()), **asdict(tilt)})
+        print(f"  {VEHICLE_TYPES[vehicle_type]:<11} round {round_number + 1}: level {level:.3f} of capacity, "
+              f"rate x{tilt.rate:.3f}, batch x{tilt.batch:.3f}, "
+              f"mix {'/'.join(f'{p:.3f}' for p in tilt.vehicle_mix)}")
+        if level >= 1.0:
+            return tilt, rounds
+
+    print(f"[--] {VEHICLE_TYPES[vehicle_type].capitalize()} pilot iterations did not reach full capacity "
+          f"in {max_rounds} rounds; using the last tilt")
+    return tilt, rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rare-Event Monte Carlo Parking Simulation (importance sampling)')
+    parser.add_argument('--iterations', type=int, default=20000,
+                       help='Importance-sampling iterations (default: 20000)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed for the pilot rounds and the main run (default: None)')
+    parser.add_argument('--mc-capacity', type=int, default=None,
+                       help='Motorcycle capacity (default: the current layout)')
+    parser.add_argument('--car-capacity', type=int, default=None,
+                       help='Car capacity (default: the current layout)')
+    parser.add_argument('--truck-capacity', type=int, default=None,
+                       help='Truck capacity (default: the current layout)')
+    parser.add_argument('--days', type=int, default=SIMULATION_DAYS,
+                       help=f'Consecutive days per iteration (default: {SIMULATION_DAYS})')
+    parser.add_argument('--circling', action='store_true',
+                       help='Vehicles that find their type full circle and try again')
+    parser.add_argument('--tilts', type=str, default=None, metavar='CONFIG_JSON',
+                       help='Reuse the tilts of an earlier run (its rare_event_config_TIMESTAMP.json) '
+                            'instead of the cross-entropy pilot rounds')
+    parser.add_argument('--pilot-iterations', type=int, default=CE_PILOT_ITERATIONS,
+                       help=f'Iterations per cross-entropy pilot round (default: {CE_PILOT_ITERATIONS})')
+    parser.add_argument('--defensive-fraction', type=float, default=DEFENSIVE_FRACTION,
+                       help=f'Share of iterations drawn from the nominal scenario (default: {DEFENSIVE_FRACTION})')
+    parser.add_argument('--tolerance', type=float, default=None,
+                       help='Stop once the relative 95%% CI half-width of P(Full) is below '
+                            'this; --iterations becomes the maximum (default: off)')
+    parser.add_argument('--crude', type=int, default=None, metavar='ITERATIONS',
+                       help='Also run this many plain iterations with the same seed, for comparison')
+    parser.add_argument('--backend', type=str, default='python', choices=BACKENDS,
+                       help='Vectorized engine time-step loop (default: python)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes (default: 1)')
+    parser.add_argument('--output-dir', type=str, default='monte_carlo_results',
+                       help='Output directory for results (default: monte_carlo_results)')
+
+    args = parser.parse_args()
+
+    overrides = {name: value for name, value in (('mc_capacity', args.mc_capacity),
+                                                 ('car_capacity', args.car_capacity),
+                                                 ('truck_capacity', args.truck_capacity)) if value is not None}
+    config = SimulationConfig(days=args.days, circling=args.circling).replace(**overrides)
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+
+    print(f"Capacity: {config.total_capacity} (MC:{config.mc_capacity}, C:{config.car_capacity}, "
+          f"T:{config.truck_capacity})")
+    started = time.perf_counter()
+    rounds = []
+    if args.tilts:
+        with open(args.tilts) as f:
+            tilts = [Tilt.from_dict(values) for values in json.load(f)['tilts']]
+        print(f"[OK] {len(tilts)} tilts loaded from {args.tilts}")
+    else:
+        print(f"Cross-entropy pilot rounds ({args.pilot_iterations} iterations each):")
+        tilts = []
+        for vehicle_type in range(len(VEHICLE_TYPES)):
+            tilt, type_rounds = cross_entropy_tilt(config, vehicle_type, seed, args.pilot_iterations,
+                                                   backend=args.backend)
+            tilts.append(tilt)
+            rounds.extend(type_rounds)
+    pilot_seconds = time.perf_counter() - started
+
+    sim = ImportanceSamplingSimulation(tilts, defensive_fraction=args.defensive_fraction, config=config,
+                                       num_iterations=args.iterations, random_seed=seed, backend=args.backend,
+                                       workers=args.workers, keep_results=False, verbose=False,
+                                       tolerance=args.tolerance, adaptive_metrics=('probability_full',))
+    started = time.perf_counter()
+    sim.run()
+    seconds = time.perf_counter() - started
+    summary = sim.statistics.summary()
+    sim.print_rare_event_summary(summary)
+    print(f"Time: {pilot_seconds:.1f} s pilot rounds + {seconds:.1f} s importance sampling")
+
+    crude = None
+    if args.crude:
+        crude_sim = MonteCarloSimulation(num_iterations=args.crude, random_seed=seed, engine='vectorized',
+                                         backend=args.backend, workers=args.workers, keep_results=False,
+                                         config=config, verbose=False)
+        started = time.perf_counter()
+        crude_sim.run()
+        crude_seconds = time.perf_counter() - started
+        estimate, half_width = crude_sim.statistics.confidence_interval('probability_full')
+        crude = {'iterations': args.crude, 'seconds': round(crude_seconds, 2), 'probability_full': estimate,
+                 'probability_full_relative_error': half_width / CONFIDENCE_Z / estimate if estimate else None}
+        print(f"Crude Monte Carlo ({args.crude} iterations, {crude_seconds:.1f} s): "
+              f"P(Full) = {estimate:.4g} +/- {half_width:.2g} (95% CI)")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    summary_file = os.path.join(args.output_dir, f'rare_event_summary_{timestamp}.csv')
+    summary.to_csv(summary_file, index=False)
+    print(f"[OK] Rare-event summary saved to: {summary_file}")
+
+    config_file = os.path.join(args.output_dir, f'rare_event_config_{timestamp}.json')
+    with open(config_file, 'w') as f:
+        json.dump({
+            'timestamp': timestamp,
+            'iterations': sim.statistics.iterations,
+            'seed_entropy': str(seed),
+            'scenario': config.to_dict(),
+            'tilts': [asdict(tilt) for tilt in tilts],
+            'defensive_fraction': sim.defensive_fraction,
+            'cross_entropy_rounds': rounds,
+            'pilot_seconds': round(pilot_seconds, 2),
+            'seconds': round(seconds, 2),
+            'mean_weight': sim.statistics.weights.mean,
+            'effective_weight_count': sim.statistics.effective_weight_count(),
+            'tolerance': args.tolerance,
+            'converged': sim.converged,
+            'crude': crude,
+        }, f, indent=2)
+    print(f"[OK] Configuration saved to: {config_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Equivalence checks for the vectorized engine's backends (python -m pytest):
+    - numba and python backends give identical results for the same seed
+    - both agree with the loop (reference) engine on P(Full) and mean
+      rejections, within EQUIVALENCE_Z standard errors
+"""
+
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+import monte_carlo_engine as mc
+
+ITERATIONS = 500
+SEED = 42
+EQUIVALENCE_Z = 4.0  # same bound as the "backend" benchmark in benchmark_suite.py
+
+BACKENDS = ['python', pytest.param('numba', marks=pytest.mark.skipif(mc.numba is None,
+                                                                     reason='numba is not installed'))]
+
+
+def run(engine, backend='python', seed=SEED):
+    sim = mc.MonteCarloSimulation(num_iterations=ITERATIONS, random_seed=seed, engine=engine, backend=backend,
+                                  verbose=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim.run()
+    return sim.results
+
+
+def per_iteration(results):
+    """P(Full) and rejections of each iteration"""
+    return {
+        'probability_full': np.array([r.times_full / len(r.time_series) for r in results]),
+        'rejected': np.array([r.rejected for r in results], dtype=float),
+    }
+
+
+@pytest.fixture(scope='module')
+def loop_results():
+    # The loop engine draws in a different order, so it gets its own seed
+    return run('loop', seed=SEED + 1)
+
+
+@pytest.mark.skipif(mc.numba is None, reason='numba is not installed')
+def test_numba_matches_python_backend():
+    for a, b in zip(run('vectorized', 'numba'), run('vectorized', 'python'), strict=True):
+        assert (a.arrivals, a.parked, a.rejected, a.times_full, a.peak_occupancy) == \
+               (b.arrivals, b.parked, b.rejected, b.times_full, b.peak_occupancy)
+        assert np.array_equal(a.time_series, b.time_series)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_vectorized_matches_loop_engine(backend, loop_results):
+    values, reference = per_iteration(run('vectorized', backend)), per_iteration(loop_results)
+    for metric in values:
+        standard_error = np.sqrt(values[metric].var(ddof=1) / ITERATIONS
+                                 + reference[metric].var(ddof=1) / ITERATIONS)
+        z = (values[metric].mean() - reference[metric].mean()) / standard_error
+        assert abs(z) < EQUIVALENCE_Z, f"{metric}: {values[metric].mean():.4f} vs loop {reference[metric].mean():.4f}"
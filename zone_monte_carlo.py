@@ -0,0 +1,410 @@
+"""
+ZONE-LEVEL MONTE CARLO
+======================
+The vectorized Monte Carlo engine with one occupancy count per parking
+zone (PARKING_ZONES) instead of one per vehicle type, to see which zones
+fill first and how often, e.g. "Cars 3" against "Cars 1".
+
+A vehicle can park if any zone of its type has space, so arrivals, parked
+and rejected vehicles are exactly those of the type-level engine with the
+same seed; only the choice of zone is added. Zone policies:
+    random          - any zone with space, equally likely (as in the
+                      pygame model's random.choice over available zones)
+    nearest         - the zone with space closest to the entry gate
+    least_utilized  - the zone with space and the lowest occupied share
+Zone choices use their own random stream, so the arrival draws stay the
+same for every policy and layout (common random numbers).
+
+Per zone: mean parked and utilization, P(Full) over the data collection
+times, the probability that it fills at all, time until it first fills,
+and how often it is the first zone of the lot to fill.
+
+Layouts are Python files in the format of generated_parking_zones.py
+(PARKING_ZONES and ENTRY_GATE); several can be compared in one run.
+
+Usage:
+    python zone_monte_carlo.py
+    python zone_monte_carlo.py --policy random nearest least_utilized --iterations 2000
+    python zone_monte_carlo.py --layouts layout_a.py layout_b.py --seed 42
+"""
+
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List
+import argparse
+import importlib.util
+import json
+import os
+import time
+
+from monte_carlo_engine import (MonteCarloSimulation, SimulationConfig, StreamingStatistics, RunningStat,
+                                IntegerHistogram, format_time_str, ITERATION_BLOCK_SIZE,
+                                SECONDS_PER_DAY, SIMULATION_DAYS)
+
+VEHICLE_TYPES = ('motorcycle', 'car', 'truck')
+ZONE_POLICIES = ('random', 'nearest', 'least_utilized')
+# The layout the main simulation uses, next to this file
+DEFAULT_LAYOUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generated_parking_zones.py')
+ZONE_STREAM = 1  # spawn key suffix of each block's zone-choice stream (the engine's draws use none)
+
+
+@dataclass
+class ZoneLayout:
+    """Parking zones of one layout as arrays, in PARKING_ZONES order"""
+    name: str
+    zone_names: List[str]
+    zone_types: np.ndarray  # vehicle type index per zone
+    capacities: np.ndarray
+    distances: np.ndarray  # zone centre to entry gate (map units)
+
+    @classmethod
+    def from_zones(cls, zones, entry_gate, name='layout'):
+        centres = np.array([(z['x'] + z['width'] / 2, z['y'] + z['height'] / 2) for z in zones], dtype=float)
+        return cls(
+            name=name,
+            zone_names=[z['name'] for z in zones],
+            zone_types=np.array([VEHICLE_TYPES.index(z['zone_type']) for z in zones], dtype=int),
+            capacities=np.array([z['capacity'] for z in zones], dtype=int),
+            distances=np.hypot(*(centres - np.asarray(entry_gate, dtype=float)).T),
+        )
+
+    @property
+    def num_zones(self):
+        return len(self.zone_names)
+
+    def type_capacities(self):
+        """Total capacity per vehicle type (motorcycle, car, truck)"""
+        return np.bincount(self.zone_types, weights=self.capacities, minlength=3).astype(int)
+
+    def type_zones(self):
+        """
+        (3 x most zones of one type) zone indices per vehicle type, padded
+        with num_zones: an extra zone of capacity 0 that is always full
+        """
+        per_type = [np.flatnonzero(self.zone_types == t) for t in range(3)]
+        width = max(1, max(len(z) for z in per_type))
+        table = np.full((3, width), self.num_zones)
+        for t, zones in enumerate(per_type):
+            table[t, :len(zones)] = zones
+        return table
+
+
+def load_layout(path=DEFAULT_LAYOUT):
+    """ZoneLayout from a Python file defining PARKING_ZONES and ENTRY_GATE"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(f'layout_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not getattr(module, 'PARKING_ZONES', None):
+        raise ValueError(f"{path} defines no PARKING_ZONES")
+    return ZoneLayout.from_zones(module.PARKING_ZONES, getattr(module, 'ENTRY_GATE', (0, 0)), name=name)
+
+
+class ZoneStatistics(StreamingStatistics):
+    """StreamingStatistics plus mergeable per-zone accumulators"""
+
+    def __init__(self, config: SimulationConfig = None, layout: ZoneLayout = None, group_size=1):
+        super().__init__(config, group_size)
+        self.layout = layout
+        num_zones = layout.num_zones
+        self.zone_parked = [RunningStat() for _ in range(num_zones)]
+        self.zone_peak = [RunningStat() for _ in range(num_zones)]
+        self.zone_occupied_sum = np.zeros(num_zones)
+        self.zone_full_observations = np.zeros(num_zones, dtype=np.int64)
+        self.zone_fills = np.zeros(num_zones, dtype=np.int64)  # iterations in which the zone filled up
+        self.zone_first_to_fill = np.zeros(num_zones, dtype=np.int64)
+        # Minutes from opening on day 1 until the zone first filled (iterations where it did)
+        self.zone_time_to_full = [RunningStat() for _ in range(num_zones)]
+        self.zone_time_to_full_quantiles = [IntegerHistogram() for _ in range(num_zones)]
+
+    def add_zones(self, zone_batch):
+        """Fold in the (iterations x zones) arrays of one batch (ZoneMonteCarloSimulation.zone_batch)"""
+        first_full = zone_batch['first_full']
+        fills = ~np.isnan(first_full)
+        for z in range(self.layout.num_zones):
+            self.zone_parked[z].merge(RunningStat.from_values(zone_batch['parked'][:, z]))
+            self.zone_peak[z].merge(RunningStat.from_values(zone_batch['peak'][:, z]))
+            minutes = first_full[fills[:, z], z].astype(int)
+            self.zone_time_to_full[z].merge(RunningStat.from_values(minutes))
+            self.zone_time_to_full_quantiles[z].add_many(minutes)
+        self.zone_occupied_sum += zone_batch['occupied_sum'].sum(axis=0)
+        self.zone_full_observations += zone_batch['full_count'].sum(axis=0)
+        self.zone_fills += fills.sum(axis=0)
+        any_fill = fills.any(axis=1)
+        first_zone = np.where(fills, first_full, np.inf).argmin(axis=1)[any_fill]
+        self.zone_first_to_fill += np.bincount(first_zone, minlength=self.layout.num_zones)
+
+    def merge(self, other):
+        super().merge(other)
+        for z in range(self.layout.num_zones):
+            self.zone_parked[z].merge(other.zone_parked[z])
+            self.zone_peak[z].merge(other.zone_peak[z])
+            self.zone_time_to_full[z].merge(other.zone_time_to_full[z])
+            self.zone_time_to_full_quantiles[z].merge(other.zone_time_to_full_quantiles[z])
+        self.zone_occupied_sum += other.zone_occupied_sum
+        self.zone_full_observations += other.zone_full_observations
+        self.zone_fills += other.zone_fills
+        self.zone_first_to_fill += other.zone_first_to_fill
+
+    def zone_summary(self):
+        """One row per zone"""
+        layout = self.layout
+        observations = max(self.total_observations, 1)
+        iterations = max(self.iterations, 1)
+        start_time = self.config.start_hour * 3600
+        rows = []
+        for z in range(layout.num_zones):
+            capacity = layout.capacities[z]
+            time_to_full = self.zone_time_to_full[z]
+            filled = time_to_full.count > 0
+            median = self.zone_time_to_full_quantiles[z].percentile(50) if filled else float('nan')
+            rows.append({
+                'zone': layout.zone_names[z],
+                'zone_type': VEHICLE_TYPES[layout.zone_types[z]],
+                'capacity': capacity,
+                'distance_to_entry': round(layout.distances[z], 1),
+                'parked_mean': self.zone_parked[z].mean,
+                'parked_std': self.zone_parked[z].std(ddof=1),
+                'utilization_mean': self.zone_occupied_sum[z] / observations / capacity * 100 if capacity else 0.0,
+                'peak_occupancy_mean': self.zone_peak[z].mean,
+                'probability_full': self.zone_full_observations[z] / observations,
+                'probability_fills': self.zone_fills[z] / iterations,
+                'time_to_full_mean_minutes': time_to_full.mean if filled else float('nan'),
+                'time_to_full_median': format_time_str(start_time + median * 60) if filled else '',
+                'first_to_fill': self.zone_first_to_fill[z] / iterations,
+            })
+        return pd.DataFrame(rows)
+
+
+class ZoneMonteCarloSimulation(MonteCarloSimulation):
+    """
+    Vectorized engine with per-zone occupancy. Takes the same options as
+    MonteCarloSimulation except engine and backend (always the NumPy
+    vectorized engine); capacities come from the layout.
+    """
+
+    def __init__(self, layout: ZoneLayout = None, policy='random', config: SimulationConfig = None, **kwargs):
+        if policy not in ZONE_POLICIES:
+            raise ValueError(f"Unknown zone policy '{policy}' (choose from {', '.join(ZONE_POLICIES)})")
+        if kwargs.get('backend', 'python') != 'python':
+            raise ValueError("Zone-level runs use the NumPy vectorized engine only (backend='python')")
+        self.layout = layout or load_layout()
+        self.policy = policy
+        mc_capacity, car_capacity, truck_capacity = self.layout.type_capacities()
+        config = (config or SimulationConfig()).replace(
+            mc_capacity=int(mc_capacity), car_capacity=int(car_capacity), truck_capacity=int(truck_capacity))
+        super().__init__(config=config, engine='vectorized', **kwargs)
+        self.statistics = ZoneStatistics(self.config, self.layout, self.group_size)
+
+        # Zone arrays with the padding zone of type_zones() at the end
+        self.type_zones = self.layout.type_zones()
+        self.zone_capacities = np.append(self.layout.capacities, 0)
+        self.zone_distances = np.append(self.layout.distances, np.inf)
+        self.zone_state = None  # per-batch zone arrays while run_vectorized_batch runs
+        self.zone_batch = None  # per-zone results of the last batch
+
+    def zone_generator(self, block_index):
+        """Random generator for the zone choices of one block, separate from the engine's stream"""
+        seed = np.random.SeedSequence(self.seed_sequence.entropy,
+                                      spawn_key=self.seed_sequence.spawn_key + (block_index, ZONE_STREAM))
+        return np.random.default_rng(seed)
+
+    def run_vectorized_batch(self, first_iteration, batch_size):
+        """run_vectorized_batch with zone arrays alongside; per-zone results go to self.zone_batch"""
+        config = self.config
+        num_steps = int((config.end_hour - config.start_hour) * 3600 // config.time_step)
+        shape = (batch_size, self.layout.num_zones + 1)
+        self.zone_rng = self.zone_generator(first_iteration // ITERATION_BLOCK_SIZE)
+        self.zone_state = {
+            'day': 0,
+            'occupied': np.zeros(shape, dtype=int),
+            # Same layout as the engine's departures: today, the night, tomorrow
+            'departures': np.zeros(shape + (2 * num_steps + 2,), dtype=np.int32),
+            'parked': np.zeros(shape, dtype=int),
+            'occupied_sum': np.zeros(shape, dtype=int),
+            'full_count': np.zeros(shape, dtype=int),
+            'peak': np.zeros(shape, dtype=int),
+            'first_full': np.full(shape, np.nan),  # minutes from opening on day 1
+        }
+        results = super().run_vectorized_batch(first_iteration, batch_size)
+        state, self.zone_state = self.zone_state, None
+        self.zone_batch = {name: values[:, :-1] for name, values in state.items() if name not in ('day', 'departures')}
+        return results
+
+    def place_vehicles(self, step, num_steps, parked, retried, collection):
+        """
+        Place the vehicles parking at this step, circling ones included, in
+        zones (assign_zones) and track zone occupancy. Which vehicles park
+        is decided per vehicle type by MonteCarloSimulation.advance_occupancy.
+        """
+        zone = self.zone_state
+        zone_occupied, zone_departures = zone['occupied'], zone['departures']
+        zone_full = self.zone_capacities
+        if step == 0 and zone['day'] > 0:
+            # Same overnight roll-over as run_vectorized_batch does for the type arrays
+            zone_occupied -= zone_departures[:, :, num_steps]
+            zone_departures[:, :, :num_steps + 1] = zone_departures[:, :, num_steps + 1:]
+            zone_departures[:, :, num_steps + 1:] = 0
+
+        # Same order as the type arrays: arrivals park, then departures, then retries
+        if parked is not None:
+            self.park_in_zones(step, *parked)
+        zone_occupied -= zone_departures[:, :, step]
+        if retried is not None:
+            self.park_in_zones(step, *retried)
+
+        if collection >= 0:
+            zone['occupied_sum'] += zone_occupied
+            zone['full_count'] += zone_occupied >= zone_full
+            np.maximum(zone['peak'], zone_occupied, out=zone['peak'])
+
+        if step == num_steps - 1:
+            zone['day'] += 1
+
+    def park_in_zones(self, step, iteration, vehicle_type, rank, departure_step):
+        """assign_zones, then record the zones that became full at this step"""
+        zone = self.zone_state
+        self.assign_zones(iteration, vehicle_type, rank, departure_step)
+        # Zones only fill when vehicles park
+        newly_full = (zone['occupied'] >= self.zone_capacities) & np.isnan(zone['first_full'])
+        zone['first_full'][newly_full] = zone['day'] * SECONDS_PER_DAY / 60 + step * self.config.time_step / 60
+
+    def assign_zones(self, iteration, vehicle_type, rank, departure_step):
+        """
+        Place parking vehicles (all with space for their type) in zones by
+        the zone policy. Vehicles of one iteration and type are placed in
+        rank (arrival) order, so each sees the zones left by the one before.
+        """
+        zone = self.zone_state
+        for r in range(rank.max() + 1 if len(rank) else 0):
+            same_rank = rank == r
+            it = iteration[same_rank]
+            zones = self.type_zones[vehicle_type[same_rank]]
+            occupied = zone['occupied'][it[:, np.newaxis], zones]
+            capacity = self.zone_capacities[zones]
+
+            if self.policy == 'nearest':
+                score = self.zone_distances[zones]
+            elif self.policy == 'least_utilized':
+                score = occupied / np.maximum(capacity, 1)
+            else:
+                score = self.zone_rng.random(zones.shape)
+            score = np.where(occupied < capacity, score, np.inf)
+            choice = zones[np.arange(len(it)), score.argmin(axis=1)]
+
+            # One vehicle per (iteration, type) per rank, so no index repeats
+            zone['occupied'][it, choice] += 1
+            zone['parked'][it, choice] += 1
+            zone['departures'][it, choice, departure_step[same_rank]] += 1
+
+    def run_and_summarize_block(self, block_index):
+        """Run one block and fold it, zones included, into a ZoneStatistics"""
+        results = self.run_block(block_index)
+        statistics = ZoneStatistics(self.config, self.layout, self.group_size)
+        statistics.add_many(results)
+        statistics.add_zones(self.zone_batch)
+        self.zone_batch = None
+        return (results if self.keep_results or self.stream_output else []), statistics
+
+    def print_zone_summary(self):
+        summary = self.statistics.zone_summary()
+        print(f"\n{'='*70}")
+        print(f"ZONES: {self.layout.name}, {self.policy} policy ({self.statistics.iterations} iterations)")
+        print(f"{'='*70}")
+        print(f"{'Zone':<10}{'Cap':>5}{'Parked':>9}{'Util %':>8}{'P(Full)':>9}{'Fills':>7}"
+              f"{'Full at':>9}{'First':>7}")
+        for _, row in summary.iterrows():
+            print(f"{row['zone']:<10}{row['capacity']:>5}{row['parked_mean']:>9.1f}{row['utilization_mean']:>8.1f}"
+                  f"{row['probability_full']:>9.4f}{row['probability_fills']:>7.2f}"
+                  f"{row['time_to_full_median'] or '-':>9}{row['first_to_fill']:>7.2f}")
+        print("(Full at: median time the zone first fills; First: share of iterations it fills first)")
+        print(f"{'='*70}\n")
+
+
+def layout_row(sim: ZoneMonteCarloSimulation, seconds):
+    """One comparison row for a finished (layout, policy) run"""
+    stats = sim.calculate_statistics()
+    zones = sim.statistics.zone_summary()
+    first = zones.loc[zones['first_to_fill'].idxmax()]
+    busiest = zones.loc[zones['probability_full'].idxmax()]
+    return {
+        'layout': sim.layout.name,
+        'policy': sim.policy,
+        'zones': sim.layout.num_zones,
+        'total_capacity': sim.config.total_capacity,
+        'probability_full': stats['probability_full'],
+        'rejected_mean': stats['rejected_mean'],
+        'first_zone_to_fill': first['zone'],
+        'first_zone_share': first['first_to_fill'],
+        'most_often_full_zone': busiest['zone'],
+        'most_often_full_probability': busiest['probability_full'],
+        'seconds': round(seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zone-Level Monte Carlo Parking Simulation')
+    parser.add_argument('--iterations', type=int, default=1000,
+                       help='Monte Carlo iterations per layout and policy (default: 1000)')
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Random seed; every layout and policy gets the same arrivals (default: None)')
+    parser.add_argument('--layouts', type=str, nargs='+', default=[DEFAULT_LAYOUT],
+                       help='Layout files with PARKING_ZONES and ENTRY_GATE (default: generated_parking_zones.py)')
+    parser.add_argument('--policy', type=str, nargs='+', default=['random'], choices=ZONE_POLICIES,
+                       help='Zone choice policies to run (default: random)')
+    parser.add_argument('--days', type=int, default=SIMULATION_DAYS,
+                       help=f'Consecutive days per iteration (default: {SIMULATION_DAYS})')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Worker processes per run (default: 1)')
+    parser.add_argument('--output-dir', type=str, default='monte_carlo_results',
+                       help='Output directory for results (default: monte_carlo_results)')
+
+    args = parser.parse_args()
+
+    # Same entropy for every run, so layouts and policies see the same arrivals
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    config = SimulationConfig(days=args.days)
+    layouts = [load_layout(path) for path in args.layouts]
+
+    zone_tables, rows = [], []
+    for layout in layouts:
+        for policy in args.policy:
+            print(f"Layout {layout.name} ({layout.num_zones} zones), {policy} policy: "
+                  f"{args.iterations} iterations...")
+            started = time.perf_counter()
+            sim = ZoneMonteCarloSimulation(layout=layout, policy=policy, config=config,
+                                           num_iterations=args.iterations, random_seed=seed,
+                                           workers=args.workers, keep_results=False, verbose=False)
+            sim.run()
+            rows.append(layout_row(sim, time.perf_counter() - started))
+            sim.print_zone_summary()
+            zone_tables.append(sim.statistics.zone_summary().assign(layout=layout.name, policy=policy))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    zones_df = pd.concat(zone_tables, ignore_index=True)
+    zones_df = zones_df[['layout', 'policy'] + [c for c in zones_df.columns if c not in ('layout', 'policy')]]
+    zones_file = os.path.join(args.output_dir, f'zone_summary_{timestamp}.csv')
+    zones_df.to_csv(zones_file, index=False)
+    print(f"[OK] Zone summary saved to: {zones_file}")
+
+    comparison = pd.DataFrame(rows)
+    if len(rows) > 1:
+        print(comparison.to_string(index=False))
+    comparison_file = os.path.join(args.output_dir, f'layout_comparison_{timestamp}.csv')
+    comparison.to_csv(comparison_file, index=False)
+    print(f"[OK] Layout comparison saved to: {comparison_file}")
+
+    config_file = os.path.join(args.output_dir, f'zone_config_{timestamp}.json')
+    with open(config_file, 'w') as f:
+        json.dump({'timestamp': timestamp, 'iterations': args.iterations, 'seed_entropy': str(seed),
+                   'days': args.days, 'layouts': args.layouts, 'policies': args.policy,
+                   'iteration_block_size': ITERATION_BLOCK_SIZE}, f, indent=2)
+    print(f"[OK] Configuration saved to: {config_file}")
+
+
+if __name__ == '__main__':
+    main()